@@ -5,3 +5,10 @@ class BreadConfig(AppConfig):
 
     name = "bread"
     verbose_name = "Bread Engine"
+
+    def ready(self):
+        from .utils.modelversions import connect_model_version_receivers
+        from .utils.thumbnails import connect_thumbnail_receivers
+
+        connect_model_version_receivers()
+        connect_thumbnail_receivers()
@@ -1,4 +1,6 @@
+import hashlib
 import json
+from functools import lru_cache
 
 import htmlgenerator as hg
 from django.core import checks
@@ -8,11 +10,11 @@ from django.urls import reverse
 from django.utils.html import mark_safe
 from django.utils.translation import gettext_lazy as _
 from djangoql.exceptions import DjangoQLError
-from djangoql.queryset import apply_search
 from djangoql.schema import DjangoQLSchema
 from djangoql.serializers import DjangoQLSchemaSerializer
 
 from bread import layout
+from bread.utils.queryexpression import apply_queryexpression
 
 
 class QueryValue:
@@ -116,13 +118,14 @@ class QuerySetFormWidget(layout.text_area.TextArea):
     def render(self, context):
         model = getattr(self.boundfield.form.instance, self.modelfieldname)
         if model and model.model_class():
+            # the schema is loaded by DjangoQL from the (browser-cached) endpoint
             self.append(
                 hg.SCRIPT(
                     mark_safe(
                         """
     document.addEventListener("DOMContentLoaded", () => DjangoQL.DOMReady(function () {
     new DjangoQL({
-        introspections: %s,
+        introspections: '%s',
         selector: 'textarea[name=%s]',
         syntaxHelp: '%s',
         autoResize: false
@@ -130,11 +133,7 @@ class QuerySetFormWidget(layout.text_area.TextArea):
     }));
     """
                         % (
-                            json.dumps(
-                                DjangoQLSchemaSerializer().serialize(
-                                    DjangoQLSchema(model.model_class())
-                                )
-                            ),
+                            reverse("queryschema", kwargs={"contenttype_pk": model.pk}),
                             self.boundfield.name,
                             reverse("reporthelp"),
                         )
@@ -144,10 +143,23 @@ class QuerySetFormWidget(layout.text_area.TextArea):
         return super().render(context)
 
 
+@lru_cache(maxsize=128)
+def queryschema(model, schema=DjangoQLSchema):
+    """
+    Returns the serialized djangoql schema of the model as JSON and an ETag for it.
+    Cached for the last 128 combinations of model and schema class.
+    """
+    payload = json.dumps(DjangoQLSchemaSerializer().serialize(schema(model)))
+    return (
+        payload,
+        hashlib.sha1(payload.encode()).hexdigest(),  # nosec because only used as ETag
+    )
+
+
 def parsequeryexpression(basequeryset, expression):
     if not expression:
         return QueryValue(basequeryset.all(), expression)
     try:
-        return QueryValue(apply_search(basequeryset, expression), expression)
+        return QueryValue(apply_queryexpression(basequeryset, expression), expression)
     except DjangoQLError as e:
         raise ValidationError(str(e))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from bread.contrib.reports.models import Report
+from bread.contrib.reports.snapshots import refresh_snapshot
+
+
+class Command(BaseCommand):
+    help = "Refresh the snapshots of all reports which use a snapshot, run periodically"
+
+    def add_arguments(self, parser):
+        parser.add_argument("report_pk", nargs="*", type=int)
+
+    def handle(self, *args, **options):
+        reports = Report.objects.filter(use_snapshot=True)
+        if options["report_pk"]:
+            reports = reports.filter(pk__in=options["report_pk"])
+        for report in reports:
+            snapshot = refresh_snapshot(report)
+            self.stdout.write(f"{report}: {snapshot.rows.count()} rows")
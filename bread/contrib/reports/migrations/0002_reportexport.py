@@ -0,0 +1,36 @@
+# Generated by Django 3.1.14 on 2026-10-18 18:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportExport',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Created')),
+                ('format', models.CharField(default='xlsx', max_length=32, verbose_name='Format')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=32, verbose_name='Status')),
+                ('progress', models.PositiveIntegerField(default=0, verbose_name='Exported rows')),
+                ('total', models.PositiveIntegerField(blank=True, null=True, verbose_name='Total rows')),
+                ('file', models.FileField(blank=True, upload_to='reports/exports/', verbose_name='File')),
+                ('error', models.TextField(blank=True, verbose_name='Error')),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exports', to='reports.report')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Report export',
+                'verbose_name_plural': 'Report exports',
+                'ordering': ['-created'],
+            },
+        ),
+    ]
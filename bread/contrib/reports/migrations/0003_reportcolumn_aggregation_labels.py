@@ -0,0 +1,18 @@
+# Generated by Django 3.1.14 on 2026-10-18 18:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_reportexport'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reportcolumn',
+            name='aggregation',
+            field=models.CharField(blank=True, choices=[('count', 'Count'), ('sum', 'Sum')], max_length=64, verbose_name='Aggregation'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 3.1.14 on 2026-10-18 18:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0003_reportcolumn_aggregation_labels'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='snapshot_timestampfield',
+            field=models.CharField(blank=True, help_text="Field with the modification time of the rows, e.g. 'last_modified'. Without it only new rows are detected during a refresh", max_length=255, verbose_name='Snapshot timestamp field'),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='use_snapshot',
+            field=models.BooleanField(default=False, help_text='Serve preview and exports from a stored copy of the rows which is refreshed periodically', verbose_name='Use snapshot'),
+        ),
+        migrations.CreateModel(
+            name='ReportSnapshot',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('refreshed', models.DateTimeField(blank=True, null=True, verbose_name='Refreshed')),
+                ('definition', models.CharField(blank=True, max_length=40)),
+                ('watermark', models.TextField(blank=True)),
+                ('report', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='snapshot', to='reports.report')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ReportSnapshotRow',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_pk', models.CharField(max_length=255)),
+                ('values', models.TextField()),
+                ('snapshot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rows', to='reports.reportsnapshot')),
+            ],
+            options={
+                'unique_together': {('snapshot', 'object_pk')},
+            },
+        ),
+    ]
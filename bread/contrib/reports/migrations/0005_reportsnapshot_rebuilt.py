@@ -0,0 +1,23 @@
+# Generated by Django 3.1.14 on 2026-10-18 19:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0004_reportsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportsnapshot',
+            name='rebuilt',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Rebuilt'),
+        ),
+        migrations.AlterField(
+            model_name='report',
+            name='snapshot_timestampfield',
+            field=models.CharField(blank=True, help_text="Field with the modification time of the rows, e.g. 'last_modified'. Without it changed rows are only updated when the snapshot is rebuilt, see REPORT_SNAPSHOT_REBUILD_AGE", max_length=255, verbose_name='Snapshot timestamp field'),
+        ),
+    ]
@@ -1,13 +1,42 @@
+import hashlib
+import itertools
+
 import htmlgenerator as hg
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
 from django.db import models
+from django.utils import timezone
+from django.utils.html import mark_safe
+from django.utils.translation import get_language
 from django.utils.translation import gettext_lazy as _
 
+import bread.settings as app_settings
 from bread import layout
+from bread.utils import model_cache_version, rawvalue
 
 from .fields.queryfield import QuerysetField
 
 
+def _tomany_joins(model, lookup):
+    """
+    Returns the prefixes of the lookup which join a to-many relationship, e.g.
+    ["authors"] for "authors__name". Raises FieldDoesNotExist if the lookup does
+    not consist of database fields only.
+    """
+    joins = []
+    parts = lookup.split(models.constants.LOOKUP_SEP)
+    for i, part in enumerate(parts):
+        if model is None:
+            raise FieldDoesNotExist(f"{lookup} is not a database field")
+        field = model._meta.get_field(part)
+        if field.is_relation and (field.many_to_many or field.one_to_many):
+            joins.append(models.constants.LOOKUP_SEP.join(parts[: i + 1]))
+        model = field.related_model if field.is_relation else None
+    return joins
+
+
 class Report(models.Model):
     created = models.DateField(_("Created"), auto_now_add=True)
     name = models.CharField(_("Name"), max_length=255)
@@ -17,11 +46,95 @@ class Report(models.Model):
     )
     model.verbose_name = _("Model")
     filter = QuerysetField(_("Filter"), modelfieldname="model")
+    use_snapshot = models.BooleanField(
+        _("Use snapshot"),
+        default=False,
+        help_text=_(
+            "Serve preview and exports from a stored copy of the rows which is refreshed periodically"
+        ),
+    )
+    snapshot_timestampfield = models.CharField(
+        _("Snapshot timestamp field"),
+        max_length=255,
+        blank=True,
+        help_text=_(
+            "Field with the modification time of the rows, e.g. 'last_modified'. Without it changed rows are only updated when the snapshot is rebuilt, see REPORT_SNAPSHOT_REBUILD_AGE"
+        ),
+    )
 
     @property
     def preview(self):
+        """
+        The rendered preview is cached for REPORT_PREVIEW_CACHE_TIMEOUT seconds. The
+        cache key contains the filter and columns of the report, the active language
+        and timezone and a version which is increased when objects of the report
+        model are saved or deleted.
+        Changes to related models are only picked up after the timeout.
+        """
+        reportcolumns = list(self.columns.all())
+        modelclass = self.model.model_class()
+        version = model_cache_version(modelclass)
+        definition = [
+            (column.pk, column.column, column.name, column.aggregation)
+            for column in reportcolumns
+        ]
+        key = "bread.reports.preview.{}.{}.{}".format(
+            self.pk,
+            version,
+            hashlib.sha1(  # nosec because only used as cache key
+                f"{self.model_id}:{self.filter}:{definition}:{get_language()}:"
+                f"{timezone.get_current_timezone_name()}".encode()
+            ).hexdigest(),
+        )
+        html = cache.get(key)
+        if html is None:
+            html = hg.render(self._preview(reportcolumns), {})
+            cache.set(
+                key,
+                html,
+                getattr(
+                    settings,
+                    "REPORT_PREVIEW_CACHE_TIMEOUT",
+                    app_settings.REPORT_PREVIEW_CACHE_TIMEOUT,
+                ),
+            )
+        return mark_safe(html)
+
+    def _preview(self, reportcolumns):
+        from .snapshots import snapshotrows
+
+        if any(column.aggregation for column in reportcolumns):
+            columns = [
+                (column.name, layout.FC(f"row.{column.resultkey}"), None)
+                for column in reportcolumns
+            ]
+            try:
+                rows = self.aggregate(reportcolumns)[:25]
+            except ValidationError as e:
+                return hg.BaseElement(
+                    hg.H3(_("Preview")),
+                    layout.notification.InlineNotification(
+                        _("Invalid aggregation"), " ".join(e.messages), kind="error"
+                    ),
+                )
+            return hg.BaseElement(
+                hg.H3(_("Preview")),
+                layout.datatable.DataTable(columns, rows),
+            )
+
+        rows = snapshotrows(self, reportcolumns)
+        if rows is not None:
+            columns = [
+                (column.name, layout.FC(f"row.{i}"), None)
+                for i, column in enumerate(reportcolumns)
+            ]
+            return hg.BaseElement(
+                hg.H3(_("Preview")),
+                layout.datatable.DataTable(columns, list(itertools.islice(rows, 25))),
+            )
+
         columns = []
-        for column in self.columns.all():
+        for column in reportcolumns:
             columns.append((column.name, layout.FC(f"row.{column.column}"), None))
 
         return hg.BaseElement(
@@ -31,6 +144,111 @@ class Report(models.Model):
             ),
         )
 
+    def aggregate(self, reportcolumns=None):
+        """
+        Calculates the aggregations of the columns in the database. Columns without
+        aggregation are used to group the rows, like in an SQL GROUP BY clause. If
+        all columns have an aggregation the result is a single row.
+        Returns a queryset (or list) of dicts with the values under ReportColumn.resultkey
+        """
+        reportcolumns = reportcolumns or list(self.columns.all())
+        self.check_aggregation(reportcolumns)
+        queryset = self.filter.queryset.order_by()
+        aggregations = {
+            column.resultkey: ReportColumn.AGGREGATION_FUNCTIONS[column.aggregation](
+                column.lookup
+            )
+            for column in reportcolumns
+            if column.aggregation
+        }
+        groups = {
+            column.resultkey: models.F(column.lookup)
+            for column in reportcolumns
+            if not column.aggregation
+        }
+        if not groups:
+            return [queryset.aggregate(**aggregations)]
+        return (
+            queryset.values(**groups)
+            .annotate(**aggregations)
+            .order_by(
+                *[column.lookup for column in reportcolumns if not column.aggregation]
+            )
+        )
+
+    def check_aggregation(self, reportcolumns):
+        """
+        Raises a ValidationError if the columns cannot be aggregated correctly in
+        the database: all columns need to be database fields and every join of a
+        to-many relationship multiplies the rows of the model. Aggregations are
+        therefore only possible along a single chain of to-many relationships and
+        the aggregated columns must use the deepest of them, unless the rows are
+        grouped by a column of it.
+        """
+        model = self.model.model_class()
+        joins = {}
+        for column in reportcolumns:
+            try:
+                joins[column] = _tomany_joins(model, column.lookup)
+            except FieldDoesNotExist:
+                raise ValidationError(
+                    _(
+                        "Column '%s' is not a database field and cannot be used in a report with aggregations"
+                    )
+                    % column.column
+                )
+        chain = sorted(set(itertools.chain(*joins.values())), key=len)
+        for join, nextjoin in zip(chain, chain[1:]):
+            if not nextjoin.startswith(join + models.constants.LOOKUP_SEP):
+                raise ValidationError(
+                    _("Aggregations cannot combine the relationships '%s' and '%s'")
+                    % (join, nextjoin)
+                )
+        groupjoins = {
+            join
+            for column in reportcolumns
+            if not column.aggregation
+            for join in joins[column]
+        }
+        if not chain or chain[-1] in groupjoins:
+            return
+        for column in reportcolumns:
+            if column.aggregation and chain[-1] not in joins[column]:
+                raise ValidationError(
+                    _(
+                        "Column '%(column)s' would be aggregated multiple times per row because of the relationship '%(relationship)s'"
+                    )
+                    % {"column": column.column, "relationship": chain[-1]}
+                )
+
+    def exportdata(self):
+        """
+        Returns the rows and columns for bread.utils.exportresponse (with raw=True),
+        aggregated reports are calculated in the database, other reports are read
+        from the snapshot if the report uses a fresh snapshot
+        """
+        from .snapshots import snapshotrows
+
+        reportcolumns = list(self.columns.all())
+        if any(column.aggregation for column in reportcolumns):
+            columns = {
+                column.name: lambda row, key=column.resultkey: row[key]
+                for column in reportcolumns
+            }
+            return self.aggregate(reportcolumns), columns
+        rows = snapshotrows(self, reportcolumns)
+        if rows is not None:
+            columns = {
+                column.name: lambda row, i=i: row[i]
+                for i, column in enumerate(reportcolumns)
+            }
+            return rows, columns
+        columns = {
+            column.name: lambda row, c=column.column: rawvalue(row, c)
+            for column in reportcolumns
+        }
+        return self.filter.queryset.iterator(), columns
+
     def __str__(self):
         return self.name
 
@@ -42,8 +260,12 @@ class Report(models.Model):
 
 class ReportColumn(models.Model):
     AGGREGATIONS = {
-        "count": "",
-        "sum": "",
+        "count": _("Count"),
+        "sum": _("Sum"),
+    }
+    AGGREGATION_FUNCTIONS = {
+        "count": models.Count,
+        "sum": models.Sum,
     }
     report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name="columns")
     column = models.CharField(_("Column"), max_length=255)
@@ -51,3 +273,85 @@ class ReportColumn(models.Model):
     aggregation = models.CharField(
         _("Aggregation"), max_length=64, choices=tuple(AGGREGATIONS.items()), blank=True
     )
+
+    @property
+    def lookup(self):
+        """The column as django lookup, e.g. "publisher.name" -> publisher__name"""
+        parts = self.column.split(".")
+        if parts[-1] == "all":  # e.g. "authors.all"
+            parts = parts[:-1]
+        return models.constants.LOOKUP_SEP.join(parts)
+
+    @property
+    def resultkey(self):
+        """Name of the column in the results of Report.aggregate"""
+        return f"column_{self.pk}"
+
+
+class ReportSnapshot(models.Model):
+    """Stored column values of a report, see .snapshots"""
+
+    report = models.OneToOneField(
+        Report, on_delete=models.CASCADE, related_name="snapshot"
+    )
+    refreshed = models.DateTimeField(_("Refreshed"), null=True, blank=True)
+    rebuilt = models.DateTimeField(_("Rebuilt"), null=True, blank=True)
+    definition = models.CharField(max_length=40, blank=True)
+    watermark = models.TextField(blank=True)
+
+    def __str__(self):
+        return str(self.report)
+
+
+class ReportSnapshotRow(models.Model):
+    snapshot = models.ForeignKey(
+        ReportSnapshot, on_delete=models.CASCADE, related_name="rows"
+    )
+    object_pk = models.CharField(max_length=255)
+    values = models.TextField()  # json encoded list, see .snapshots.encodevalue
+
+    class Meta:
+        unique_together = [("snapshot", "object_pk")]
+
+
+class ReportExport(models.Model):
+    """A report export which is generated in the background, see .tasks"""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATES = (
+        (PENDING, _("Pending")),
+        (RUNNING, _("Running")),
+        (DONE, _("Done")),
+        (FAILED, _("Failed")),
+    )
+
+    report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name="exports")
+    report.verbose_name = _("Report")
+    created = models.DateTimeField(_("Created"), auto_now_add=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    user.verbose_name = _("User")
+    format = models.CharField(_("Format"), max_length=32, default="xlsx")
+    status = models.CharField(
+        _("Status"), max_length=32, choices=STATES, default=PENDING
+    )
+    progress = models.PositiveIntegerField(_("Exported rows"), default=0)
+    total = models.PositiveIntegerField(_("Total rows"), null=True, blank=True)
+    file = models.FileField(_("File"), upload_to="reports/exports/", blank=True)
+    error = models.TextField(_("Error"), blank=True)
+
+    @property
+    def finished(self):
+        return self.status in (ReportExport.DONE, ReportExport.FAILED)
+
+    def __str__(self):
+        return f"{self.report} ({self.created:%Y-%m-%d %H:%M}, {self.format})"
+
+    class Meta:
+        verbose_name = _("Report export")
+        verbose_name_plural = _("Report exports")
+        ordering = ["-created"]
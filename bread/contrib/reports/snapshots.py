@@ -0,0 +1,184 @@
+import datetime
+import decimal
+import hashlib
+import json
+import uuid
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+
+import bread.settings as app_settings
+from bread.utils import excelvalue, rawvalue
+
+from .models import ReportSnapshot, ReportSnapshotRow
+
+CHUNK_SIZE = 2000  # rows which are loaded and written at once during a refresh
+
+# json can only store strings and numbers, other types are stored as [tag, value]
+_ENCODERS = (
+    (datetime.datetime, "datetime", lambda v: v.isoformat()),
+    (datetime.date, "date", lambda v: v.isoformat()),
+    (datetime.time, "time", lambda v: v.isoformat()),
+    (datetime.timedelta, "timedelta", lambda v: v.total_seconds()),
+    (decimal.Decimal, "decimal", str),
+    (uuid.UUID, "uuid", str),
+)
+_DECODERS = {
+    "datetime": datetime.datetime.fromisoformat,
+    "date": datetime.date.fromisoformat,
+    "time": datetime.time.fromisoformat,
+    "timedelta": lambda v: datetime.timedelta(seconds=v),
+    "decimal": decimal.Decimal,
+    "uuid": uuid.UUID,
+}
+
+
+def encodevalue(value):
+    for type_, tag, encode in _ENCODERS:
+        if isinstance(value, type_):
+            return [tag, encode(value)]
+    return value
+
+
+def decodevalue(value):
+    if isinstance(value, list):
+        return _DECODERS[value[0]](value[1])
+    return value
+
+
+def _definition(report, reportcolumns):
+    return hashlib.sha1(  # nosec because only used to detect changes
+        json.dumps(
+            [
+                report.model_id,
+                str(report.filter),
+                report.snapshot_timestampfield,
+                [column.column for column in reportcolumns],
+            ]
+        ).encode()
+    ).hexdigest()
+
+
+def snapshotrows(report, reportcolumns=None):
+    """
+    Returns an iterator over the rows of the snapshot (lists with the values of
+    the columns) if the report uses a snapshot and the snapshot is fresh, i.e. it
+    has been refreshed in the last REPORT_SNAPSHOT_MAX_AGE seconds and the filter
+    and columns have not changed since then. Returns None otherwise.
+    """
+    if not report.use_snapshot:
+        return None
+    reportcolumns = reportcolumns or list(report.columns.all())
+    snapshot = ReportSnapshot.objects.filter(report=report).first()
+    maxage = getattr(
+        settings, "REPORT_SNAPSHOT_MAX_AGE", app_settings.REPORT_SNAPSHOT_MAX_AGE
+    )
+    if (
+        snapshot is None
+        or snapshot.refreshed is None
+        or snapshot.refreshed < timezone.now() - datetime.timedelta(seconds=maxage)
+        or snapshot.definition != _definition(report, reportcolumns)
+    ):
+        return None
+    return (
+        [decodevalue(value) for value in json.loads(values)]
+        for values in snapshot.rows.order_by("id")
+        .values_list("values", flat=True)
+        .iterator()
+    )
+
+
+def _needs_rebuild(report, snapshot, definition):
+    if snapshot.definition != definition or snapshot.rebuilt is None:
+        return True
+    # without timestamp field only auto-incremented primary keys show new rows
+    if not report.snapshot_timestampfield and not isinstance(
+        report.model.model_class()._meta.pk, models.AutoField
+    ):
+        return True
+    rebuildage = getattr(
+        settings,
+        "REPORT_SNAPSHOT_REBUILD_AGE",
+        app_settings.REPORT_SNAPSHOT_REBUILD_AGE,
+    )
+    return snapshot.rebuilt < timezone.now() - datetime.timedelta(seconds=rebuildage)
+
+
+def refresh_snapshot(report):
+    """
+    Updates the snapshot of the report. If the filter or the columns have changed
+    or the last complete rebuild is older than REPORT_SNAPSHOT_REBUILD_AGE seconds
+    the snapshot is rebuilt. Otherwise only rows which are newer than the last
+    refresh are evaluated again: rows with a snapshot_timestampfield greater or
+    equal than the last seen value or, without timestamp field, rows with a greater
+    auto-incremented primary key (in that case changes to existing rows are only
+    detected by the next rebuild). Models with other primary keys and without
+    timestamp field are rebuilt on every refresh.
+    Rows which have been deleted or do not match the filter anymore are removed.
+    """
+    reportcolumns = list(report.columns.all())
+    definition = _definition(report, reportcolumns)
+    watermarkfield = report.snapshot_timestampfield or "pk"
+    queryset = report.filter.queryset
+
+    with transaction.atomic():
+        snapshot, created = ReportSnapshot.objects.select_for_update().get_or_create(
+            report=report
+        )
+        watermark = decodevalue(json.loads(snapshot.watermark or "null"))
+        if _needs_rebuild(report, snapshot, definition):
+            snapshot.rows.all().delete()
+            snapshot.rebuilt = timezone.now()
+            watermark = None
+        else:
+            current = {str(pk) for pk in queryset.values_list("pk", flat=True)}
+            stale = [
+                pk
+                for pk in snapshot.rows.values_list("object_pk", flat=True)
+                if pk not in current
+            ]
+            for i in range(0, len(stale), CHUNK_SIZE):
+                snapshot.rows.filter(object_pk__in=stale[i : i + CHUNK_SIZE]).delete()
+
+        changed = queryset
+        if watermark is not None:
+            lookup = "gte" if report.snapshot_timestampfield else "gt"
+            changed = changed.filter(**{f"{watermarkfield}__{lookup}": watermark})
+
+        chunk = []
+        for obj in changed.iterator(chunk_size=CHUNK_SIZE):
+            value = getattr(obj, watermarkfield)
+            if value is not None and (watermark is None or value > watermark):
+                watermark = value
+            chunk.append(obj)
+            if len(chunk) == CHUNK_SIZE:
+                _writerows(snapshot, chunk, reportcolumns)
+                chunk = []
+        _writerows(snapshot, chunk, reportcolumns)
+
+        snapshot.definition = definition
+        snapshot.watermark = json.dumps(encodevalue(watermark))
+        snapshot.refreshed = timezone.now()
+        snapshot.save()
+    return snapshot
+
+
+def _writerows(snapshot, objects, reportcolumns):
+    rows = {
+        str(obj.pk): json.dumps(
+            [
+                encodevalue(excelvalue(rawvalue(obj, column.column)))
+                for column in reportcolumns
+            ]
+        )
+        for obj in objects
+    }
+    existing = list(snapshot.rows.filter(object_pk__in=rows.keys()))
+    for row in existing:
+        row.values = rows.pop(row.object_pk)
+    ReportSnapshotRow.objects.bulk_update(existing, ["values"])
+    ReportSnapshotRow.objects.bulk_create(
+        ReportSnapshotRow(snapshot=snapshot, object_pk=pk, values=values)
+        for pk, values in rows.items()
+    )
@@ -0,0 +1,107 @@
+import datetime
+import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import connections, transaction
+
+import bread.settings as app_settings
+from bread.utils import exportresponse
+
+from .models import ReportExport
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_INTERVAL = 1000  # rows between two progress updates in the database
+
+
+def _with_progress(export, rows):
+    for i, row in enumerate(rows, 1):
+        if i % PROGRESS_INTERVAL == 0:
+            ReportExport.objects.filter(pk=export.pk).update(progress=i)
+        yield row
+
+
+def export_report(export_pk):
+    """Generates the file of a ReportExport and saves it to the storage"""
+    export = ReportExport.objects.select_related("report").get(pk=export_pk)
+    report = export.report
+    try:
+        rows, columns = report.exportdata()
+        export.total = report.filter.queryset.count()
+        export.status = ReportExport.RUNNING
+        export.save(update_fields=["status", "total"])
+        title = report.name + f"-{datetime.date.today().isoformat()}"
+        response = exportresponse(
+            export.format,
+            _with_progress(export, rows),
+            columns,
+            title,
+            raw=True,
+        )
+        with tempfile.TemporaryFile() as file:
+            for chunk in response.streaming_content:
+                file.write(chunk)
+            response.close()
+            export.file.save(f"{title}.{export.format}", File(file), save=False)
+        export.progress = export.total
+        export.status = ReportExport.DONE
+    except ValidationError as e:
+        export.status = ReportExport.FAILED
+        export.error = " ".join(e.messages)
+    except Exception as e:
+        logger.exception(f"Export {export.pk} of report {report.pk} failed")
+        export.status = ReportExport.FAILED
+        export.error = str(e)
+    export.save(update_fields=["file", "progress", "status", "error"])
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _run_in_thread(export_pk):
+    try:
+        export_report(export_pk)
+    finally:
+        # threads of the pool are not managed by django, the connections of the
+        # thread would otherwise stay open
+        connections.close_all()
+
+
+def enqueue_export(export):
+    """
+    Runs export_report for the given ReportExport after the current transaction
+    has been committed. If a celery broker is configured (CELERY_BROKER_URL) the
+    export is sent to a celery worker, otherwise it runs in a thread pool of the
+    current process with REPORT_EXPORT_WORKERS threads.
+    """
+    global _executor
+
+    if getattr(settings, "CELERY_BROKER_URL", None):
+        transaction.on_commit(lambda: export_report_task.delay(export.pk))
+        return
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(
+                    settings,
+                    "REPORT_EXPORT_WORKERS",
+                    app_settings.REPORT_EXPORT_WORKERS,
+                ),
+                thread_name_prefix="reportexport",
+            )
+        executor = _executor
+    transaction.on_commit(lambda: executor.submit(_run_in_thread, export.pk))
+
+
+try:
+    from celery import shared_task
+except ImportError:  # the thread pool is used if celery cannot be loaded
+    export_report_task = None
+else:
+    export_report_task = shared_task(export_report, name="reports.export_report")
@@ -1,19 +1,35 @@
 import datetime
 
 import htmlgenerator as hg
-from django.shortcuts import get_object_or_404
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    JsonResponse,
+)
+from django.shortcuts import get_object_or_404, redirect
 from django.urls import path
+from django.utils.cache import patch_cache_control
 from django.utils.translation import gettext_lazy as _
+from django.views.decorators.http import condition, require_POST
 from django.views.generic import TemplateView
+from guardian.shortcuts import assign_perm
 
 from bread import layout as _layout
 from bread import menu, views
-from bread.utils import generate_excel, urls, xlsxresponse
+from bread.utils import EXPORT_BACKENDS, exportresponse, has_permission, urls
 
-from .models import Report
+from .fields.queryfield import queryschema
+from .models import Report, ReportExport
+from .tasks import enqueue_export
 
 
 class EditView(views.EditView):
+    cache_layout = True
+
     def layout(self, request):
         F = _layout.form.FormField
         R = _layout.grid.Row
@@ -47,12 +63,14 @@ class EditView(views.EditView):
                     ),
                     F("name"),
                     F("filter"),
+                    R(C(F("use_snapshot")), C(F("snapshot_timestampfield"))),
                     hg.H4(_("Columns")),
                     _layout.form.FormsetField(
                         "columns",
                         R(
                             C(F("column")),
                             C(F("name")),
+                            C(F("aggregation")),
                             C(
                                 _layout.form.InlineDeleteButton(".bx--row"),
                                 style="align-self: center",
@@ -70,64 +88,236 @@ class EditView(views.EditView):
 
 def exceldownload(request, report_pk: int):
     report = get_object_or_404(Report, pk=report_pk)
-    columns = {
-        column.name: lambda row, c=column.column: hg.resolve_lookup(row, c) or ""
-        for column in report.columns.all()
-    }
+    exportformat = request.GET.get("format", "xlsx")
+    if exportformat not in EXPORT_BACKENDS:
+        return HttpResponseBadRequest("Unknown export format")
+    try:
+        rows, columns = report.exportdata()
+    except ValidationError as e:
+        return HttpResponseBadRequest(" ".join(e.messages))
+
+    return exportresponse(
+        exportformat,
+        rows,
+        columns,
+        report.name + f"-{datetime.date.today().isoformat()}",
+        raw=True,
+    )
+
+
+def _grant_export_permissions(export):
+    # the exports are listed with object permissions, the creator needs them in
+    # order to see and download the export without the global view permission
+    for perm in ("reports.view_reportexport", "reports.delete_reportexport"):
+        assign_perm(perm, export.user, export)
+
+
+class ExportAddView(views.AddView):
+    fields = ["report", "format"]
+
+    def form_valid(self, form):
+        if form.cleaned_data["format"] not in EXPORT_BACKENDS:
+            form.add_error(
+                "format",
+                _("Available formats: %s") % ", ".join(EXPORT_BACKENDS),
+            )
+            return self.form_invalid(form)
+        if not has_permission(self.request.user, "view", form.cleaned_data["report"]):
+            form.add_error("report", _("No permission to view this report"))
+            return self.form_invalid(form)
+        form.instance.user = self.request.user
+        response = super().form_valid(form)
+        _grant_export_permissions(self.object)
+        enqueue_export(self.object)
+        return response
+
+    def get_success_url(self):
+        return urls.reverse_model(ReportExport, "browse")
+
+
+@require_POST
+def startexport(request, report_pk: int):
+    """Starts a background export of the report and redirects to the list of exports"""
+    report = get_object_or_404(Report, pk=report_pk)
+    if not has_permission(request.user, "view", report):
+        raise PermissionDenied()
+    exportformat = request.POST.get("format", "xlsx")
+    if exportformat not in EXPORT_BACKENDS:
+        return HttpResponseBadRequest("Unknown export format")
+    export = ReportExport.objects.create(
+        report=report, user=request.user, format=exportformat
+    )
+    _grant_export_permissions(export)
+    enqueue_export(export)
+    return redirect(urls.reverse_model(ReportExport, "browse"))
 
-    workbook = generate_excel(report.filter.queryset, columns)
-    workbook.title = report.name
 
-    return xlsxresponse(
-        workbook, workbook.title + f"-{datetime.date.today().isoformat()}"
+def _get_export(request, export_pk):
+    export = get_object_or_404(ReportExport, pk=export_pk)
+    if export.user != request.user and not request.user.has_perm(
+        "reports.view_reportexport"
+    ):
+        raise Http404()
+    return export
+
+
+def exportstatus(request, export_pk: int):
+    export = _get_export(request, export_pk)
+    return JsonResponse(
+        {
+            "status": export.status,
+            "progress": export.progress,
+            "total": export.total,
+            "error": export.error,
+            "download": urls.reverse_model(
+                ReportExport, "download", kwargs={"export_pk": export.pk}
+            )
+            if export.status == ReportExport.DONE
+            else None,
+        }
     )
 
 
+def exportdownload(request, export_pk: int):
+    export = _get_export(request, export_pk)
+    if export.status != ReportExport.DONE or not export.file:
+        raise Http404()
+    return FileResponse(
+        export.file.open("rb"),
+        as_attachment=True,
+        filename=export.file.name.rsplit("/", 1)[-1],
+    )
+
+
+def _schemamodel(request, contenttype_pk):
+    try:
+        model = ContentType.objects.get_for_id(contenttype_pk).model_class()
+    except ContentType.DoesNotExist:
+        raise Http404()
+    if model is None:
+        raise Http404()
+    if not has_permission(request.user, "view", model):
+        raise PermissionDenied()
+    return model
+
+
+@condition(
+    etag_func=lambda request, contenttype_pk: queryschema(
+        _schemamodel(request, contenttype_pk)
+    )[1]
+)
+def queryschemaview(request, contenttype_pk: int):
+    """The djangoql schema for the report filter editor"""
+    response = HttpResponse(
+        queryschema(_schemamodel(request, contenttype_pk))[0],
+        content_type="application/json",
+    )
+    patch_cache_control(response, private=True, max_age=3600)
+    return response
+
+
+ReportBrowseView = views.BrowseView._with(
+    columns=["name", "created"],
+    rowclickaction="read",
+    bulkactions=[
+        menu.Link(
+            urls.reverse_model(Report, "bulkdelete"),
+            icon="trash-can",
+        ),
+        menu.Link(urls.reverse_model(Report, "bulkcopy"), icon="copy"),
+    ],
+    rowactions=[
+        menu.Action(
+            js=hg.BaseElement(
+                "document.location = '",
+                hg.F(
+                    lambda c, e: urls.reverse_model(
+                        Report, "excel", kwargs={"report_pk": c["row"].pk}
+                    )
+                ),
+                "'",
+            ),
+            icon="download",
+            label=_("Excel"),
+        ),
+        menu.Action(
+            js=hg.BaseElement(
+                "submitpost('",
+                hg.F(
+                    lambda c, e: urls.reverse_model(
+                        Report, "export", kwargs={"report_pk": c["row"].pk}
+                    )
+                ),
+                "', '",
+                hg.C("csrf_token"),
+                "')",
+            ),
+            icon="time",
+            label=_("Export in background"),
+        ),
+    ],
+)
+
 urlpatterns = [
     *urls.default_model_paths(
         Report,
+        browseview=ReportBrowseView,
+        addview=views.AddView._with(fields=["model"]),
+        editview=EditView,
+        readview=EditView,
+    ),
+    urls.generate_path(
+        views.BulkDeleteView.as_view(model=Report, browseview=ReportBrowseView),
+        urls.model_urlname(Report, "bulkdelete"),
+    ),
+    urls.generate_path(
+        views.generate_bulkcopyview(Report, browseview=ReportBrowseView),
+        urls.model_urlname(Report, "bulkcopy"),
+    ),
+    urls.generate_path(
+        exceldownload,
+        urls.model_urlname(Report, "excel"),
+    ),
+    urls.generate_path(
+        startexport,
+        urls.model_urlname(Report, "export"),
+    ),
+    *urls.default_model_paths(
+        ReportExport,
         browseview=views.BrowseView._with(
-            columns=["name", "created"],
-            rowclickaction="read",
-            bulkactions=[
-                menu.Link(
-                    urls.reverse_model(Report, "bulkdelete"),
-                    icon="trash-can",
-                ),
-                menu.Link(urls.reverse_model(Report, "bulkcopy"), icon="copy"),
-            ],
+            columns=["report", "created", "format", "status", "progress", "total"],
             rowactions=[
                 menu.Action(
                     js=hg.BaseElement(
                         "document.location = '",
                         hg.F(
                             lambda c, e: urls.reverse_model(
-                                Report, "excel", kwargs={"report_pk": c["row"].pk}
+                                ReportExport,
+                                "download",
+                                kwargs={"export_pk": c["row"].pk},
                             )
                         ),
                         "'",
                     ),
                     icon="download",
-                    label=_("Excel"),
+                    label=_("Download"),
                 ),
             ],
         ),
-        addview=views.AddView._with(fields=["model"]),
-        editview=EditView,
-        readview=EditView,
+        readview=None,
+        editview=None,
+        addview=ExportAddView,
+        copyview=None,
     ),
     urls.generate_path(
-        views.BulkDeleteView.as_view(model=Report),
-        urls.model_urlname(Report, "bulkdelete"),
+        exportstatus,
+        urls.model_urlname(ReportExport, "status"),
     ),
     urls.generate_path(
-        views.generate_bulkcopyview(Report),
-        urls.model_urlname(Report, "bulkcopy"),
-    ),
-    urls.generate_path(
-        exceldownload,
-        urls.model_urlname(Report, "excel"),
+        exportdownload,
+        urls.model_urlname(ReportExport, "download"),
     ),
+    urls.generate_path(queryschemaview, "queryschema"),
     path(
         "reporthelp/",
         TemplateView.as_view(template_name="djangoql/syntax_help.html"),
@@ -141,3 +331,9 @@ menu.registeritem(
         menu.Group(_("Reports"), icon="download"),
     )
 )
+menu.registeritem(
+    menu.Item(
+        menu.Link(urls.reverse_model(ReportExport, "browse"), label=_("Exports")),
+        menu.Group(_("Reports"), icon="download"),
+    )
+)
@@ -1,4 +1,5 @@
 import datetime
+import functools
 import numbers
 from collections.abc import Iterable
 
@@ -18,6 +19,14 @@ import bread.settings as app_settings
 
 from . import layout
 from .models import AccessConcreteInstanceMixin
+from .utils.files import file_exists
+from .utils.thumbnails import (
+    THUMBNAIL_OPTIONS,
+    enqueue_thumbnail,
+    existing_thumbnail,
+    generate_thumbnail,
+    thumbnail_placeholder_url,
+)
 from .utils.urls import reverse_model
 
 
@@ -53,40 +62,99 @@ def format_value(value, fieldtype=None):
     """Renders a python value in a nice way in HTML. If a field-definition has an attribute "renderer" set, that function will be used to render the value"""
     if hasattr(fieldtype, "renderer"):
         return fieldtype.renderer(value)
-
     if isinstance(value, bool) or value is None:
         return CONSTANTS[value]
+    key = (type(value), fieldtype.__class__)
+    formatter = _RESOLVED_FORMATTERS.get(key)
+    if formatter is None:
+        formatter = _RESOLVED_FORMATTERS[key] = _resolve_formatter(*key)
+    return formatter(value)
+
+
+@functools.singledispatch
+def format_by_type(value):
+    """
+    Formats a value depending on its type, after the field specific formatting of
+    MODELFIELD_FORMATING_HELPERS has been applied. Use register_formatter to add
+    formatters for additional types.
+    """
+    return value
+
+
+def register_formatter(valuetype, func=None):
+    """
+    Registers a formatter for values of type valuetype (and subclasses), can be
+    used as decorator, like functools.singledispatch.register
+    """
+    if func is None:
+        return lambda func: register_formatter(valuetype, func)
+    format_by_type.register(valuetype, func)
+    _RESOLVED_FORMATTERS.clear()
+    return func
+
+
+def register_fieldformatter(fieldclass, func):
+    """
+    Registers a formatter for values of model fields of type fieldclass.
+    Changes to MODELFIELD_FORMATING_HELPERS after values have been formatted
+    need to be made with this function in order to reset the cached formatters.
+    """
+    MODELFIELD_FORMATING_HELPERS[fieldclass] = func
+    _RESOLVED_FORMATTERS.clear()
 
-    # make referencing fields iterable (normaly RelatedManagers)
-    if isinstance(value, models.Manager):
-        value = value.all()
 
-    # If there is a hint passed via fieldtype, use the accoring conversion function first (identity otherwise)
+# (value type, field class) -> formatter, see format_value
+_RESOLVED_FORMATTERS = {}
+
+
+def _resolve_formatter(valuetype, fieldclass):
+    # If there is a hint passed via fieldtype, use the accoring conversion function first
     # This is mostly helpfull for string-based fields like URLS, emails etc.
-    value = MODELFIELD_FORMATING_HELPERS.get(fieldtype.__class__, lambda a: a)(value)
+    fieldformatter = MODELFIELD_FORMATING_HELPERS.get(fieldclass)
 
-    if isinstance(value, bool) or value is None:
-        return CONSTANTS[value]
-    if isinstance(value, datetime.timedelta):
-        return as_duration(value)
-    if isinstance(value, datetime.datetime):
-        return as_datetime(value)
-    if isinstance(value, numbers.Number):
-        return f"{value:f}".rstrip("0").rstrip(".")
-    if isinstance(value, models.fields.files.ImageFieldFile):
-        return as_image(value)
-    if isinstance(value, models.fields.files.FieldFile):
-        return as_download(value)
-    if isinstance(value, Iterable) and not isinstance(value, (str, bytes, Promise)):
-        return as_list(value)
-    if isinstance(value, models.Model):
-        try:
-            return as_object_link(value)
-        except NoReverseMatch:
-            return value
+    # make referencing fields iterable (normaly RelatedManagers)
+    if issubclass(valuetype, models.Manager):
+        if fieldformatter is None:
+            return lambda value: _format_by_type(value.all())
+        return lambda value: _format_by_type(fieldformatter(value.all()))
+    if fieldformatter is None:
+        if issubclass(valuetype, Promise):
+            return _format_string
+        return format_by_type.dispatch(valuetype)
+    return lambda value: _format_by_type(fieldformatter(value))
+
+
+def _format_by_type(value):
+    # lazy strings implement __iter__ and would be dispatched to Iterable
+    if isinstance(value, Promise):
+        return value
+    return format_by_type.dispatch(type(value))(value)
+
+
+@format_by_type.register(bool)
+@format_by_type.register(type(None))
+def _format_constant(value):
+    return CONSTANTS[value]
+
+
+@format_by_type.register(str)
+@format_by_type.register(bytes)
+def _format_string(value):
     return value
 
 
+@format_by_type.register(models.Model)
+def _format_model(value):
+    try:
+        return as_object_link(value)
+    except NoReverseMatch:
+        return value
+
+
+def _format_number(value):
+    return f"{value:f}".rstrip("0").rstrip(".")
+
+
 # Formatting functions: never pass None, always return string
 
 
@@ -136,7 +204,7 @@ def as_richtext(value):
 def as_download(value):
     if not value:
         return CONSTANTS[None]
-    if not value.storage.exists(value.name):
+    if not file_exists(value):
         return mark_safe("<small><emph>File not found</emph></small>")
     return mark_safe(
         hg.render(
@@ -159,11 +227,21 @@ def as_download(value):
 def as_image(value):
     if not value:
         return CONSTANTS[None]
-    if not value.storage.exists(value.name):
+    if not file_exists(value):
         return mark_safe("<small><emph>Image not found</emph></small>")
-    from easy_thumbnails.files import get_thumbnailer
-
-    im = get_thumbnailer(value).get_thumbnail({"size": (100, 100), "quality": 75})
+    im = existing_thumbnail(value)
+    if im is None and value.instance.pk is not None and enqueue_thumbnail(value):
+        # the browser loads the thumbnail when it is needed, see views.thumbnail
+        width, height = THUMBNAIL_OPTIONS["size"]
+        return format_html(
+            '<a class="center" href="{}"><img src={} width="{}" height="{}" loading="lazy"/></a>',
+            value.url,
+            thumbnail_placeholder_url(value),
+            width,
+            height,
+        )
+    if im is None:
+        im = generate_thumbnail(value)
     return format_html(
         '<a class="center" href="{}"><img src={} width="{}" height="{}"/></a>',
         value.url,
@@ -176,7 +254,7 @@ def as_image(value):
 def as_audio(value):
     if not value:
         return CONSTANTS[None]
-    if not value.storage.exists(value.name):
+    if not file_exists(value):
         return mark_safe("<small><emph>Audio file not found</emph></small>")
     return format_html(
         """
@@ -191,7 +269,7 @@ def as_audio(value):
 def as_video(value):
     if not value:
         return CONSTANTS[None]
-    if not value.storage.exists(value.name):
+    if not file_exists(value):
         return mark_safe("<small><emph>Video file not found</emph></small>")
     return format_html(
         """
@@ -237,3 +315,10 @@ CONSTANTS = {
     True: getattr(settings, "HTML_TRUE", app_settings.HTML_TRUE),
     False: getattr(settings, "HTML_FALSE", app_settings.HTML_FALSE),
 }
+
+register_formatter(datetime.timedelta, as_duration)
+register_formatter(datetime.datetime, as_datetime)
+register_formatter(numbers.Number, _format_number)
+register_formatter(models.fields.files.ImageFieldFile, as_image)
+register_formatter(models.fields.files.FieldFile, as_download)
+register_formatter(Iterable, as_list)
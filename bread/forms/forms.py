@@ -1,3 +1,6 @@
+import collections
+import threading
+
 import htmlgenerator as hg
 from django import forms
 from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
@@ -27,19 +30,88 @@ def generate_form(request, model, layout, instance, **kwargs):
     )
 
 
+_FORMCLASS_CACHE = collections.OrderedDict()
+_FORMCLASS_CACHE_LOCK = threading.Lock()
+FORMCLASS_CACHE_SIZE = 256
+
+
 def breadmodelform_factory(
     request, model, layout, instance=None, baseformclass=forms.models.ModelForm
 ):
-    """Returns a form class which can handle inline-modelform sets and generic foreign keys."""
+    """Returns a form class which can handle inline-modelform sets and generic foreign keys.
+    The form class is generated once per model, layout fields and base form class, request
+    and instance are only bound to it and applied when the form is instantiated."""
     formfieldelements = _get_form_fields_from_layout(layout)
+    try:
+        key = (model, baseformclass, _layout_signature(formfieldelements))
+    except TypeError:
+        # formset arguments which are not hashable, the form class is not cached
+        formclass = _generate_form_class(model, formfieldelements, baseformclass)
+        return _bind_formclass(formclass, request, instance)
+    with _FORMCLASS_CACHE_LOCK:
+        formclass = _FORMCLASS_CACHE.get(key)
+        if formclass is not None:
+            _FORMCLASS_CACHE.move_to_end(key)
+    if formclass is None:
+        formclass = _generate_form_class(model, formfieldelements, baseformclass)
+        with _FORMCLASS_CACHE_LOCK:
+            _FORMCLASS_CACHE[key] = formclass
+            while len(_FORMCLASS_CACHE) > FORMCLASS_CACHE_SIZE:
+                _FORMCLASS_CACHE.popitem(last=False)
+    return _bind_formclass(formclass, request, instance)
+
+
+def _layout_signature(formfieldelements):
+    """Hashable signature of the form fields, raises TypeError if there is none"""
+    return tuple(
+        (
+            f.fieldname,
+            _hashable(f.formsetfactory_kwargs),
+            _hashable(f.formsetinitial),
+            _layout_signature(_get_form_fields_from_layout(hg.BaseElement(*f))),
+        )
+        if isinstance(f, _layout.form.FormsetField)
+        else f.fieldname
+        for f in formfieldelements
+    )
+
+
+def _hashable(value):
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashable(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    hash(value)
+    return value
+
+
+def _bind_formclass(formclass, request, instance):
+    # type.__new__ is used directly, the metaclass of model forms would otherwise
+    # generate all form fields of the subclass again
+    return type.__new__(
+        type(formclass),
+        formclass.__name__,
+        (formclass,),
+        {
+            "__module__": formclass.__module__,
+            "__qualname__": formclass.__qualname__,
+            "_bread_request": request,
+            "_bread_instance": instance,
+        },
+    )
 
+
+def _generate_form_class(model, formfieldelements, baseformclass):
     class BreadModelFormBase(baseformclass):
         field_order = baseformclass.field_order or [
             f.fieldname for f in formfieldelements
         ]
+        _bread_request = None
+        _bread_instance = None
+        _bread_requestfields = ()
 
         def __init__(self, data=None, files=None, initial=None, **kwargs):
-            inst = kwargs.get("instance", instance)
+            inst = kwargs.get("instance", self._bread_instance)
             formsetinitial = {}
             for name, field in self.declared_fields.items():
                 if isinstance(field, FormsetField):
@@ -48,10 +120,6 @@ def breadmodelform_factory(
                     }
                 if isinstance(field, GenericForeignKeyField):
                     modelfield = model._meta.get_field(name)
-                    if hasattr(modelfield, "lazy_choices"):
-                        field.choices = GenericForeignKeyField.objects_to_choices(
-                            modelfield.lazy_choices(modelfield, request, inst)
-                        )
                     init = getattr(inst, modelfield.name, None)
                     if init:
                         formsetinitial[name] = GenericForeignKeyField.object_to_choice(
@@ -65,6 +133,9 @@ def breadmodelform_factory(
                 initial=formsetinitial,
                 **kwargs,
             )
+            # forms of unbound classes are only used internally, e.g. to check is_multipart
+            if self._bread_request is not None:
+                _apply_request(self, self._bread_request, inst)
 
         def save(self, *args, **kwargs):
             with transaction.atomic():
@@ -99,14 +170,12 @@ def breadmodelform_factory(
         ):
             attribs[modelfield.name] = FormsetField(
                 _generate_formset_class(
-                    request,
                     model,
                     modelfield,
                     baseformclass,
                     formfieldelement,
-                    instance,
                 ),
-                instance,
+                None,
                 formfieldelement.formsetinitial,
             )
     patched_formclass = type(
@@ -120,37 +189,77 @@ def breadmodelform_factory(
             for f in formfieldelements
             if isinstance(f, _layout.form.FormField)
         ],
-        formfield_callback=lambda field: _formfield_callback_with_request(
-            field, request, model, instance
-        ),
     )
+    # fields which are generated again for each form with the request and the instance
+    ret._bread_requestfields = [
+        name
+        for name, field in ret.base_fields.items()
+        if name not in ret.declared_fields and _is_request_dependent(model, name, field)
+    ]
     return ret
 
 
+def _apply_request(form, request, instance):
+    """Applies lazy choices, lazy initial values and permissions of the request to a form"""
+    model = form._meta.model
+    for name, field in form.fields.items():
+        if isinstance(field, FormsetField):
+            field.formsetclass = field.widget.formsetclass = type(
+                field.formsetclass.__name__,
+                (field.formsetclass,),
+                {"form": _bind_formclass(field.formsetclass.form, request, instance)},
+            )
+            field.parent_instance = field.widget.parent_instance = instance
+        if isinstance(field, GenericForeignKeyField):
+            modelfield = model._meta.get_field(name)
+            if hasattr(modelfield, "lazy_choices"):
+                field.choices = GenericForeignKeyField.objects_to_choices(
+                    modelfield.lazy_choices(modelfield, request, instance)
+                )
+    for name in form._bread_requestfields:
+        if name in form.fields:
+            formfield = _formfield_callback_with_request(
+                model._meta.get_field(name), request, model, instance
+            )
+            forms.models.apply_limit_choices_to_to_formfield(formfield)
+            form.fields[name] = formfield
+
+
+def _is_request_dependent(model, fieldname, formfield):
+    try:
+        modelfield = model._meta.get_field(fieldname)
+    except FieldDoesNotExist:
+        return False
+    return (
+        hasattr(modelfield, "lazy_choices")
+        or hasattr(modelfield, "lazy_initial")
+        or hasattr(formfield, "queryset")
+    )
+
+
 class InlineFormSetWithLimits(forms.BaseInlineFormSet):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        # by default show one empty form if there are no related objects yet,
+        # the queryset is evaluated once and reused for the forms
+        if self.extra is None:
+            self.extra = int(not self.get_queryset())
 
     def get_queryset(self):
-        self._queryset = super().get_queryset()[: self.max_num]
+        if not hasattr(self, "_queryset"):
+            self._queryset = super().get_queryset()[: self.max_num]
         return self._queryset
 
 
-def _generate_formset_class(
-    request, model, modelfield, baseformclass, formsetfieldelement, instance
-):
+def _generate_formset_class(model, modelfield, baseformclass, formsetfieldelement):
     """Returns a FormSet class which handles inline forms correctly."""
 
     formfieldelements = _get_form_fields_from_layout(
         hg.BaseElement(*formsetfieldelement)
     )  # make sure the _layout.form.FormsetField does not be considered recursively
 
-    formclass = breadmodelform_factory(
-        request=request,
-        model=modelfield.related_model,
-        layout=formfieldelements,
-        instance=instance,
-        baseformclass=baseformclass,
+    formclass = _generate_form_class(
+        modelfield.related_model, formfieldelements, baseformclass
     )
 
     base_formset_kwargs = {
@@ -158,7 +267,7 @@ def _generate_formset_class(
             formfieldelement.fieldname for formfieldelement in formfieldelements
         ],
         "form": formclass,
-        "extra": 1 - bool(getattr(instance, modelfield.name).count()),
+        "extra": None,
         "can_delete": True,
     }
     base_formset_kwargs.update(formsetfieldelement.formsetfactory_kwargs)
@@ -168,9 +277,6 @@ def _generate_formset_class(
             ct_field=modelfield.content_type_field_name,
             fk_field=modelfield.object_id_field_name,
             formset=InlineFormSetWithLimits,
-            formfield_callback=lambda field: _formfield_callback_with_request(
-                field, request, modelfield.related_model, instance
-            ),
             **base_formset_kwargs,
         )
     else:
@@ -178,9 +284,6 @@ def _generate_formset_class(
             model,
             modelfield.related_model,
             formset=InlineFormSetWithLimits,
-            formfield_callback=lambda field: _formfield_callback_with_request(
-                field, request, model, instance
-            ),
             fk_name=modelfield.field.name,
             **base_formset_kwargs,
         )
@@ -1,4 +1,8 @@
+import functools
+
 import htmlgenerator as hg
+from django.utils.functional import Promise
+from django.utils.html import conditional_escape
 
 from bread.utils import pretty_modelname, resolve_modellookup
 from bread.utils.urls import reverse_model
@@ -47,3 +51,209 @@ class FormattedContextValue(hg.ContextValue):
 
 
 FC = FormattedContextValue
+
+
+def compile_lookup(lookup):
+    """
+    Returns a function context -> value which resolves a lookup like hg.C(lookup).
+    Chains of plain attributes (e.g. "row.publisher.name") are resolved directly,
+    everything else (dict keys, indexes, method calls) falls back to hg.resolve_lookup
+    """
+    bits = lookup.split(".")
+
+    def accessor(context):
+        current = context.get(bits[0], _MISSING)
+        if current is _MISSING or callable(current):
+            return hg.resolve_lookup(context, lookup)
+        for i, bit in enumerate(bits[1:], 1):
+            if hasattr(current, "__getitem__"):
+                break
+            value = getattr(current, bit, _MISSING)
+            if value is _MISSING or callable(value):
+                break
+            current = value
+        else:
+            return current
+        return hg.resolve_lookup({"_": current}, ".".join(["_"] + bits[i:]))
+
+    return accessor
+
+
+_MISSING = object()
+
+
+def _is_static(value):
+    return isinstance(value, (str, int, float)) and not isinstance(value, Promise)
+
+
+def _render_value(value, context, element):
+    """Renders a child like hg.BaseElement.render_children"""
+    value = hg.resolve_lazy(value, context, element)
+    if isinstance(value, hg.BaseElement):
+        yield from value.render(context)
+    elif value is not None:
+        yield conditional_escape(value)
+
+
+def _compile_value(value, element):
+    """Compiles a leave of the tree, returns a function context -> strings"""
+    if type(value) in (hg.ContextValue, FormattedContextValue):
+        accessor = compile_lookup(value.value)
+        if type(value) is FormattedContextValue:
+            return lambda context: _render_value(
+                format_value(accessor(context)), context, element
+            )
+        return lambda context: _render_value(accessor(context), context, element)
+    if isinstance(value, hg.BaseElement):
+        return value.render
+    return lambda context: _render_value(value, context, element)
+
+
+def compile_element(element):
+    """
+    Converts the children of an element into a list of static strings and
+    functions context -> strings, see CompiledIterator. Plain HTML elements
+    are flattened, other elements keep their own render method.
+    """
+    parts = []
+    for child in element:
+        if child is None:
+            continue
+        if _is_static(child):
+            parts.append(str(conditional_escape(child)))
+        elif (
+            isinstance(child, hg.HTMLElement)
+            and type(child).render in (hg.HTMLElement.render, hg.VoidElement.render)
+            and child.lazy_attributes is None
+        ):
+            void = type(child).render is hg.VoidElement.render
+            attributes = _compile_attributes(child)
+            if all(isinstance(a, str) for a in attributes):
+                attrs = " ".join(a for a in attributes if a)
+                if void:
+                    parts.append(f"<{child.tag} {attrs} />")
+                else:
+                    parts.append(f"<{child.tag}{' ' if attrs else ''}{attrs}>")
+            else:
+                parts.append(functools.partial(_render_tag, child, void, attributes))
+            if not void:
+                parts.extend(compile_element(child))
+                parts.append(f"</{child.tag}>")
+        elif type(child) is hg.BaseElement:
+            parts.extend(compile_element(child))
+        else:
+            parts.append(_compile_value(child, element))
+
+    merged = []
+    for part in parts:
+        if isinstance(part, str) and merged and isinstance(merged[-1], str):
+            merged[-1] += part
+        else:
+            merged.append(part)
+    return merged
+
+
+def _compile_attributes(element):
+    """Static attributes are rendered, dynamic attributes become (key, parts, value)"""
+    attributes = []
+    for key, value in element.attributes.items():
+        if _is_static(value):
+            attributes.append(hg.flatattrs({key: value}, {}, element))
+        elif type(value) is hg.BaseElement:
+            attributes.append((key, compile_element(value), None))
+        else:
+            attributes.append((key, None, value))
+    return attributes
+
+
+def _render_tag(element, void, attributes, context):
+    attlist = []
+    for attribute in attributes:
+        if not isinstance(attribute, str):
+            key, parts, value = attribute
+            if parts is not None:
+                rendered = [
+                    chunk
+                    for part in parts
+                    for chunk in ((part,) if isinstance(part, str) else part(context))
+                ]
+                value = "".join(rendered) if rendered else None
+            attribute = hg.flatattrs({key: value}, context, element)
+        if attribute:
+            attlist.append(attribute)
+    attrs = " ".join(attlist)
+    if void:
+        yield f"<{element.tag} {attrs} />"
+    else:
+        yield f"<{element.tag}{' ' if attrs else ''}{attrs}>"
+
+
+@functools.lru_cache(maxsize=None)
+def compiler_is_compatible():
+    """
+    compile_element reproduces the output of htmlgenerator's HTML elements. This
+    renders a sample with and without compiling once per process, CompiledIterator
+    falls back to uncompiled rendering if an htmlgenerator version renders
+    differently.
+    """
+    content = hg.DIV(
+        "text <&>",
+        1,
+        1.5,
+        None,
+        hg.SPAN(
+            hg.C("row.name"),
+            _class="static",
+            data_name=hg.C("row.name"),
+            title=hg.BaseElement("name: ", hg.C("row.name")),
+            disabled=True,
+            hidden=False,
+        ),
+        hg.BR(),
+        hg.INPUT(type="text", value=hg.C("row.name")),
+        hg.BaseElement(FormattedContextValue("row.value")),
+        hg.If(hg.C("row.name"), "name"),
+        hg.DIV(lazy_attributes=hg.F(lambda c, e: {"data_index": c["row_index"]})),
+        hg.UL(hg.Iterator(hg.C("row.items"), "item", hg.LI(hg.C("item")))),
+        id=hg.F(lambda c, e: f"row-{c['row_index']}"),
+    )
+    rows = [
+        {"name": "<b>", "value": 1.5, "items": [1, "<i>"]},
+        {"name": "", "value": None, "items": []},
+    ]
+    return hg.render(CompiledIterator(rows, "row", content, check=False), {}) == (
+        hg.render(hg.Iterator(rows, "row", content), {})
+    )
+
+
+class CompiledIterator(hg.Iterator):
+    """
+    Renders like hg.Iterator but compiles the content on the first render into a
+    flat list of static strings and render functions, see compile_element.
+    Changes to the content after the first render are ignored.
+    check: render uncompiled if compiler_is_compatible fails
+    """
+
+    _compiled = None
+
+    def __init__(self, *args, check=True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.check = check
+
+    def render(self, context):
+        if self.check and not compiler_is_compatible():
+            yield from super().render(context)
+            return
+        if self._compiled is None:
+            self._compiled = compile_element(self)
+        parts = self._compiled
+        context = dict(context)
+        indexvariable = self.loopvariable + "_index"
+        for i, value in enumerate(hg.resolve_lazy(self.iterator, context, self)):
+            context[self.loopvariable] = value
+            context[indexvariable] = i
+            for part in parts:
+                if isinstance(part, str):
+                    yield part
+                else:
+                    yield from part(context)
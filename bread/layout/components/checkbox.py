@@ -1,6 +1,6 @@
 import htmlgenerator as hg
 
-from .helpers import REQUIRED_LABEL, ErrorList, HelperText, Label
+from .helpers import REQUIRED_LABEL, ErrorList, HelperText, Label, bindingcopy
 
 
 class Checkbox(hg.DIV):
@@ -23,16 +23,17 @@ class Checkbox(hg.DIV):
         super().__init__(self.label, **attributes)
 
     def render(self, context):
-        if self.boundfield.field.disabled:
-            self.label.attributes["_class"] += " bx--label--disabled"
-            self.input.attributes["disabled"] = True
-        if self.boundfield is not None:
-            self.label.attributes["_for"] = self.boundfield.id_for_label
-            self.label.append(self.boundfield.label)
-            if self.boundfield.field.required:
-                self.label.append(REQUIRED_LABEL)
-            if self.boundfield.help_text:
-                self.append(HelperText(self.boundfield.help_text))
-            if self.boundfield.errors:
-                self.append(ErrorList(self.boundfield.errors))
-        return super().render(context)
+        element = bindingcopy(self)
+        if element.boundfield.field.disabled:
+            element.label.attributes["_class"] += " bx--label--disabled"
+            element.input.attributes["disabled"] = True
+        if element.boundfield is not None:
+            element.label.attributes["_for"] = element.boundfield.id_for_label
+            element.label.append(element.boundfield.label)
+            if element.boundfield.field.required:
+                element.label.append(REQUIRED_LABEL)
+            if element.boundfield.help_text:
+                element.append(HelperText(element.boundfield.help_text))
+            if element.boundfield.errors:
+                element.append(ErrorList(element.boundfield.errors))
+        return super(Checkbox, element).render(context)
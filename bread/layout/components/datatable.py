@@ -4,13 +4,14 @@ from django.utils.translation import gettext_lazy as _
 
 from bread.menu import Action, Link
 from bread.utils import filter_fieldlist, pretty_modelname, resolve_modellookup
+from bread.utils.pagination import KeysetPaginator
 from bread.utils.urls import link_with_urlparameters, reverse_model
 
-from ..base import aslink_attributes, fieldlabel, objectaction
+from ..base import CompiledIterator, aslink_attributes, fieldlabel, objectaction
 from .button import Button
 from .icon import Icon
 from .overflow_menu import OverflowMenu
-from .pagination import Pagination
+from .pagination import KeysetPagination, Pagination
 from .search import Search
 
 
@@ -57,6 +58,28 @@ def sortinglink_for_column(orderingurlparameter, columnname):
     return aslink_attributes(hg.F(extractsortinglink))
 
 
+class RowValue(hg.Lazy):
+    """
+    Resolves a lazy value only once per row, the result is shared by all cells of
+    the row. The result is stored in the render context of the row.
+    """
+
+    def __init__(self, value, rowvariable="row"):
+        self.value = value
+        self.rowvariable = rowvariable
+        self.contextkey = f"_rowvalue_{id(self)}"
+
+    def resolve(self, context, element):
+        row = (id(context[self.rowvariable]), context.get(self.rowvariable + "_index"))
+        cached = context.get(self.contextkey)
+        if cached is None or cached[0] != row:
+            cached = context[self.contextkey] = (
+                row,
+                hg.resolve_lazy(self.value, context, element),
+            )
+        return cached[1]
+
+
 class DataTable(hg.BaseElement):
     SPACINGS = ["default", "compact", "short", "tall"]
 
@@ -68,6 +91,7 @@ class DataTable(hg.BaseElement):
         spacing="default",
         orderingurlparameter="ordering",
         zebra=False,
+        compiled=True,
     ):
         """columns: tuple(header_expression, row_expression, sortingname)
         row_iterator: python iterator of htmlgenerator.Lazy object which returns an iterator
@@ -76,6 +100,7 @@ class DataTable(hg.BaseElement):
         sortingname: value for the URL parameter 'orderingurlparameter', None if sorting is not allowed
         spacing: one of "default", "compact", "short", "tall"
         zebra: alternate row colors
+        compiled: render the rows with a CompiledIterator, the row template is compiled on the first render
         """
         if spacing not in DataTable.SPACINGS:
             raise ValueError(
@@ -110,7 +135,7 @@ class DataTable(hg.BaseElement):
 
             self.head.append(hg.TH(headcontent, **getattr(header, "td_attributes", {})))
 
-        self.iterator = hg.Iterator(
+        self.iterator = (CompiledIterator if compiled else hg.Iterator)(
             row_iterator,
             rowvariable,
             hg.TR(
@@ -152,7 +177,9 @@ class DataTable(hg.BaseElement):
         bulkactions: List of bread.menu.Action or bread.menu.Link instances
                      bread.menu.Link will send a post or a get (depending on its "method" attribute) to the target url
                      the sent data will be a form with the selected checkboxes as fields
-                     if the head-checkbox has been selected only that field will be selected
+                     if "select all matching items" has been checked the field "selected" has the
+                     value "all" and the search query and ordering of the current page are sent
+                     instead, see bread.views.browse.selected_objects
         toolbar_action_menus: list of tuples with (menuiconname, list_of_actions) where the items in list_of_actions must instances of bread.menu.Action
         """
         checkboxallid = f"datatable-check-{hg.html_id(self)}"
@@ -259,6 +286,24 @@ class DataTable(hg.BaseElement):
                             _(" items selected"),
                             _class="bx--batch-summary__para",
                         ),
+                        # let bulk actions use the search query instead of the ids of this page
+                        hg.DIV(
+                            hg.INPUT(
+                                data_select_all_matching=True,
+                                id=f"{checkboxallid}-matching",
+                                _class="bx--checkbox",
+                                type="checkbox",
+                            ),
+                            hg.LABEL(
+                                _("Select all matching items"),
+                                _for=f"{checkboxallid}-matching",
+                                _class="bx--checkbox-label",
+                            ),
+                            _class="bx--form-item bx--checkbox-wrapper",
+                            style="margin-left: 1rem",
+                        )
+                        if paginator is not None
+                        else "",
                         _class="bx--batch-summary",
                     ),
                     _class="bx--batch-actions",
@@ -300,7 +345,14 @@ class DataTable(hg.BaseElement):
             self,
             *(
                 [
-                    Pagination(
+                    KeysetPagination(
+                        paginator,
+                        pagination_options,
+                        cursor_urlparameter=page_urlparameter,
+                        itemsperpage_urlparameter=itemsperpage_urlparameter,
+                    )
+                    if isinstance(paginator, KeysetPaginator)
+                    else Pagination(
                         paginator,
                         pagination_options,
                         page_urlparameter=page_urlparameter,
@@ -346,15 +398,24 @@ class DataTable(hg.BaseElement):
         if addurl is None:
             addurl = reverse_model(model, "add", query=backquery)
 
+        # actions with permissions are only shown on rows where the user has them
+        permitted_rowactions = hg.F(
+            lambda c, e: [
+                action
+                for action in rowactions
+                if "request" not in c
+                or action.has_permission(c["request"], c[rowvariable])
+            ]
+        )
         if rowactions_dropdown:
             objectactions_menu = OverflowMenu(
-                rowactions,
+                permitted_rowactions,
                 flip=True,
                 item_attributes={"_class": "bx--table-row--menu-option"},
             )
         else:
             objectactions_menu = hg.Iterator(
-                rowactions,
+                permitted_rowactions,
                 "action",
                 hg.F(
                     lambda c, e: Button.fromaction(
@@ -372,6 +433,17 @@ class DataTable(hg.BaseElement):
         queryset = model.objects.all() if queryset is None else queryset
         if "__all__" in columns:
             columns = filter_fieldlist(model, columns)
+        # the link is the same for all cells of a row and only calculated once per row
+        rowlink_attributes = aslink_attributes(
+            RowValue(
+                hg.F(
+                    lambda c, e: objectaction(
+                        c[rowvariable], rowclickaction, query=backquery
+                    )
+                ),
+                rowvariable,
+            )
+        )
         columndefinitions = []
         for column in columns:
             if not (
@@ -394,13 +466,7 @@ class DataTable(hg.BaseElement):
             column += (True,)
 
             if rowclickaction and column[3]:
-                column[1].td_attributes = aslink_attributes(
-                    hg.F(
-                        lambda c, e: objectaction(
-                            c[rowvariable], rowclickaction, query=backquery
-                        )
-                    )
-                )
+                column[1].td_attributes = rowlink_attributes
             columndefinitions.append(column[:3])
 
         table = DataTable(
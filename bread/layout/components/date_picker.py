@@ -4,7 +4,7 @@ from django.utils import formats
 
 from bread.utils.datetimeformatstring import to_php_formatstr
 
-from .helpers import REQUIRED_LABEL, ErrorList, HelperText, Label
+from .helpers import REQUIRED_LABEL, ErrorList, HelperText, Label, bindingcopy
 from .icon import Icon
 
 
@@ -69,37 +69,40 @@ class DatePicker(hg.DIV):
         self.simple = simple
 
     def render(self, context):
-        if self.boundfield is not None:
-            if self.boundfield.field.disabled:
-                self.label.attributes["_class"] += " bx--label--disabled"
-            self.label.attributes["_for"] = self.boundfield.id_for_label
-            self.label.append(self.boundfield.label)
-            if self.boundfield.field.required:
-                self.label.append(REQUIRED_LABEL)
+        element = bindingcopy(self)
+        if element.boundfield is not None:
+            if element.boundfield.field.disabled:
+                element.label.attributes["_class"] += " bx--label--disabled"
+            element.label.attributes["_for"] = element.boundfield.id_for_label
+            element.label.append(element.boundfield.label)
+            if element.boundfield.field.required:
+                element.label.append(REQUIRED_LABEL)
 
             dateformat = (
-                self.boundfield.field.widget.format
-                or formats.get_format(self.boundfield.field.widget.format_key)[0]
+                element.boundfield.field.widget.format
+                or formats.get_format(element.boundfield.field.widget.format_key)[0]
             )
             dateformat_widget = to_php_formatstr(
-                self.boundfield.field.widget.format,
-                self.boundfield.field.widget.format_key,
+                element.boundfield.field.widget.format,
+                element.boundfield.field.widget.format_key,
             )
-            if self.simple:
-                self.input.attributes["pattern"] = TimeRE().compile(dateformat).pattern
+            if element.simple:
+                element.input.attributes["pattern"] = (
+                    TimeRE().compile(dateformat).pattern
+                )
             else:
-                self.input.attributes["data_date_format"] = dateformat_widget
+                element.input.attributes["data_date_format"] = dateformat_widget
 
-            if self.boundfield.help_text:
-                self[0][0].append(HelperText(self.boundfield.help_text))
-            if self.boundfield.errors:
-                self.input.attributes["data-invalid"] = True
-                self[1].append(
+            if element.boundfield.help_text:
+                element[0][0].append(HelperText(element.boundfield.help_text))
+            if element.boundfield.errors:
+                element.input.attributes["data-invalid"] = True
+                element[1].append(
                     Icon(
                         "warning--filled",
                         size=16,
                         _class="bx--text-input__invalid-icon",
                     )
                 )
-                self[0][0].append(ErrorList(self.boundfield.errors))
-        return super().render(context)
+                element[0][0].append(ErrorList(element.boundfield.errors))
+        return super(DatePicker, element).render(context)
@@ -1,7 +1,7 @@
 import htmlgenerator as hg
 from django.utils.translation import gettext_lazy as _
 
-from .helpers import REQUIRED_LABEL, ErrorList
+from .helpers import REQUIRED_LABEL, ErrorList, bindingcopy
 from .icon import Icon
 
 # TODO: make delete-field working correctly
@@ -52,23 +52,24 @@ class FileUploader(hg.DIV):
         )
 
     def render(self, context):
-        if self.boundfield is not None:
-            if self.boundfield.field.disabled:
-                self.uploadbutton.attributes["disabled"] = True
-                self.input.attributes["disabled"] = True
-            self.uploadbutton.attributes["_for"] = self.boundfield.id_for_label
-            self.label.append(self.boundfield.label)
-            if self.boundfield.field.required:
-                self.label.append(REQUIRED_LABEL)
-            if self.boundfield.help_text:
-                self.help_text.append(self.boundfield.help_text)
-            if self.boundfield.errors:
-                self.input.attributes["data_invalid"] = True
-                self.wrapper.append(ErrorList(self.boundfield.errors))
-            if self.boundfield.value():
-                self.container.append(
+        element = bindingcopy(self)
+        if element.boundfield is not None:
+            if element.boundfield.field.disabled:
+                element.uploadbutton.attributes["disabled"] = True
+                element.input.attributes["disabled"] = True
+            element.uploadbutton.attributes["_for"] = element.boundfield.id_for_label
+            element.label.append(element.boundfield.label)
+            if element.boundfield.field.required:
+                element.label.append(REQUIRED_LABEL)
+            if element.boundfield.help_text:
+                element.help_text.append(element.boundfield.help_text)
+            if element.boundfield.errors:
+                element.input.attributes["data_invalid"] = True
+                element.wrapper.append(ErrorList(element.boundfield.errors))
+            if element.boundfield.value():
+                element.container.append(
                     hg.SPAN(
-                        hg.P(self.boundfield.value(), _class="bx--file-filename"),
+                        hg.P(element.boundfield.value(), _class="bx--file-filename"),
                         hg.SPAN(
                             hg.BUTTON(
                                 Icon("close", size=16),
@@ -76,10 +77,10 @@ class FileUploader(hg.DIV):
                                 type="button",
                                 aria_label="close",
                             ),
-                            data_for=self.boundfield.id_for_label,
+                            data_for=element.boundfield.id_for_label,
                             _class="bx--file__state-container",
                         ),
                         _class="bx--file__selected-file",
                     )
                 )
-        return super().render(context)
+        return super(FileUploader, element).render(context)
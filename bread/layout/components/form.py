@@ -1,3 +1,5 @@
+import copy
+
 import django_filters
 import htmlgenerator as hg
 from django import forms
@@ -8,6 +10,9 @@ from django_countries.widgets import LazySelect
 from .button import Button
 from .notification import InlineNotification
 
+# name under which a Form passes its resolved form object to its child elements
+FORM_CONTEXT_KEY = "_bread_form"
+
 
 class Form(hg.FORM):
     @staticmethod
@@ -58,14 +63,16 @@ class Form(hg.FORM):
         )
 
     def render(self, context):
+        # the layout can be shared between requests, the form is therefore passed to
+        # the form fields through the context and self is never modified
         form = hg.resolve_lazy(self.form, context, self)
-        for formfield in self.formfieldelements():
-            formfield.form = form
+        context = {**context, FORM_CONTEXT_KEY: form}
+        element = copy.copy(self)
         for error in form.non_field_errors():
-            self.insert(0, InlineNotification(_("Form error"), error, kind="error"))
+            element.insert(0, InlineNotification(_("Form error"), error, kind="error"))
         for hidden in form.hidden_fields():
             for error in hidden.errors:
-                self.insert(
+                element.insert(
                     0,
                     InlineNotification(
                         _("Form error: "), hidden.name, error, kind="error"
@@ -73,13 +80,22 @@ class Form(hg.FORM):
                 )
         if self.standalone:
             if form.is_multipart() and "enctype" not in self.attributes:
-                self.attributes["enctype"] = "multipart/form-data"
-            return super().render(context)
-        return super().render_children(context)
+                element.attributes = {
+                    **self.attributes,
+                    "enctype": "multipart/form-data",
+                }
+            return super(Form, element).render(context)
+        return super(Form, element).render_children(context)
 
 
 class FormChild:
-    """Used to mark elements which need the "form" attribute set by the parent form before rendering"""
+    """Used to mark elements which need the form object of the parent form for rendering"""
+
+    form = None
+
+    def get_form(self, context):
+        """Returns the form of the enclosing Form element, unless self.form is set"""
+        return self.form if self.form is not None else context[FORM_CONTEXT_KEY]
 
 
 class FormField(FormChild, hg.BaseElement):
@@ -98,12 +114,12 @@ class FormField(FormChild, hg.BaseElement):
         self.fieldtype = fieldtype
         self.widgetattributes = widgetattributes
         self.elementattributes = elementattributes
-        self.form = None  # will be set by the render method of the parent method
+        self.form = None  # resolved from the context of the parent form if not set
         self.hidelabel = hidelabel
 
     def render(self, context):
         element = _mapwidget(
-            self.form[self.fieldname],
+            self.get_form(context)[self.fieldname],
             self.fieldtype,
             self.elementattributes,
             self.widgetattributes,
@@ -134,7 +150,7 @@ class FormsetField(FormChild, hg.BaseElement):
         self.containertag = containertag
 
     def render(self, context):
-        formset = self.form[self.fieldname].formset
+        formset = self.get_form(context)[self.fieldname].formset
         # Detect internal fields like the delete-checkbox, the order-widget, id fields, etc and add their
         # HTML representations. But we never show the "delete" checkbox, it should be manually added via InlineDeleteButton
         declared_fields = [
@@ -148,8 +164,7 @@ class FormsetField(FormChild, hg.BaseElement):
             and field != forms.formsets.DELETION_FIELD_NAME
         ]
 
-        for field in internal_fields:
-            self.append(FormField(field))
+        children = [*self, *(FormField(field) for field in internal_fields)]
 
         skeleton = hg.DIV(
             Form.from_django_form(formset.management_form, standalone=False),
@@ -157,12 +172,12 @@ class FormsetField(FormChild, hg.BaseElement):
                 hg.Iterator(
                     formset,
                     loopvariable="formset_form",
-                    content=Form(hg.C("formset_form"), *self, standalone=False),
+                    content=Form(hg.C("formset_form"), *children, standalone=False),
                 ),
                 id=f"formset_{formset.prefix}_container",
             ),
             hg.DIV(
-                Form(formset.empty_form, *self, standalone=False),
+                Form(formset.empty_form, *children, standalone=False),
                 id=f"empty_{ formset.prefix }_form",
                 _class="template-form",
                 style="display:none;",
@@ -191,12 +206,14 @@ class FormsetAddButton(FormChild, Button):
         super().__init__(label, **defaults)
 
     def render(self, context):
-        formset = self.form[self.fieldname].formset
-        self.attributes["id"] = f"add_{formset.prefix}_button"
-        self.attributes[
-            "onclick"
-        ] = f"formset_add('{ formset.prefix }', '#formset_{ formset.prefix }_container');"
-        return super().render(context)
+        formset = self.get_form(context)[self.fieldname].formset
+        element = copy.copy(self)
+        element.attributes = {
+            **self.attributes,
+            "id": f"add_{formset.prefix}_button",
+            "onclick": f"formset_add('{ formset.prefix }', '#formset_{ formset.prefix }_container');",
+        }
+        return super(FormsetAddButton, element).render(context)
 
 
 class InlineDeleteButton(FormChild, Button):
@@ -229,22 +246,21 @@ class HiddenInput(FormChild, hg.INPUT):
         super().__init__(type="hidden", **{**widgetattributes, **attributes})
 
     def render(self, context):
-        self.attributes["id"] = self.boundfield.auto_id
+        element = copy.copy(self)
+        element.attributes = dict(self.attributes)
         if self.boundfield is not None:
-            self.attributes["name"] = self.boundfield.html_name
+            element.attributes["id"] = self.boundfield.auto_id
+            element.attributes["name"] = self.boundfield.html_name
             if self.boundfield.value() is not None:
-                self.attributes["value"] = self.boundfield.value()
-        return super().render(context)
+                element.attributes["value"] = self.boundfield.value()
+        return super(HiddenInput, element).render(context)
 
 
 class CsrfToken(FormChild, hg.INPUT):
     def __init__(self):
-        super().__init__(type="hidden")
-
-    def render(self, context):
-        self.attributes["name"] = "csrfmiddlewaretoken"
-        self.attributes["value"] = context["csrf_token"]
-        return super().render(context)
+        super().__init__(
+            type="hidden", name="csrfmiddlewaretoken", value=hg.C("csrf_token")
+        )
 
 
 def _mapwidget(
@@ -361,7 +377,8 @@ def _mapwidget(
             fieldname=field.name, widgetattributes=attrs, **elementattributes
         )
     else:
-        ret = fieldtype
+        # fieldtype can be part of a shared layout, bind the field to a copy
+        ret = copy.copy(fieldtype)
     ret.boundfield = field
 
     if (
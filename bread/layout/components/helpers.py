@@ -1,3 +1,5 @@
+import copy
+
 import htmlgenerator as hg
 
 from . import button
@@ -5,6 +7,21 @@ from . import button
 REQUIRED_LABEL = " *"
 
 
+def bindingcopy(element):
+    """
+    Returns a deep copy of a form widget element which can be modified with the values
+    of its bound field during rendering. Layouts can be shared between requests and
+    must therefore not be modified by the render methods. The bound field and its form
+    are not copied.
+    """
+    boundfield = getattr(element, "boundfield", None)
+    memo = {}
+    if boundfield is not None:
+        memo[id(boundfield)] = boundfield
+        memo[id(boundfield.form)] = boundfield.form
+    return copy.deepcopy(element, memo)
+
+
 class SubmitButton(hg.DIV):
     def __init__(self, *args, **kwargs):
         kwargs["type"] = "submit"
@@ -1,3 +1,4 @@
+import copy
 import logging
 import os
 
@@ -37,16 +38,21 @@ class Icon(hg.SVG):
 
     def render(self, context):
         name = hg.resolve_lazy(self.name, context, self)
-        if cache.get(name) is None:
+        svg = cache.get(name)
+        if svg is None:
             path = finders.find(
                 os.path.join("design/carbon_design/icons/flat/raw_32/", f"{name}.svg")
             )
-            if not path:
-                logger.error(f"Missing icon: {name}.svg")
-                self.append(f"Missing icon: {name}.svg")
-                return super().render(context)
-            with open(path) as f:
-                cache.set(name, f.read())
-        self.clear()
-        self.append(mark_safe(cache.get(name)))
-        return super().render(context)
+            if path:
+                with open(path) as f:
+                    svg = f.read()
+                cache.set(name, svg)
+        if svg is None:
+            logger.error(f"Missing icon: {name}.svg")
+            content = f"Missing icon: {name}.svg"
+        else:
+            content = mark_safe(svg)
+        # render a copy because the same icon can be part of a shared layout
+        element = copy.copy(self)
+        element[:] = [content]
+        return super(Icon, element).render(context)
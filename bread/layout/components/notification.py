@@ -122,7 +122,14 @@ class ToastNotification(htmlgenerator.DIV):
         timestampelem = (
             [
                 htmlgenerator.P(
-                    _("Time stamp"), " ", _class="bx--toast-notification__caption"
+                    _("Time stamp"),
+                    " ",
+                    htmlgenerator.F(
+                        lambda c, e: "["
+                        + datetime.datetime.now().time().isoformat()[:8]
+                        + "]"
+                    ),
+                    _class="bx--toast-notification__caption",
                 )
             ]
             if not hidetimestamp
@@ -151,10 +158,3 @@ class ToastNotification(htmlgenerator.DIV):
                 )
             )
         super().__init__(*children, **attributes)
-
-    def render(self, context):
-        if not self.hidetimestamp:
-            self[1][2].append(
-                "[" + datetime.datetime.now().time().isoformat()[:8] + "]"
-            )
-        return super().render(context)
@@ -1,6 +1,7 @@
 import htmlgenerator as hg
 from django.utils.translation import gettext_lazy as _
 
+from bread.utils.pagination import EstimatedCount
 from bread.utils.urls import link_with_urlparameters
 
 from ..base import aslink_attributes
@@ -46,6 +47,54 @@ def get_page(paginator, page_urlparameter):
     return hg.F(wrapper)
 
 
+def paginator_number(paginator, attribute):
+    """Renders count or num_pages of the paginator, marked when the count is an estimate"""
+
+    def wrapper(context, element):
+        p = hg.resolve_lazy(paginator, context, element)
+        if isinstance(p.count, EstimatedCount):
+            return _("about %s") % getattr(p, attribute)
+        return getattr(p, attribute)
+
+    return hg.F(wrapper)
+
+
+def itemsperpage_select(
+    items_per_page_options, itemsperpage_urlparameter, page_urlparameter
+):
+    return Select(
+        [
+            (
+                None,
+                [
+                    {
+                        "label": i,
+                        "value": linkwithitemsperpage(
+                            itemsperpage_urlparameter, i, page_urlparameter
+                        ),
+                        "attrs": {
+                            "selected": hg.F(
+                                lambda c, e, i=i: c["request"].GET.get(
+                                    itemsperpage_urlparameter
+                                )
+                                == str(i)
+                            )
+                        },
+                    }
+                    for i in items_per_page_options
+                ],
+            )
+        ],
+        inline=True,
+        widgetattributes={
+            "data_items_per_page": True,
+            "onclick": "document.location = this.value",
+            "onauxclick": "window.open(this.value, '_blank')",
+        },
+        _class="bx--select__item-count",
+    )
+
+
 class Pagination(hg.DIV):
     def __init__(
         self,
@@ -66,36 +115,10 @@ class Pagination(hg.DIV):
                     _class="bx--pagination__text",
                     _for=select1_id,
                 ),
-                Select(
-                    [
-                        (
-                            None,
-                            [
-                                {
-                                    "label": i,
-                                    "value": linkwithitemsperpage(
-                                        itemsperpage_urlparameter, i, page_urlparameter
-                                    ),
-                                    "attrs": {
-                                        "selected": hg.F(
-                                            lambda c, e, i=i: c["request"].GET.get(
-                                                itemsperpage_urlparameter
-                                            )
-                                            == str(i)
-                                        )
-                                    },
-                                }
-                                for i in items_per_page_options
-                            ],
-                        )
-                    ],
-                    inline=True,
-                    widgetattributes={
-                        "data_items_per_page": True,
-                        "onclick": "document.location = this.value",
-                        "onauxclick": "window.open(this.value, '_blank')",
-                    },
-                    _class="bx--select__item-count",
+                itemsperpage_select(
+                    items_per_page_options,
+                    itemsperpage_urlparameter,
+                    page_urlparameter,
                 ),
                 hg.SPAN(
                     hg.SPAN(
@@ -113,7 +136,7 @@ class Pagination(hg.DIV):
                     " ",
                     hg.SPAN(
                         " ",
-                        hg.getattr_lazy(paginator, "count"),
+                        paginator_number(paginator, "count"),
                         " ",
                         data_total_items=True,
                     ),
@@ -158,7 +181,7 @@ class Pagination(hg.DIV):
                 hg.LABEL(
                     _("of"),
                     " ",
-                    hg.getattr_lazy(paginator, "num_pages"),
+                    paginator_number(paginator, "num_pages"),
                     " ",
                     _("pages"),
                     _class="bx--pagination__text",
@@ -196,3 +219,83 @@ class Pagination(hg.DIV):
             ),
             **kwargs,
         )
+
+
+def get_keysetpage(paginator, cursor_urlparameter):
+    def wrapper(context, element):
+        return paginator.get_page(context["request"].GET.get(cursor_urlparameter))
+
+    return hg.F(wrapper)
+
+
+def linktocursor(cursor_urlparameter, page, cursorattribute):
+    return hg.F(
+        lambda c, e: link_with_urlparameters(
+            c["request"],
+            **{
+                cursor_urlparameter: getattr(
+                    hg.resolve_lazy(page, c, e), cursorattribute
+                )
+            },
+        )
+    )
+
+
+class KeysetPagination(hg.DIV):
+    """Pagination for a bread.utils.pagination.KeysetPaginator, only allows to step forward and backward"""
+
+    def __init__(
+        self,
+        paginator,
+        items_per_page_options,
+        cursor_urlparameter="cursor",
+        itemsperpage_urlparameter="itemsperpage",
+        **kwargs,
+    ):
+        select_id = hg.html_id(self)
+        kwargs["_class"] = kwargs.get("_class", "") + " bx--pagination"
+        kwargs["data_pagination"] = True
+        page = get_keysetpage(paginator, cursor_urlparameter)
+        super().__init__(
+            hg.DIV(
+                hg.LABEL(
+                    _("Items per page:"),
+                    _class="bx--pagination__text",
+                    _for=select_id,
+                ),
+                itemsperpage_select(
+                    items_per_page_options,
+                    itemsperpage_urlparameter,
+                    cursor_urlparameter,
+                ),
+                _class="bx--pagination__left",
+            ),
+            hg.DIV(
+                hg.BUTTON(
+                    Icon("caret--left", size=20, _class="bx--pagination__nav-arrow"),
+                    _class="bx--pagination__button bx--pagination__button--backward",
+                    tabindex="0",
+                    type="button",
+                    disabled=hg.F(
+                        lambda c, e: not hg.resolve_lazy(page, c, e).has_previous()
+                    ),
+                    **aslink_attributes(
+                        linktocursor(cursor_urlparameter, page, "previous_cursor")
+                    ),
+                ),
+                hg.BUTTON(
+                    Icon("caret--right", size=20, _class="bx--pagination__nav-arrow"),
+                    _class="bx--pagination__button bx--pagination__button--forward",
+                    tabindex="0",
+                    type="button",
+                    disabled=hg.F(
+                        lambda c, e: not hg.resolve_lazy(page, c, e).has_next()
+                    ),
+                    **aslink_attributes(
+                        linktocursor(cursor_urlparameter, page, "next_cursor")
+                    ),
+                ),
+                _class="bx--pagination__right",
+            ),
+            **kwargs,
+        )
@@ -1,3 +1,5 @@
+import copy
+
 import htmlgenerator as hg
 from django.utils.translation import gettext_lazy as _
 
@@ -66,5 +68,6 @@ class ProgressIndicator(hg.UL):
 
     def render(self, context):
         steps = hg.resolve_lazy(self.steps, self, context)
-        self.extend((ProgressStep(label, status) for label, status in steps))
-        return super().render(context)
+        element = copy.copy(self)
+        element.extend((ProgressStep(label, status) for label, status in steps))
+        return super(ProgressIndicator, element).render(context)
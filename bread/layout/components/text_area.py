@@ -1,6 +1,6 @@
 import htmlgenerator as hg
 
-from .helpers import REQUIRED_LABEL, ErrorList, HelperText, Label
+from .helpers import REQUIRED_LABEL, ErrorList, HelperText, Label, bindingcopy
 from .icon import Icon
 
 
@@ -40,28 +40,29 @@ class TextArea(hg.DIV):
         self.input = self[1][0]
 
     def render(self, context):
-        if self.boundfield.field.disabled:
-            self.label.attributes["_class"] += " bx--label--disabled"
-            self.input.attributes["disabled"] = True
-        if self.boundfield is not None:
-            self.label.attributes["_for"] = self.boundfield.id_for_label
-            self.label.append(self.boundfield.label)
-            if self.boundfield.field.required:
-                self.label.append(REQUIRED_LABEL)
+        element = bindingcopy(self)
+        if element.boundfield.field.disabled:
+            element.label.attributes["_class"] += " bx--label--disabled"
+            element.input.attributes["disabled"] = True
+        if element.boundfield is not None:
+            element.label.attributes["_for"] = element.boundfield.id_for_label
+            element.label.append(element.boundfield.label)
+            if element.boundfield.field.required:
+                element.label.append(REQUIRED_LABEL)
 
-            self.input.append(self.input.attributes.pop("value", ""))
+            element.input.append(element.input.attributes.pop("value", ""))
 
-            if self.boundfield.help_text:
-                self.append(HelperText(self.boundfield.help_text))
-            if self.boundfield.errors:
-                self[1].attributes["data-invalid"] = True
-                self.input.attributes["_class"] += " bx--text-area--invalid"
-                self[1].append(
+            if element.boundfield.help_text:
+                element.append(HelperText(element.boundfield.help_text))
+            if element.boundfield.errors:
+                element[1].attributes["data-invalid"] = True
+                element.input.attributes["_class"] += " bx--text-area--invalid"
+                element[1].append(
                     Icon(
                         "warning--filled",
                         size=16,
                         _class="bx--text-area__invalid-icon",
                     )
                 )
-                self.append(ErrorList(self.boundfield.errors))
-        return super().render(context)
+                element.append(ErrorList(element.boundfield.errors))
+        return super(TextArea, element).render(context)
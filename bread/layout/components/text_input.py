@@ -10,6 +10,7 @@ from .helpers import (
     HelpTextElement,
     Label,
     LabelElement,
+    bindingcopy,
 )
 from .icon import Icon
 
@@ -44,27 +45,28 @@ class TextInput(hg.DIV):
         self.input = self[1][0]
 
     def render(self, context):
-        if self.boundfield.field.disabled:
-            self.label.attributes["_class"] += " bx--label--disabled"
-            self.input.attributes["disabled"] = True
-        if self.boundfield is not None:
-            self.label.attributes["_for"] = self.boundfield.id_for_label
-            self.label.append(self.boundfield.label)
-            if self.boundfield.field.required:
-                self.label.append(REQUIRED_LABEL)
-            if self.boundfield.help_text:
-                self.append(HelperText(self.boundfield.help_text))
-            if self.boundfield.errors:
-                self[1].attributes["data-invalid"] = True
-                self[1].append(
+        element = bindingcopy(self)
+        if element.boundfield.field.disabled:
+            element.label.attributes["_class"] += " bx--label--disabled"
+            element.input.attributes["disabled"] = True
+        if element.boundfield is not None:
+            element.label.attributes["_for"] = element.boundfield.id_for_label
+            element.label.append(element.boundfield.label)
+            if element.boundfield.field.required:
+                element.label.append(REQUIRED_LABEL)
+            if element.boundfield.help_text:
+                element.append(HelperText(element.boundfield.help_text))
+            if element.boundfield.errors:
+                element[1].attributes["data-invalid"] = True
+                element[1].append(
                     Icon(
                         "warning--filled",
                         size=16,
                         _class="bx--text-input__invalid-icon",
                     )
                 )
-                self.append(ErrorList(self.boundfield.errors))
-        return super().render(context)
+                element.append(ErrorList(element.boundfield.errors))
+        return super(TextInput, element).render(context)
 
 
 class PasswordInput(TextInput):
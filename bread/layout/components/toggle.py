@@ -1,7 +1,7 @@
 import htmlgenerator as hg
 from django.utils.translation import gettext_lazy as _
 
-from .helpers import REQUIRED_LABEL, ErrorList, HelperText, Label
+from .helpers import REQUIRED_LABEL, ErrorList, HelperText, Label, bindingcopy
 
 
 class Toggle(hg.DIV):
@@ -31,17 +31,18 @@ class Toggle(hg.DIV):
         super().__init__(self.input, self.label, **attributes)
 
     def render(self, context):
+        element = bindingcopy(self)
         if hasattr(self, "boundfield"):
-            if self.boundfield is not None:
-                if self.boundfield.field.disabled:
-                    self.label.attributes["_class"] += " bx--label--disabled"
-                    self.input.attributes["disabled"] = True
-                self.label.attributes["_for"] = self.boundfield.id_for_label
-                self.label.insert(0, self.boundfield.label)
-                if self.boundfield.field.required:
-                    self.label.append(REQUIRED_LABEL)
-                if self.boundfield.help_text:
-                    self.append(HelperText(self.boundfield.help_text))
-                if self.boundfield.errors:
-                    self.append(ErrorList(self.boundfield.errors))
-        return super().render(context)
+            if element.boundfield is not None:
+                if element.boundfield.field.disabled:
+                    element.label.attributes["_class"] += " bx--label--disabled"
+                    element.input.attributes["disabled"] = True
+                element.label.attributes["_for"] = element.boundfield.id_for_label
+                element.label.insert(0, element.boundfield.label)
+                if element.boundfield.field.required:
+                    element.label.append(REQUIRED_LABEL)
+                if element.boundfield.help_text:
+                    element.append(HelperText(element.boundfield.help_text))
+                if element.boundfield.errors:
+                    element.append(ErrorList(element.boundfield.errors))
+        return super(Toggle, element).render(context)
@@ -63,9 +63,11 @@ class Action:
         self._permissions = permissions
 
     def has_permission(self, request, obj=None):
+        from .utils import user_has_perm
+
         return all(
             [
-                request.user.has_perm(perm, obj) or request.user.has_perm(perm)
+                user_has_perm(request.user, perm, obj)
                 for perm in try_call(self._permissions, request)
             ]
         )
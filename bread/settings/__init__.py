@@ -6,3 +6,27 @@ HTML_FALSE = mark_safe("&#x2716;")  # ✖
 HTML_NONE = mark_safe("&empty;")  # ∅
 
 TEXT_FIELD_DISPLAY_LIMIT = 32
+
+# see bread.utils.files.file_exists, set FILE_EXISTS_CHECK to False in order to
+# render file fields without checking whether the file exists in the storage
+FILE_EXISTS_CHECK = True
+FILE_EXISTS_CACHE_TIMEOUT = 300  # seconds
+
+# threads which generate thumbnails in the background, see bread.utils.thumbnails,
+# with 0 thumbnails are generated while rendering
+THUMBNAIL_WORKERS = 2
+
+# pagination counts, see bread.utils.pagination
+COUNT_CACHE_TIMEOUT = 300  # seconds, for the "cached" count strategy
+ESTIMATED_COUNT_THRESHOLD = 10000  # below this the "estimate" strategy counts exactly
+
+# threads for background report exports if no celery broker is configured
+REPORT_EXPORT_WORKERS = 2
+
+# seconds, see bread.contrib.reports.models.Report.preview
+REPORT_PREVIEW_CACHE_TIMEOUT = 600
+
+# seconds after which a report snapshot is not used anymore, see bread.contrib.reports.snapshots
+REPORT_SNAPSHOT_MAX_AGE = 3600
+# seconds after which a refresh rebuilds a report snapshot completely
+REPORT_SNAPSHOT_REBUILD_AGE = 86400
@@ -140,9 +140,37 @@ function submitbulkaction(table, actionurl, method="GET") {
     let form = document.createElement("form");
     form.method = method;
     form.action = actionurl;
-    for(let checkbox of table.querySelectorAll('input[type=checkbox][data-event=select]')) {
-        form.appendChild(checkbox.cloneNode(true));
+    let selectallmatching = table.querySelector('input[type=checkbox][data-select-all-matching]');
+    if(selectallmatching && selectallmatching.checked) {
+        // the server selects all objects which match the current search query
+        let parameters = new URLSearchParams(window.location.search);
+        parameters.set("selected", "all");
+        for(let [name, value] of parameters) {
+            let input = document.createElement("input");
+            input.type = "hidden";
+            input.name = name;
+            input.value = value;
+            form.appendChild(input);
+        }
+    } else {
+        for(let checkbox of table.querySelectorAll('input[type=checkbox][data-event=select]')) {
+            form.appendChild(checkbox.cloneNode(true));
+        }
     }
     document.body.appendChild(form);
     form.submit();
 }
+
+// Function which sends a POST request without data to a URL, e.g. for actions which change objects
+function submitpost(actionurl, csrftoken) {
+    let form = document.createElement("form");
+    form.method = "POST";
+    form.action = actionurl;
+    let input = document.createElement("input");
+    input.type = "hidden";
+    input.name = "csrfmiddlewaretoken";
+    input.value = csrftoken;
+    form.appendChild(input);
+    document.body.appendChild(form);
+    form.submit();
+}
@@ -47,6 +47,12 @@ def linkurl(context, link):
 def render_layout(context):
     # try first to get "raw" layout object from context, otherwise use layout method of view
     layout = context.get("layout") or context.get("view").layout
+    placeholder = context.get("layout_placeholder")
+    if placeholder is not None:
+        # the view renders and streams the layout itself, see BrowseView.render_to_response
+        placeholder.layout = layout
+        placeholder.context = context.flatten()
+        return mark_safe(placeholder.marker)
     return mark_safe(hg.render(layout(context["request"]), context.flatten()))
 
 
@@ -0,0 +1,61 @@
+import datetime
+import decimal
+import importlib.util
+import io
+import unittest
+
+from django.test import TestCase
+
+from bread.utils.export import (
+    _arrowbatches,
+    arrowstreamingresponse,
+    parquetstreamingresponse,
+)
+
+ROWS = [
+    {"number": None, "amount": decimal.Decimal("1.5"), "mixed": 1},
+    {"number": 1, "amount": decimal.Decimal("2.25"), "mixed": "a"},
+    {"number": 2.5, "amount": 3, "mixed": datetime.date(2021, 1, 1)},
+]
+COLUMNS = {name: (lambda row, name=name: row[name]) for name in ROWS[0]}
+
+
+@unittest.skipUnless(importlib.util.find_spec("pyarrow"), "requires pyarrow")
+class ArrowExportTest(TestCase):
+    def test_types_of_later_batches(self):
+        import pyarrow
+
+        batches = list(_arrowbatches(ROWS, COLUMNS, raw=True, batchsize=1))
+        self.assertEqual(len(batches), 3)
+        schema = batches[0].schema
+        self.assertEqual(schema.field("number").type, pyarrow.float64())
+        self.assertEqual(schema.field("amount").type, pyarrow.decimal128(38, 2))
+        self.assertEqual(schema.field("mixed").type, pyarrow.string())
+        table = pyarrow.Table.from_batches(batches)
+        self.assertEqual(table.column("number").to_pylist(), [None, 1.0, 2.5])
+        self.assertEqual(
+            table.column("mixed").to_pylist(),
+            ["1", "a", str(datetime.date(2021, 1, 1))],
+        )
+
+    def test_responses(self):
+        import pyarrow
+        import pyarrow.parquet
+
+        for response, read in (
+            (
+                arrowstreamingresponse(iter(ROWS), COLUMNS, "test", raw=True),
+                lambda data: pyarrow.ipc.open_file(data).read_all(),
+            ),
+            (
+                parquetstreamingresponse(iter(ROWS), COLUMNS, "test", raw=True),
+                pyarrow.parquet.read_table,
+            ),
+        ):
+            table = read(io.BytesIO(b"".join(response.streaming_content)))
+            self.assertEqual(table.column_names, list(COLUMNS))
+            self.assertEqual(table.num_rows, len(ROWS))
+
+    def test_empty(self):
+        response = arrowstreamingresponse(iter(()), COLUMNS, "test", raw=True)
+        self.assertTrue(b"".join(response.streaming_content))
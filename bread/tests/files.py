@@ -0,0 +1,100 @@
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, Storage
+from django.db import models
+from django.db.models.fields.files import FieldFile
+from django.test import TestCase
+
+from bread.utils import files
+
+
+class CountingStorage(FileSystemStorage):
+    exists_calls = 0
+    listdir_calls = 0
+
+    def exists(self, name):
+        self.exists_calls += 1
+        return super().exists(name)
+
+    def listdir(self, path):
+        self.listdir_calls += 1
+        return super().listdir(path)
+
+
+class RemoteStorage(Storage):
+    """Storage which is not a FileSystemStorage, listdir is optional"""
+
+    def __init__(self, names, listdir=True):
+        self.names = set(names)
+        self.exists_calls = 0
+        if not listdir:
+            self.listdir = super().listdir
+
+    def exists(self, name):
+        self.exists_calls += 1
+        return name in self.names
+
+    def listdir(self, path):
+        return [], [
+            name.rsplit("/", 1)[-1]
+            for name in self.names
+            if name.rsplit("/", 1)[0] == path
+        ]
+
+
+class PrefetchFileExistsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.storage = CountingStorage(location=tempfile.mkdtemp())
+        for name in ("a.txt", "b.txt"):
+            self.storage.save(f"docs/{name}", ContentFile(b"content"))
+        self.storage.exists_calls = 0
+        field = models.FileField(storage=self.storage)
+        self.fieldfiles = [
+            FieldFile(None, field, f"docs/{name}")
+            for name in ("a.txt", "b.txt", "missing.txt")
+        ]
+
+    def exists(self):
+        return [files.file_exists(fieldfile) for fieldfile in self.fieldfiles]
+
+    def test_directory_is_listed_once(self):
+        files.prefetch_file_exists(self.fieldfiles)
+        self.assertEqual(self.exists(), [True, True, False])
+        self.assertEqual(self.storage.exists_calls, 0)
+        self.assertEqual(self.storage.listdir_calls, 1)
+
+    def test_missing_directory(self):
+        field = models.FileField(storage=self.storage)
+        fieldfiles = [FieldFile(None, field, f"nodir/{n}") for n in ("a", "b")]
+        files.prefetch_file_exists(fieldfiles)
+        self.assertEqual([files.file_exists(f) for f in fieldfiles], [False, False])
+        self.assertEqual(self.storage.exists_calls, 0)
+
+    def remote_exists(self, storage):
+        field = models.FileField(storage=storage)
+        fieldfiles = [
+            FieldFile(None, field, f"docs/{name}")
+            for name in ("a.txt", "b.txt", "missing.txt")
+        ]
+        files.prefetch_file_exists(fieldfiles)
+        return [files.file_exists(fieldfile) for fieldfile in fieldfiles]
+
+    def test_remote_storage_is_listed(self):
+        storage = RemoteStorage(["docs/a.txt", "docs/b.txt", "other/a.txt"])
+        self.assertEqual(self.remote_exists(storage), [True, True, False])
+        self.assertEqual(storage.exists_calls, 0)
+
+    def test_storage_without_listdir(self):
+        storage = RemoteStorage(["docs/a.txt", "docs/b.txt"], listdir=False)
+        self.assertEqual(self.remote_exists(storage), [True, True, False])
+        self.assertEqual(storage.exists_calls, 3)
+
+    def test_large_directory_is_not_listed(self):
+        with mock.patch.object(files, "LISTDIR_LIMIT", 1):
+            files.prefetch_file_exists(self.fieldfiles)
+        self.assertEqual(self.exists(), [True, True, False])
+        self.assertEqual(self.storage.exists_calls, 3)
@@ -0,0 +1,48 @@
+import datetime
+import decimal
+
+from django.db import models
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+
+from bread.formatters import CONSTANTS, format_value, register_formatter
+from bread.utils.export import excelvalue
+
+
+class FormatValueTest(TestCase):
+    def test_builtin_types(self):
+        self.assertEqual(format_value(None), CONSTANTS[None])
+        self.assertEqual(format_value(True), CONSTANTS[True])
+        self.assertEqual(format_value(decimal.Decimal("1.200")), "1.2")
+        self.assertEqual(format_value(3), "3")
+        self.assertEqual(format_value(datetime.timedelta(seconds=3.5)), "0:00:03")
+        self.assertEqual(format_value("text"), "text")
+        self.assertEqual(format_value(gettext_lazy("text")), "text")
+        self.assertEqual(format_value([1, None]), (f"1, {CONSTANTS[None]}",))
+
+    def test_fieldtype(self):
+        self.assertEqual(
+            format_value("a@b.c", models.EmailField()),
+            '<a href="mailto:a@b.c">a@b.c</a>',
+        )
+        # the formatter is cached per value type and field class
+        self.assertEqual(format_value("a@b.c"), "a@b.c")
+
+    def test_register_formatter(self):
+        class Custom:
+            pass
+
+        self.assertIsInstance(format_value(Custom()), Custom)
+        register_formatter(Custom, lambda value: "custom")
+        self.assertEqual(format_value(Custom()), "custom")
+
+
+class ExcelValueTest(TestCase):
+    def test_datetime_in_active_timezone(self):
+        value = datetime.datetime(2021, 6, 1, 12, 0, tzinfo=datetime.timezone.utc)
+        with timezone.override("Europe/Vienna"):
+            self.assertEqual(excelvalue(value), datetime.datetime(2021, 6, 1, 14, 0))
+        self.assertEqual(
+            excelvalue(datetime.datetime(2021, 6, 1)), datetime.datetime(2021, 6, 1)
+        )
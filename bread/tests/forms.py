@@ -0,0 +1,72 @@
+from django import forms
+from django.contrib.auth.models import Group, Permission
+from django.contrib.contenttypes.models import ContentType
+from django.test import RequestFactory, TestCase
+
+from bread import layout
+from bread.forms import forms as breadforms
+
+
+class FormClassCacheTest(TestCase):
+    def setUp(self):
+        breadforms._FORMCLASS_CACHE.clear()
+
+    def formclass(self, *fields):
+        return breadforms.breadmodelform_factory(
+            RequestFactory().get("/"),
+            Group,
+            layout.form.Form(forms.Form(), *fields),
+        )
+
+    def test_formclass_is_reused(self):
+        first = self.formclass(layout.form.FormField("name"))
+        second = self.formclass(layout.form.FormField("name"))
+        self.assertIs(first.__bases__[0], second.__bases__[0])
+
+    def test_unhashable_formset_arguments_are_not_cached(self):
+        formsetfield = layout.form.FormsetField(
+            "permissions", layout.form.FormField("name"), widgets=[set()]
+        )
+        with self.assertRaises(TypeError):
+            breadforms._layout_signature([formsetfield])
+        self.assertEqual(
+            breadforms._layout_signature(
+                [layout.form.FormsetField("permissions", extra=1, max_num=5)]
+            ),
+            breadforms._layout_signature(
+                [layout.form.FormsetField("permissions", max_num=5, extra=1)]
+            ),
+        )
+
+    def test_cache_is_bounded(self):
+        fields = ["name"] * (breadforms.FORMCLASS_CACHE_SIZE + 10)
+        for i in range(len(fields)):
+            self.formclass(*(layout.form.FormField(f) for f in fields[: i + 1]))
+        self.assertLessEqual(
+            len(breadforms._FORMCLASS_CACHE), breadforms.FORMCLASS_CACHE_SIZE
+        )
+
+
+class InlineFormSetWithLimitsTest(TestCase):
+    def formset(self, contenttype):
+        return forms.models.inlineformset_factory(
+            ContentType,
+            Permission,
+            formset=breadforms.InlineFormSetWithLimits,
+            fields=["name", "codename"],
+            extra=None,
+        )(instance=contenttype)
+
+    def test_related_objects_are_queried_once(self):
+        contenttype = ContentType.objects.get_for_model(Group)
+        permissions = Permission.objects.filter(content_type=contenttype).count()
+        with self.assertNumQueries(1):
+            formset = self.formset(contenttype)
+            self.assertEqual(formset.extra, 0)
+            self.assertEqual(len(formset.forms), permissions)
+
+    def test_one_empty_form_without_related_objects(self):
+        contenttype = ContentType.objects.create(app_label="bread", model="none")
+        formset = self.formset(contenttype)
+        self.assertEqual(formset.extra, 1)
+        self.assertEqual(len(formset.forms), 1)
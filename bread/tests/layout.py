@@ -0,0 +1,110 @@
+import htmlgenerator as hg
+from django.test import TestCase
+
+from bread import layout
+
+
+class CompiledDataTableTest(TestCase):
+    def test_compiled_rows_render_like_iterator(self):
+        rows = [
+            {"name": "<b>bold</b>", "value": 1.50, "tags": ["a", None]},
+            {"name": "plain", "value": None, "tags": []},
+        ]
+        columns = [
+            ("Name", hg.C("row.name"), None),
+            ("Value", layout.FC("row.value"), None),
+            ("Tags", layout.FC("row.tags"), None),
+            ("Index", hg.SPAN(hg.C("row_index"), _class="index"), None),
+            (
+                "Function",
+                hg.F(lambda c, e: c["row"]["name"].upper()),
+                None,
+            ),
+        ]
+        columns[0][1].td_attributes = {
+            "onclick": hg.BaseElement("open(", hg.C("row_index"), ")")
+        }
+        self.assertEqual(
+            hg.render(layout.datatable.DataTable(columns, rows, compiled=True), {}),
+            hg.render(layout.datatable.DataTable(columns, rows, compiled=False), {}),
+        )
+
+    def test_lazy_attributes_and_nested_iterators(self):
+        rows = [{"name": "a", "tags": ["x", "<y>"]}, {"name": "b", "tags": []}]
+        columns = [
+            (
+                "Name",
+                hg.DIV(
+                    hg.C("row.name"),
+                    lazy_attributes=hg.F(lambda c, e: {"data_name": c["row"]["name"]}),
+                ),
+                None,
+            ),
+            (
+                "Tags",
+                hg.UL(
+                    hg.Iterator(
+                        hg.C("row.tags"),
+                        "tag",
+                        hg.LI(hg.C("tag"), data_index=hg.C("tag_index")),
+                    )
+                ),
+                None,
+            ),
+        ]
+        self.assertEqual(
+            hg.render(layout.datatable.DataTable(columns, rows, compiled=True), {}),
+            hg.render(layout.datatable.DataTable(columns, rows, compiled=False), {}),
+        )
+
+    def test_compiler_is_compatible_with_htmlgenerator(self):
+        # fails if an htmlgenerator release renders elements differently
+        self.assertTrue(layout.base.compiler_is_compatible())
+
+
+class SharedFormLayoutTest(TestCase):
+    def test_form_is_not_modified_by_rendering(self):
+        from django import forms
+
+        class NameForm(forms.Form):
+            name = forms.CharField()
+
+            def clean(self):
+                raise forms.ValidationError("invalid")
+
+        formlayout = layout.form.Form(hg.C("form"), layout.form.FormField("name"))
+        children = list(formlayout)
+        first = hg.render(
+            formlayout, {"form": NameForm({"name": "a"}), "csrf_token": "1"}
+        )
+        second = hg.render(formlayout, {"form": NameForm(), "csrf_token": "2"})
+        self.assertEqual(list(formlayout), children)
+        self.assertIn('value="a"', first)
+        self.assertNotIn('value="a"', second)
+        self.assertIn("invalid", first)
+        self.assertNotIn("invalid", second)
+        self.assertIn('value="2"', second)
+
+    def test_shared_widget_is_not_modified_by_rendering(self):
+        from django import forms
+
+        class NameForm(forms.Form):
+            name = forms.CharField(help_text="Enter a name")
+            secret = forms.CharField(widget=forms.HiddenInput)
+
+        widget = layout.text_input.TextInput(fieldname="name")
+        children = list(widget)
+        formlayout = layout.form.Form(
+            hg.C("form"),
+            layout.form.FormField("name", fieldtype=widget),
+            layout.form.FormField("secret"),
+        )
+        first = hg.render(formlayout, {"form": NameForm({"secret": "x"})})
+        second = hg.render(formlayout, {"form": NameForm()})
+        self.assertEqual(list(widget), children)
+        self.assertFalse(hasattr(widget, "boundfield"))
+        self.assertIn("bx--form-requirement", first)
+        self.assertNotIn("bx--form-requirement", second)
+        self.assertIn('value="x"', first)
+        self.assertNotIn('value="x"', second)
+        self.assertEqual(second.count("Enter a name"), 1)
@@ -0,0 +1,78 @@
+from django.contrib.auth.models import Group, Permission
+from django.db.models.signals import post_save
+from django.test import TestCase
+
+from bread.utils import bulk_create_copies, has_save_logic
+from bread.utils.modelversions import DISPATCH_UID, connect_model_version_receivers
+
+
+class BulkCreateCopiesTest(TestCase):
+    def setUp(self):
+        self.permissions = list(Permission.objects.order_by("pk")[:3])
+        self.groups = [Group.objects.create(name=f"group{i}") for i in range(2)]
+        self.groups[0].permissions.set(self.permissions)
+        self.groups[1].permissions.set(self.permissions[:1])
+
+    def copies(self, *names):
+        return [Group(name=name) for name in names]
+
+    def assertPermissionsCopied(self, copy, instance):
+        self.assertEqual(
+            set(copy.permissions.values_list("pk", flat=True)),
+            set(instance.permissions.values_list("pk", flat=True)),
+        )
+
+    def test_many_to_many_rows_are_copied(self):
+        created = bulk_create_copies(self.groups, self.copies("copy0", "copy1"))
+        self.assertEqual(len(created), 2)
+        for instance, copy in zip(self.groups, created):
+            self.assertPermissionsCopied(copy, instance)
+        self.assertEqual(self.groups[0].permissions.count(), 3)
+
+    def test_save_receivers_are_called_for_each_copy(self):
+        saved = []
+
+        def receiver(sender, instance, created, **kwargs):
+            saved.append(instance.name)
+
+        post_save.connect(receiver, sender=Group)
+        try:
+            created = bulk_create_copies(self.groups, self.copies("copy0", "copy1"))
+        finally:
+            post_save.disconnect(receiver, sender=Group)
+        self.assertEqual(saved, ["copy0", "copy1"])
+        for instance, copy in zip(self.groups, created):
+            self.assertPermissionsCopied(copy, instance)
+
+    def test_model_version_receiver_is_no_save_logic(self):
+        post_save.disconnect(dispatch_uid=DISPATCH_UID)
+        try:
+            without_version_receiver = has_save_logic(Group)
+        finally:
+            connect_model_version_receivers()
+        self.assertEqual(has_save_logic(Group), without_version_receiver)
+        post_save.connect(self.receiver, sender=Group)
+        try:
+            self.assertTrue(has_save_logic(Group))
+        finally:
+            post_save.disconnect(self.receiver, sender=Group)
+
+    def receiver(self, sender, **kwargs):
+        pass
+
+    def test_failing_copies_are_reported_separately(self):
+        errors = []
+        created = bulk_create_copies(
+            self.groups,
+            self.copies("copy0", "group1"),  # the group name is unique
+            onerror=lambda instance, error: errors.append(instance),
+        )
+        self.assertEqual([copy.name for copy in created], ["copy0"])
+        self.assertEqual(errors, [self.groups[1]])
+        self.assertPermissionsCopied(created[0], self.groups[0])
+        self.assertFalse(Group.objects.filter(name="group1").count() > 1)
+
+    def test_errors_are_raised_without_onerror(self):
+        with self.assertRaises(Exception):
+            bulk_create_copies(self.groups, self.copies("copy0", "group1"))
+        self.assertFalse(Group.objects.filter(name="copy0").exists())
@@ -0,0 +1,81 @@
+import datetime
+
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.core.paginator import EmptyPage
+from django.test import TestCase
+
+from bread.utils.modelversions import (
+    _versionkey,
+    increase_model_version,
+    model_cache_version,
+)
+from bread.utils.pagination import (
+    CountingPaginator,
+    EstimatedCount,
+    cached_count,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+class KeysetCursorTest(TestCase):
+    def test_cursor_roundtrip(self):
+        for data in (
+            {"o": None, "v": [1], "b": False},
+            {"o": "-name", "v": [0, "müller", 42], "b": True},
+        ):
+            cursor = encode_cursor(data)
+            self.assertNotIn("=", cursor)
+            self.assertEqual(decode_cursor(cursor), data)
+
+    def test_cursor_serializes_dates(self):
+        cursor = encode_cursor({"v": [datetime.date(2021, 3, 1)]})
+        self.assertEqual(decode_cursor(cursor), {"v": ["2021-03-01"]})
+
+    def test_invalid_cursor(self):
+        for cursor in (None, "", "not a cursor", "WzEsIDJd", "%%%"):
+            self.assertIsNone(decode_cursor(cursor))
+
+
+class CountingPaginatorTest(TestCase):
+    def test_pages_beyond_a_low_estimate(self):
+        Group.objects.bulk_create(Group(name=f"group{i}") for i in range(25))
+        paginator = CountingPaginator(
+            Group.objects.order_by("name"),
+            10,
+            count_strategy=lambda queryset: EstimatedCount(5),
+        )
+        self.assertEqual(paginator.num_pages, 1)
+        self.assertEqual(len(paginator.page(3)), 5)
+        self.assertEqual(paginator.count, 25)
+        self.assertRaises(EmptyPage, paginator.page, 4)
+
+
+class CachedCountTest(TestCase):
+    def test_invalidated_by_save_and_delete(self):
+        self.assertEqual(cached_count(Group.objects.all()), 0)
+        group = Group.objects.create(name="group")
+        with self.assertNumQueries(1):
+            self.assertEqual(cached_count(Group.objects.all()), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(cached_count(Group.objects.all()), 1)
+        group.delete()
+        self.assertEqual(cached_count(Group.objects.all()), 0)
+
+
+class ModelVersionTest(TestCase):
+    def test_increased_by_save_and_delete(self):
+        version = model_cache_version(Group)
+        group = Group.objects.create(name="group")
+        self.assertEqual(model_cache_version(Group), version + 1)
+        group.delete()
+        self.assertEqual(model_cache_version(Group), version + 2)
+
+    def test_evicted_version_is_not_reused(self):
+        version = model_cache_version(Group)
+        for i in range(3):
+            increase_model_version(Group)
+        cache.delete(_versionkey(Group))
+        increase_model_version(Group)
+        self.assertGreater(model_cache_version(Group), version + 3)
@@ -0,0 +1,66 @@
+from django.contrib.auth.models import Group
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from djangoql.exceptions import DjangoQLError
+
+from bread.contrib.reports.fields.queryfield import parsequeryexpression
+from bread.utils.queryexpression import apply_queryexpression, compile_queryexpression
+
+
+class QueryExpressionCacheTest(TestCase):
+    def setUp(self):
+        compile_queryexpression.cache_clear()
+        for name in ("alpha", "beta", "gamma"):
+            Group.objects.create(name=name)
+
+    def names(self, expression):
+        return sorted(
+            apply_queryexpression(Group.objects.all(), expression).values_list(
+                "name", flat=True
+            )
+        )
+
+    def test_cache_hit(self):
+        self.assertEqual(self.names('name ~ "a"'), ["alpha", "beta", "gamma"])
+        self.assertEqual(self.names('name ~ "a"'), ["alpha", "beta", "gamma"])
+        info = compile_queryexpression.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+        self.assertIs(
+            compile_queryexpression(Group, 'name ~ "a"'),
+            compile_queryexpression(Group, 'name ~ "a"'),
+        )
+
+    def test_changed_filter_is_compiled_again(self):
+        self.assertEqual(self.names('name = "alpha"'), ["alpha"])
+        self.assertEqual(self.names('name = "beta"'), ["beta"])
+        info = compile_queryexpression.cache_info()
+        self.assertEqual((info.hits, info.misses), (0, 2))
+
+    def test_cached_expression_is_not_changed_by_filtering(self):
+        self.assertEqual(
+            self.names('name = "alpha" or name = "beta"'), ["alpha", "beta"]
+        )
+        self.assertEqual(
+            sorted(
+                apply_queryexpression(
+                    Group.objects.exclude(name="alpha"),
+                    'name = "alpha" or name = "beta"',
+                ).values_list("name", flat=True)
+            ),
+            ["beta"],
+        )
+        self.assertEqual(
+            self.names('name = "alpha" or name = "beta"'), ["alpha", "beta"]
+        )
+
+    def test_invalid_expressions_are_not_cached(self):
+        for expression in ('name = "alpha', 'unknownfield = "alpha"', "name = 1"):
+            with self.assertRaises(DjangoQLError):
+                apply_queryexpression(Group.objects.all(), expression)
+            with self.assertRaises(DjangoQLError):
+                apply_queryexpression(Group.objects.all(), expression)
+        self.assertEqual(compile_queryexpression.cache_info().currsize, 0)
+
+    def test_invalid_expression_is_a_validation_error(self):
+        with self.assertRaises(ValidationError):
+            parsequeryexpression(Group.objects.all(), 'unknownfield = "alpha"')
@@ -0,0 +1,56 @@
+from django.contrib.auth.models import Group, Permission, User
+from django.test import TestCase
+
+from bread.utils import plan_queryset
+
+
+class PlanQuerysetTest(TestCase):
+    def setUp(self):
+        permissions = list(Permission.objects.order_by("pk")[:2])
+        groups = [Group.objects.create(name=f"group{i}") for i in range(2)]
+        for group in groups:
+            group.permissions.set(permissions)
+        for i in range(3):
+            User.objects.create(username=f"user{i}").groups.set(groups)
+
+    def test_foreignkey_is_selected(self):
+        plan = plan_queryset(Permission, ["name", "content_type.app_label"])
+        self.assertEqual(plan.select_related, {"content_type"})
+        self.assertEqual(plan.prefetch_related, set())
+        self.assertEqual(
+            plan.only, {"id", "name", "content_type", "content_type__app_label"}
+        )
+        with self.assertNumQueries(1):
+            for permission in plan.apply(Permission.objects.all()):
+                permission.content_type.app_label
+
+    def test_foreignkey_displayed_as_a_whole_is_not_restricted(self):
+        plan = plan_queryset(Permission, ["name", "content_type"])
+        self.assertEqual(plan.select_related, {"content_type"})
+        self.assertEqual(plan.only, {"id", "name", "content_type"})
+
+    def test_manytomany_is_prefetched(self):
+        plan = plan_queryset(User, ["username", "groups.all"])
+        self.assertEqual(plan.select_related, set())
+        self.assertEqual(plan.prefetch_related, {"groups"})
+        self.assertEqual(plan.only, {"id", "username"})
+        with self.assertNumQueries(2):
+            for user in plan.apply(User.objects.all()):
+                list(user.groups.all())
+
+    def test_relations_behind_manytomany_are_prefetched(self):
+        plan = plan_queryset(User, ["groups.permissions.content_type.app_label"])
+        self.assertEqual(plan.select_related, set())
+        self.assertEqual(
+            plan.prefetch_related,
+            {"groups", "groups__permissions", "groups__permissions__content_type"},
+        )
+
+    def test_reverse_relation_is_prefetched(self):
+        plan = plan_queryset(Group, ["name", "user_set.all"])
+        self.assertEqual(plan.prefetch_related, {"user_set"})
+        self.assertEqual(plan.only, {"id", "name"})
+
+    def test_properties_and_callables_are_not_restricted(self):
+        self.assertIsNone(plan_queryset(User, ["username", "get_full_name"]).only)
+        self.assertIsNone(plan_queryset(User, ["username", lambda u: u.pk]).only)
@@ -0,0 +1,200 @@
+import datetime
+import json
+import tempfile
+import uuid
+from unittest import mock
+
+import htmlgenerator as hg
+from django.contrib.auth.models import Group, User
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+from django.utils import timezone, translation
+
+from bread.contrib.reports import tasks
+from bread.contrib.reports.models import Report, ReportColumn, ReportExport
+from bread.contrib.reports.snapshots import (
+    decodevalue,
+    encodevalue,
+    refresh_snapshot,
+    snapshotrows,
+)
+
+
+class ReportAggregationTest(TestCase):
+    def setUp(self):
+        groups = [Group.objects.create(name=f"group{i}") for i in range(2)]
+        for i in range(3):
+            user = User.objects.create(username=f"user{i}", is_staff=i > 0)
+            user.groups.set(groups[:i])
+        self.report = Report.objects.create(
+            name="users", model=ContentType.objects.get_for_model(User)
+        )
+
+    def columns(self, *columns):
+        return [
+            ReportColumn.objects.create(
+                report=self.report, column=column, name=column, aggregation=aggregation
+            )
+            for column, aggregation in columns
+        ]
+
+    def test_group_by_field(self):
+        staff, groups = self.columns(("is_staff", ""), ("groups.all", "count"))
+        self.assertEqual(
+            [
+                (row[staff.resultkey], row[groups.resultkey])
+                for row in self.report.aggregate()
+            ],
+            [(False, 0), (True, 3)],
+        )
+
+    def test_group_by_to_many_relationship(self):
+        group, users = self.columns(("groups.name", ""), ("id", "count"))
+        self.assertEqual(
+            {
+                row[group.resultkey]: row[users.resultkey]
+                for row in self.report.aggregate()
+            },
+            {None: 1, "group0": 2, "group1": 1},
+        )
+
+    def test_rows_multiplied_by_join(self):
+        self.columns(("is_staff", ""), ("id", "sum"), ("groups.all", "count"))
+        self.assertRaises(ValidationError, self.report.aggregate)
+
+    def test_multiple_to_many_relationships(self):
+        self.columns(("groups.all", "count"), ("user_permissions.all", "count"))
+        self.assertRaises(ValidationError, self.report.aggregate)
+
+    def test_property_column(self):
+        self.columns(("is_staff", ""), ("is_anonymous", "count"))
+        self.assertRaises(ValidationError, self.report.aggregate)
+        self.assertIn("is_anonymous", self.report.preview)
+
+    def test_preview_cached_per_language_and_timezone(self):
+        self.columns(("username", ""))
+        with mock.patch.object(
+            Report, "_preview", side_effect=lambda columns: hg.DIV("preview")
+        ) as render:
+            self.report.preview
+            self.report.preview
+            self.assertEqual(render.call_count, 1)
+            with timezone.override("Europe/Zurich"):
+                self.report.preview
+            self.assertEqual(render.call_count, 2)
+            with translation.override("de"):
+                self.report.preview
+            self.assertEqual(render.call_count, 3)
+
+
+class ReportSnapshotTest(TestCase):
+    def setUp(self):
+        for i in range(3):
+            User.objects.create(username=f"user{i}")
+        self.report = Report.objects.create(
+            name="users",
+            model=ContentType.objects.get_for_model(User),
+            use_snapshot=True,
+        )
+        ReportColumn.objects.create(
+            report=self.report, column="username", name="username"
+        )
+
+    def usernames(self):
+        return sorted(row[0] for row in snapshotrows(self.report))
+
+    def test_incremental_refresh_by_primary_key(self):
+        refresh_snapshot(self.report)
+        User.objects.create(username="user3")
+        User.objects.filter(username="user0").update(username="renamed")
+        User.objects.filter(username="user1").delete()
+        snapshot = refresh_snapshot(self.report)
+        # changes of existing rows need a timestamp field or a rebuild
+        self.assertEqual(self.usernames(), ["user0", "user2", "user3"])
+
+        snapshot.rebuilt -= datetime.timedelta(days=2)
+        snapshot.save()
+        refresh_snapshot(self.report)
+        self.assertEqual(self.usernames(), ["renamed", "user2", "user3"])
+
+    def test_incremental_refresh_by_timestampfield(self):
+        User.objects.update(last_login=timezone.now() - datetime.timedelta(days=1))
+        self.report.snapshot_timestampfield = "last_login"
+        self.report.save()
+        refresh_snapshot(self.report)
+        User.objects.filter(username="user0").update(
+            username="renamed", last_login=timezone.now()
+        )
+        refresh_snapshot(self.report)
+        self.assertEqual(self.usernames(), ["renamed", "user1", "user2"])
+
+    def test_uuid_values(self):
+        value = uuid.uuid4()
+        self.assertEqual(decodevalue(json.loads(json.dumps(encodevalue(value)))), value)
+
+
+class ReportExportTaskTest(TestCase):
+    def setUp(self):
+        mediaroot = tempfile.TemporaryDirectory()
+        self.addCleanup(mediaroot.cleanup)
+        mediasettings = override_settings(MEDIA_ROOT=mediaroot.name)
+        mediasettings.enable()
+        self.addCleanup(mediasettings.disable)
+        for i in range(3):
+            User.objects.create(username=f"user{i}")
+        self.report = Report.objects.create(
+            name="users", model=ContentType.objects.get_for_model(User)
+        )
+        ReportColumn.objects.create(
+            report=self.report, column="username", name="username"
+        )
+        self.export = ReportExport.objects.create(report=self.report, format="csv")
+
+    def run_export(self):
+        tasks.export_report(self.export.pk)
+        self.export.refresh_from_db()
+
+    def test_export_is_done(self):
+        self.assertEqual(self.export.status, ReportExport.PENDING)
+        self.run_export()
+        self.assertEqual(self.export.status, ReportExport.DONE)
+        self.assertEqual((self.export.progress, self.export.total), (3, 3))
+        self.assertTrue(self.export.finished)
+        with self.export.file.open("rb") as file:
+            self.assertIn(b"user2", file.read())
+
+    def test_invalid_aggregation_fails(self):
+        ReportColumn.objects.create(
+            report=self.report,
+            column="is_anonymous",
+            name="anonymous",
+            aggregation="count",
+        )
+        self.run_export()
+        self.assertEqual(self.export.status, ReportExport.FAILED)
+        self.assertIn("is_anonymous", self.export.error)
+        self.assertFalse(self.export.file)
+
+    def test_unexpected_error_fails(self):
+        with mock.patch.object(
+            Report, "exportdata", side_effect=RuntimeError("broken")
+        ), self.assertLogs(tasks.logger, "ERROR"):
+            self.run_export()
+        self.assertEqual(self.export.status, ReportExport.FAILED)
+        self.assertEqual(self.export.error, "broken")
+
+    def test_enqueue_runs_export_after_commit(self):
+        executor = mock.Mock()
+        with mock.patch.object(tasks, "_executor", None), mock.patch.object(
+            tasks, "ThreadPoolExecutor", return_value=executor
+        ) as poolclass, mock.patch.object(
+            tasks.transaction, "on_commit", lambda func: func()
+        ):
+            tasks.enqueue_export(self.export)
+            tasks.enqueue_export(self.export)
+        poolclass.assert_called_once()
+        self.assertEqual(
+            executor.submit.call_args_list,
+            [mock.call(tasks._run_in_thread, self.export.pk)] * 2,
+        )
@@ -0,0 +1,32 @@
+import threading
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from bread.utils import thumbnails
+
+
+class PendingThumbnailTest(SimpleTestCase):
+    def test_background_job_is_reused(self):
+        release = threading.Event()
+        generated = []
+
+        def generate(fieldfile):
+            release.wait(5)
+            generated.append(fieldfile)
+            return "thumbnail"
+
+        fieldfile = SimpleNamespace(storage=object(), name="image.png")
+        with mock.patch.object(
+            thumbnails, "generate_thumbnail", generate
+        ), mock.patch.object(
+            thumbnails,
+            "existing_thumbnail",
+            lambda f: "thumbnail" if generated else None,
+        ):
+            self.assertTrue(thumbnails.enqueue_thumbnail(fieldfile))
+            self.assertIsNone(thumbnails.pending_thumbnail(fieldfile, 0.01))
+            release.set()
+            self.assertEqual(thumbnails.pending_thumbnail(fieldfile, 5), "thumbnail")
+        self.assertEqual(generated, [fieldfile])
@@ -0,0 +1,397 @@
+from unittest import mock
+
+import htmlgenerator as hg
+from django.contrib.auth.models import Group, Permission, User
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.exceptions import SuspiciousOperation, ValidationError
+from django.core.files.base import ContentFile
+from django.db.models.signals import post_save
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import include, path
+from guardian.shortcuts import assign_perm
+
+from bread.contrib.reports.models import Report, ReportExport
+from bread.menu import Link
+from bread.utils.urls import default_model_paths, reverse_model
+from bread.views import BrowseView, BulkDeleteView, BulkEditView, EditView
+from bread.views.browse import selected_objects
+from bread.views.edit import generate_copyview
+from bread.views.util import _LAYOUT_CACHE, LAYOUT_CACHE_SIZE
+
+urlpatterns = [
+    path("", include("bread.urls")),
+    path("reports/", include("bread.contrib.reports.urls")),
+    *default_model_paths(Group),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class StreamingBrowseViewTest(TestCase):
+    def setUp(self):
+        Group.objects.bulk_create(Group(name=f"group{i:02}") for i in range(30))
+        self.user = User.objects.create_superuser("admin", "admin@example.com", "pw")
+
+    def get(self, **kwargs):
+        request = RequestFactory().get("/", {"itemsperpage": 25, "ordering": "name"})
+        request.user = self.user
+        view = BrowseView.as_view(model=Group, columns=["name"], **kwargs)
+        return view(request)
+
+    def test_streamed_page(self):
+        response = self.get(streaming=True, streaming_chunk_size=100)
+        self.assertTrue(response.streaming)
+        chunks = [chunk.decode() for chunk in response.streaming_content]
+        self.assertGreater(len(chunks), 2)
+        page = "".join(chunks)
+        self.assertNotIn("bread-layout-", page)
+        self.assertIn("group00", page)
+        self.assertIn("group24", page)
+        self.assertNotIn("group25", page)
+        self.assertIn("</html>", page)
+
+    def test_template_without_layout(self):
+        response = self.get(streaming=True, template_name="bread/base.html")
+        self.assertFalse(response.streaming)
+        self.assertIn("</html>", response.content.decode())
+
+    def test_not_streamed_by_default(self):
+        response = self.get()
+        self.assertFalse(response.streaming)
+        self.assertIn("group24", response.render().content.decode())
+
+
+class LayoutCacheTest(TestCase):
+    def test_library_views_do_not_cache_layouts(self):
+        class EditGroupView(EditView):
+            model = Group
+            fields = ["name"]
+
+        class CachedEditGroupView(EditGroupView):
+            cache_layout = True
+
+        class ExtraFieldView(CachedEditGroupView):
+            fields = ["name", hg.DIV("extra")]
+
+        def buildtwice(viewclass):
+            view = viewclass(model=Group)
+            first = view.layout(RequestFactory().get("/"))
+            view = viewclass(model=Group)
+            return first, view.layout(RequestFactory().get("/"))
+
+        first, second = buildtwice(EditGroupView)
+        self.assertIsNot(first, second)
+        first, second = buildtwice(CachedEditGroupView)
+        self.assertIs(first, second)
+        self.assertIsNone(ExtraFieldView(model=Group).get_layout_cache_key())
+
+    def test_layout_cache_is_bounded(self):
+        class CachedEditGroupView(EditView):
+            model = Group
+            cache_layout = True
+
+        for i in range(LAYOUT_CACHE_SIZE + 10):
+            view = CachedEditGroupView(model=Group)
+            view.fields = ["name"] * (i + 1)
+            view.layout(RequestFactory().get("/"))
+        self.assertLessEqual(len(_LAYOUT_CACHE), LAYOUT_CACHE_SIZE)
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class BulkEditViewTest(TestCase):
+    def setUp(self):
+        self.groups = [Group.objects.create(name=f"group{i}") for i in range(3)]
+        self.user = User.objects.create_user("editor")
+        self.user.user_permissions.add(Permission.objects.get(codename="view_group"))
+
+    def post(self, name, clean_objects=False, selected=None):
+        selected = selected or self.groups
+        request = RequestFactory().post(
+            "/?" + "&".join(f"selected={group.pk}" for group in selected),
+            {"name": name},
+        )
+        request.user = self.user
+        request._messages = CookieStorage(request)
+        view = BulkEditView.as_view(
+            model=Group, fields=["name"], clean_objects=clean_objects
+        )
+        response = view(request)
+        return response, [str(message) for message in request._messages]
+
+    def test_objects_without_permission_are_skipped(self):
+        assign_perm("auth.change_group", self.user, self.groups[0])
+        response, messages = self.post("changed")
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            list(Group.objects.order_by("pk").values_list("name", flat=True)),
+            ["changed", "group1", "group2"],
+        )
+        self.assertIn("No permission to change 2 of the selected objects", messages)
+
+    def test_no_permission_for_any_object(self):
+        response, messages = self.post("changed")
+        self.assertEqual(response.status_code, 302)
+        self.assertIn("login", response.url)
+        self.assertFalse(Group.objects.filter(name="changed").exists())
+
+    def test_validation_errors_are_reported_per_object(self):
+        self.user.user_permissions.add(Permission.objects.get(codename="change_group"))
+        invalid = self.groups[0].pk
+
+        def clean(group):
+            if group.pk == invalid:
+                raise ValidationError("invalid")
+
+        with mock.patch.object(Group, "clean", clean):
+            response, messages = self.post(
+                "changed", clean_objects=True, selected=self.groups[:2]
+            )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            list(Group.objects.order_by("pk").values_list("name", flat=True)),
+            ["group0", "changed", "group2"],
+        )
+        self.assertEqual(len([m for m in messages if "could not be changed" in m]), 1)
+        self.assertIn("Updated 1 group", messages)
+
+    def test_save_signals_are_sent_for_cleaned_objects(self):
+        self.user.user_permissions.add(Permission.objects.get(codename="change_group"))
+        saved = []
+
+        def receiver(sender, instance, update_fields, **kwargs):
+            saved.append((instance.pk, set(update_fields)))
+
+        post_save.connect(receiver, sender=Group)
+        try:
+            self.post("changed", clean_objects=True, selected=self.groups[:1])
+        finally:
+            post_save.disconnect(receiver, sender=Group)
+        self.assertEqual(saved, [(self.groups[0].pk, {"name"})])
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class SelectAllTest(TestCase):
+    def setUp(self):
+        self.groups = [
+            Group.objects.create(name=name) for name in ("keep0", "keep1", "other0")
+        ]
+        self.user = User.objects.create_user("deleter")
+        self.user.user_permissions.add(Permission.objects.get(codename="delete_group"))
+
+    def delete_all(self, query, browseview=BrowseView):
+        request = RequestFactory().get("/", {"selected": "all", "q": query})
+        request.user = self.user
+        request._messages = CookieStorage(request)
+        BulkDeleteView.as_view(model=Group, browseview=browseview)(request)
+        return set(Group.objects.values_list("name", flat=True))
+
+    def test_all_respects_search_query(self):
+        self.user.user_permissions.add(Permission.objects.get(codename="view_group"))
+        self.assertEqual(self.delete_all('name ~ "keep"'), {"other0"})
+
+    def test_all_respects_view_permissions(self):
+        assign_perm("auth.view_group", self.user, self.groups[0])
+        assign_perm("auth.view_group", self.user, self.groups[2])
+        self.assertEqual(self.delete_all('name ~ "keep"'), {"keep1", "other0"})
+
+    def test_all_respects_browseview_queryset(self):
+        class KeepZeroBrowseView(BrowseView):
+            def get_queryset(self):
+                return super().get_queryset().filter(name__endswith="0")
+
+        self.user.user_permissions.add(Permission.objects.get(codename="view_group"))
+        self.assertEqual(
+            self.delete_all('name ~ "keep"', KeepZeroBrowseView), {"keep1", "other0"}
+        )
+
+    def test_all_is_rejected_without_browseview(self):
+        self.user.user_permissions.add(Permission.objects.get(codename="view_group"))
+        with self.assertRaises(SuspiciousOperation):
+            self.delete_all('name ~ "keep"', browseview=None)
+        self.assertEqual(Group.objects.count(), 3)
+
+    def test_selected_ids_respect_view_permissions(self):
+        assign_perm("auth.view_group", self.user, self.groups[0])
+        request = RequestFactory().get(
+            "/", {"selected": [group.pk for group in self.groups]}
+        )
+        request.user = self.user
+        self.assertEqual(
+            list(selected_objects(Group.objects.all(), request)), self.groups[:1]
+        )
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class BulkDeleteTest(TestCase):
+    def setUp(self):
+        self.contenttypes = [
+            ContentType.objects.create(app_label="bulkdelete", model=f"model{i}")
+            for i in range(5)
+        ]
+        self.user = User.objects.create_superuser("admin", "admin@example.com", "pw")
+
+    def delete(self):
+        request = RequestFactory().get(
+            "/", {"selected": [contenttype.pk for contenttype in self.contenttypes]}
+        )
+        request.user = self.user
+        request._messages = CookieStorage(request)
+        view = BulkDeleteView.as_view(model=ContentType, batch_size=2, url="/")
+        with mock.patch.object(
+            BulkDeleteView,
+            "delete_batch",
+            autospec=True,
+            side_effect=BulkDeleteView.delete_batch,
+        ) as delete_batch:
+            view(request)
+        return (
+            [len(call.args[1]) for call in delete_batch.call_args_list],
+            [str(message) for message in request._messages],
+        )
+
+    def remaining(self):
+        return list(ContentType.objects.filter(app_label="bulkdelete").order_by("pk"))
+
+    def test_deleted_in_batches(self):
+        batches, messages = self.delete()
+        self.assertEqual(batches, [2, 2, 1])
+        self.assertEqual(self.remaining(), [])
+        self.assertIn("Deleted 5 content types", messages)
+
+    def test_protected_objects_are_reported(self):
+        for contenttype in self.contenttypes[1], self.contenttypes[3]:
+            Report.objects.create(name="report", model=contenttype)
+        batches, messages = self.delete()
+        # both batches with a protected object are split up
+        self.assertEqual(batches, [2, 1, 1, 2, 1, 1, 1])
+        self.assertEqual(self.remaining(), [self.contenttypes[1], self.contenttypes[3]])
+        self.assertEqual(len([m for m in messages if "could not be deleted" in m]), 2)
+        self.assertIn("Deleted 3 content types", messages)
+
+    def test_unexpected_errors_are_raised(self):
+        with mock.patch(
+            "django.db.models.QuerySet.delete", side_effect=RuntimeError("broken")
+        ):
+            with self.assertRaises(RuntimeError):
+                self.delete()
+        self.assertEqual(len(self.remaining()), 5)
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class CopyViewTest(TestCase):
+    def test_many_to_many_relations_are_copied(self):
+        group = Group.objects.create(name="group")
+        group.permissions.set(Permission.objects.order_by("pk")[:2])
+        response = generate_copyview(Group, labelfield="name")(
+            RequestFactory().get("/"), pk=group.pk
+        )
+        copy = Group.objects.get(name="group (Copy)")
+        self.assertEqual(response.url, reverse_model(Group, "edit", args=[copy.pk]))
+        self.assertEqual(
+            list(copy.permissions.order_by("pk")),
+            list(group.permissions.order_by("pk")),
+        )
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class RowActionPermissionTest(TestCase):
+    def setUp(self):
+        self.groups = [Group.objects.create(name=f"group{i}") for i in range(3)]
+        self.user = User.objects.create_user("viewer")
+        self.user.user_permissions.add(Permission.objects.get(codename="view_group"))
+        assign_perm("auth.change_group", self.user, self.groups[0])
+
+    def get(self):
+        request = RequestFactory().get("/", {"ordering": "name"})
+        request.user = self.user
+        view = BrowseView.as_view(
+            model=Group,
+            columns=["name"],
+            rowactions=[
+                Link("/", label="Unrestricted action"),
+                Link("/", label="Restricted action", permissions=["auth.change_group"]),
+            ],
+        )
+        return view(request).rendered_content
+
+    def test_actions_are_shown_on_permitted_rows(self):
+        page = self.get()
+        self.assertEqual(page.count("Unrestricted action"), 3)
+        self.assertEqual(page.count("Restricted action"), 1)
+
+    def test_global_permission_shows_actions_on_all_rows(self):
+        self.user.user_permissions.add(Permission.objects.get(codename="change_group"))
+        self.assertEqual(self.get().count("Restricted action"), 3)
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class ReportExportViewTest(TestCase):
+    def setUp(self):
+        self.report = Report.objects.create(
+            name="users", model=ContentType.objects.get_for_model(User)
+        )
+        self.user = User.objects.create_user("exporter")
+        self.other = User.objects.create_user("other")
+        self.client.force_login(self.user)
+
+    def startexport(self):
+        return self.client.post(
+            reverse_model(Report, "export", kwargs={"report_pk": self.report.pk}),
+            {"format": "csv"},
+        )
+
+    def test_startexport_requires_post(self):
+        assign_perm("reports.view_report", self.user, self.report)
+        response = self.client.get(
+            reverse_model(Report, "export", kwargs={"report_pk": self.report.pk})
+        )
+        self.assertEqual(response.status_code, 405)
+        self.assertFalse(ReportExport.objects.exists())
+
+    def test_startexport_requires_view_permission(self):
+        self.assertEqual(self.startexport().status_code, 403)
+        self.assertFalse(ReportExport.objects.exists())
+
+    def test_creator_can_list_and_query_export(self):
+        assign_perm("reports.view_report", self.user, self.report)
+        with mock.patch("bread.contrib.reports.urls.enqueue_export") as enqueue:
+            response = self.startexport()
+        export = ReportExport.objects.get()
+        enqueue.assert_called_once_with(export)
+        self.assertRedirects(
+            response,
+            reverse_model(ReportExport, "browse"),
+            fetch_redirect_response=False,
+        )
+        self.assertEqual((export.user, export.format), (self.user, "csv"))
+
+        response = self.client.get(reverse_model(ReportExport, "browse"))
+        self.assertEqual(list(response.context["object_list"]), [export])
+        status = self.client.get(
+            reverse_model(ReportExport, "status", kwargs={"export_pk": export.pk})
+        ).json()
+        self.assertEqual(status["status"], ReportExport.PENDING)
+        self.assertIsNone(status["download"])
+        download = reverse_model(
+            ReportExport, "download", kwargs={"export_pk": export.pk}
+        )
+        self.assertEqual(self.client.get(download).status_code, 404)
+
+        export.status = ReportExport.DONE
+        export.file.save("users.csv", ContentFile(b"username"), save=True)
+        self.addCleanup(export.file.delete, save=False)
+        status = self.client.get(
+            reverse_model(ReportExport, "status", kwargs={"export_pk": export.pk})
+        ).json()
+        self.assertEqual(status["download"], download)
+        response = self.client.get(download)
+        self.assertEqual(b"".join(response.streaming_content), b"username")
+        response.close()
+
+    def test_other_users_cannot_access_export(self):
+        export = ReportExport.objects.create(report=self.report, user=self.other)
+        for name in ("status", "download"):
+            response = self.client.get(
+                reverse_model(ReportExport, name, kwargs={"export_pk": export.pk})
+            )
+            self.assertEqual(response.status_code, 404)
@@ -80,4 +80,5 @@ external_urlpatterns = [
 urlpatterns = [
     path("login", system.BreadLoginView.as_view(), name="login"),
     path("logout", system.BreadLogoutView.as_view(), name="logout"),
+    path("thumbnail/<str:token>", system.thumbnail, name="thumbnail"),
 ] + external_urlpatterns
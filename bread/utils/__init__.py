@@ -1,3 +1,9 @@
 from .export import *  # noqa
+from .files import *  # noqa
 from .model_helpers import *  # noqa
+from .modelversions import *  # noqa
+from .pagination import *  # noqa
+from .queryexpression import *  # noqa
+from .queryplanner import *  # noqa
+from .thumbnails import *  # noqa
 from .urls import *  # noqa
@@ -1,10 +1,20 @@
+import csv
+import datetime
 import html
+import importlib.util
 import io
+import itertools
+import numbers
+import pickle  # nosec because only used for a temporary buffer
 import re
+import tempfile
+from collections.abc import Iterable
 
 from django.conf import settings
-from django.http import HttpResponse
+from django.db import models
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from django.template import Context, Template
+from django.utils import timezone
 from django.utils.html import strip_tags
 
 
@@ -43,39 +53,147 @@ def html_to_pdf(html, as_http_response=False, name=None):
     return ret
 
 
-def generate_excel(rows, columns):
+# replace HTML line breaks with newlines
+NEWLINE_REGEX = re.compile(r"<\s*br\s*/?\s*>")
+
+
+def html_to_text(value):
+    """Converts a value rendered as HTML into plain text"""
+    return html.unescape(NEWLINE_REGEX.sub(r"\n", strip_tags(str(value)))).strip()
+
+
+def html_to_excelvalue(value):
+    """Converts a value rendered as HTML into a value for an excel cell"""
+    cleaned = html_to_text(value)
+    return int(cleaned) if cleaned.isdigit() else cleaned
+
+
+def excelvalue(value):
+    """
+    Converts a python value into a value which can be stored as a typed excel cell,
+    numbers, dates and booleans are kept, everything else is converted to text.
     """
-    columns: dict with {<columnname>: formatting_function(row)}
+    # djmoney is imported lazy because it requires configured settings
+    from djmoney.money import Money
+
+    if value is None or isinstance(value, (bool, str, numbers.Number)):
+        return value
+    if isinstance(value, Money):
+        return value.amount
+    if isinstance(value, datetime.datetime):
+        # excel does not support timezones
+        if timezone.is_aware(value):
+            value = timezone.localtime(value).replace(tzinfo=None)
+        return value
+    if isinstance(value, (datetime.date, datetime.time, datetime.timedelta)):
+        return value
+    if isinstance(value, models.fields.files.FieldFile):
+        return value.name or None
+    if isinstance(value, models.Manager):
+        value = value.all()
+    if isinstance(value, Iterable) and not isinstance(value, (bytes, dict)):
+        return ", ".join(str(excelvalue(v)) for v in value)
+    return str(value)
+
+
+def rawvalue(instance, accessor):
+    """
+    Resolves an accessor like "publisher.name" to the python value instead of
+    rendering it to HTML like bread.formatters.render_field, for use with excelvalue
     """
+    for fieldname in accessor.split("."):
+        if instance is None:
+            return None
+        if hasattr(instance, f"get_{fieldname}_display"):
+            instance = getattr(instance, f"get_{fieldname}_display")()
+        else:
+            instance = getattr(instance, fieldname, None)
+        if callable(instance) and not isinstance(instance, models.Manager):
+            instance = instance()
+    return instance
+
+
+def _excel_styles(workbook):
+    """Registers the named styles for headers and cells, returns their names"""
+    # openpyxl is an extra requirement
+    from openpyxl.styles import Alignment, Font, NamedStyle
+
+    if "bread_header" not in workbook.named_styles:
+        workbook.add_named_style(
+            NamedStyle(
+                name="bread_header",
+                font=Font(bold=True),
+                alignment=Alignment(wrap_text=True),
+            )
+        )
+    if "bread_cell" not in workbook.named_styles:
+        workbook.add_named_style(
+            NamedStyle(name="bread_cell", alignment=Alignment(wrap_text=True))
+        )
+    return "bread_header", "bread_cell"
+
+
+def _excel_columnwidth(max_length):
+    return min([(max_length + 3) * 1.2, 50])
+
+
+def generate_excel(rows, columns, filters=True, raw=False):
+    """
+    Generates a formatted workbook in a single pass over the data, the result
+    does not need to be passed through prepare_excel.
+
+        columns: dict with {<columnname>: formatting_function(row)}
+        filters: If True enable excel filtering headers
+        raw: If True the formatting functions return python values which are
+             written as typed cells (see excelvalue) instead of HTML
+    """
+    # openpyxl is an extra requirement
     import openpyxl
-    from openpyxl.styles import Font
+    from openpyxl.utils import get_column_letter
 
     workbook = openpyxl.Workbook()
-    workbookcolumns = workbook.active.iter_cols(
-        min_row=1, max_col=len(columns) + 1, max_row=len(rows) + 1
-    )
-    newline_regex = re.compile(
-        r"<\s*br\s*/?\s*>"
-    )  # replace HTML line breaks with newlines
-    for columnname, columndata in zip(columns, workbookcolumns):
-        columndata[0].value = str(columnname)
-        columndata[0].font = Font(bold=True)
-        for i, cell in enumerate(columndata[1:]):
-            html_value = str(columns[columnname](rows[i]))
-            cleaned = html.unescape(newline_regex.sub(r"\n", strip_tags(html_value)))
-            cell.value = cleaned
+    worksheet = workbook.active
+    headerstyle, cellstyle = _excel_styles(workbook)
+    formatters = list(columns.values())
+    tovalue = excelvalue if raw else html_to_excelvalue
+    max_lengths = []
+    for i, columnname in enumerate(columns, 1):
+        cell = worksheet.cell(row=1, column=i, value=str(columnname))
+        cell.style = headerstyle
+        max_lengths.append(len(cell.value))
+    for rowindex, row in enumerate(rows, 2):
+        for i, formatter in enumerate(formatters):
+            value = tovalue(formatter(row))
+            cell = worksheet.cell(row=rowindex, column=i + 1)
+            # the style needs to be set first, the value sets the format of dates
+            cell.style = cellstyle
+            cell.value = value
+            length = len(str(value))
+            if length > max_lengths[i]:
+                max_lengths[i] = length
+
+    for i, max_length in enumerate(max_lengths, 1):
+        worksheet.column_dimensions[get_column_letter(i)].width = _excel_columnwidth(
+            max_length
+        )
+    if filters is True and columns:
+        worksheet.auto_filter.ref = f"A1:{get_column_letter(len(columns))}1"
     return workbook
 
 
-def xlsxresponse(workbook, title, filters=True):
+def xlsxresponse(workbook, title, filters=True, prepare=True):
     """
     Returns workbook as a downloadable file
 
         workbook: openpyxl workbook
         title: filename without extension
+        filters: passed to prepare_excel
+        prepare: If False the workbook is not passed through prepare_excel,
+                 e.g. for workbooks which have been created with generate_excel
         returns: HttpResponse with attachment
     """
-    workbook = prepare_excel(workbook, filters)
+    if prepare:
+        workbook = prepare_excel(workbook, filters)
     buf = io.BytesIO()
     workbook.save(buf)
     buf.seek(0)
@@ -94,29 +212,329 @@ def prepare_excel(workbook, filters=True):
     """
     # openpyxl is an extra requirement
     from openpyxl.styles import Alignment
+    from openpyxl.utils import get_column_letter
 
+    _, cellstyle = _excel_styles(workbook)
+    wrap = Alignment(wrap_text=True)
     for worksheet in workbook:
-        # estimate column width
-        for col in worksheet.columns:
-            max_length = 0
-            column = col[0].column_letter
-            for cell in col:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            adjusted_width = (max_length + 3) * 1.2
-            worksheet.column_dimensions[column].width = min([adjusted_width, 50])
-
-            # enable excel filters
-            if filters is True:
-                worksheet.auto_filter.ref = f"A1:{column}1"
-
-        # enable word wrap
+        max_lengths = {}
         for row in worksheet.iter_rows():
             for cell in row:
-                cell.alignment = Alignment(wrap_text=True)
                 if isinstance(cell.value, str):
                     cell.value = cell.value.strip()
                     if cell.value.isdigit():
                         cell.value = int(cell.value)
+                # keep e.g. the bold font of header cells
+                if cell.has_style:
+                    cell.alignment = wrap
+                else:
+                    cell.style = cellstyle
+                length = len(str(cell.value))
+                if length > max_lengths.get(cell.column, 0):
+                    max_lengths[cell.column] = length
+
+        # estimate column width
+        for column, max_length in max_lengths.items():
+            worksheet.column_dimensions[
+                get_column_letter(column)
+            ].width = _excel_columnwidth(max_length)
+
+        # enable excel filters
+        if filters is True and max_lengths:
+            worksheet.auto_filter.ref = f"A1:{get_column_letter(max(max_lengths))}1"
 
     return workbook
+
+
+def write_excel(rows, columns, file, filters=True, widthsample=2000, raw=False):
+    """
+    Writes an excel file without keeping the rows or cells in memory (openpyxl
+    write-only mode). The result is formatted the same way as with prepare_excel.
+
+        rows: iterable, e.g. queryset.iterator()
+        columns: dict with {<columnname>: formatting_function(row)}
+        file: filename or file-like object
+        filters: If True enable excel filtering headers
+        widthsample: number of rows which are used to estimate the column widths
+        raw: If True the formatting functions return python values, see generate_excel
+    """
+    # openpyxl is an extra requirement
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.utils import get_column_letter
+
+    workbook = openpyxl.Workbook(write_only=True)
+    worksheet = workbook.create_sheet()
+    headerstyle, cellstyle = _excel_styles(workbook)
+
+    def cells(values, style=cellstyle):
+        for value in values:
+            cell = WriteOnlyCell(worksheet)
+            # the style needs to be set first, the value sets the format of dates
+            cell.style = style
+            cell.value = value
+            yield cell
+
+    tovalue = excelvalue if raw else html_to_excelvalue
+
+    def rowvalues(row):
+        return [tovalue(formatter(row)) for formatter in columns.values()]
+
+    # column dimensions need to be written before the first row
+    rows = iter(rows)
+    sample = [rowvalues(row) for row in itertools.islice(rows, widthsample)]
+    for i, columnname in enumerate(columns):
+        max_length = max(
+            [len(str(columnname))] + [len(str(values[i])) for values in sample]
+        )
+        worksheet.column_dimensions[
+            get_column_letter(i + 1)
+        ].width = _excel_columnwidth(max_length)
+    if filters is True and columns:
+        worksheet.auto_filter.ref = f"A1:{get_column_letter(len(columns))}1"
+
+    worksheet.append(list(cells((str(c) for c in columns), style=headerstyle)))
+    for values in sample:
+        worksheet.append(list(cells(values)))
+    for row in rows:
+        worksheet.append(list(cells(rowvalues(row))))
+    workbook.save(file)
+
+
+def xlsxstreamingresponse(rows, columns, title, filters=True, raw=False):
+    """
+    Returns the rows as a downloadable excel file, memory usage is independent of
+    the number of rows. The file is generated in a temporary file and streamed
+    from there.
+
+        rows: iterable, e.g. queryset.iterator()
+        columns: dict with {<columnname>: formatting_function(row)}
+        title: filename without extension
+        raw: If True the formatting functions return python values, see generate_excel
+        returns: FileResponse (StreamingHttpResponse) with attachment
+    """
+    file = tempfile.TemporaryFile()
+    write_excel(rows, columns, file, filters, raw=raw)
+    file.seek(0)
+    return FileResponse(
+        file,
+        as_attachment=True,
+        filename=f"{title}.xlsx",
+        content_type="application/vnd.ms-excel",
+    )
+
+
+class _Echo:
+    """File-like object which returns the written value, used to stream CSV rows"""
+
+    def write(self, value):
+        return value
+
+
+def csvstreamingresponse(rows, columns, title, raw=False):
+    """
+    Returns the rows as a downloadable CSV file which is generated while it is sent.
+
+        rows: iterable, e.g. queryset.iterator()
+        columns: dict with {<columnname>: formatting_function(row)}
+        title: filename without extension
+        raw: If True the formatting functions return python values, see generate_excel
+        returns: StreamingHttpResponse with attachment
+    """
+    tovalue = excelvalue if raw else html_to_text
+    writer = csv.writer(_Echo())
+
+    def generate():
+        yield writer.writerow([str(c) for c in columns])
+        for row in rows:
+            yield writer.writerow(
+                [tovalue(formatter(row)) for formatter in columns.values()]
+            )
+
+    response = StreamingHttpResponse(generate(), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="{title}.csv"'
+    return response
+
+
+def _arrowtype(values):
+    """pyarrow type of a list of python values, None if all values are None"""
+    import pyarrow
+
+    try:
+        arraytype = pyarrow.array(values).type
+    except (pyarrow.ArrowException, TypeError, ValueError):
+        return pyarrow.string()
+    if pyarrow.types.is_null(arraytype):
+        return None
+    if pyarrow.types.is_decimal(arraytype):
+        # the precision of a single batch might be too small for other batches
+        return pyarrow.decimal128(38, arraytype.scale)
+    return arraytype
+
+
+def _commonarrowtype(type1, type2):
+    """Type which can store the values of both types, text if there is none"""
+    import pyarrow
+
+    if type1 is None or type1 == type2:
+        return type2
+    if type2 is None:
+        return type1
+    numeric = (pyarrow.types.is_integer, pyarrow.types.is_floating)
+    if any(f(type1) for f in numeric) and any(f(type2) for f in numeric):
+        return pyarrow.float64()
+    decimals = [t for t in (type1, type2) if pyarrow.types.is_decimal(t)]
+    if decimals and all(
+        pyarrow.types.is_decimal(t) or pyarrow.types.is_integer(t)
+        for t in (type1, type2)
+    ):
+        return pyarrow.decimal128(38, max(t.scale for t in decimals))
+    return pyarrow.string()
+
+
+def _arrowbatches(rows, columns, raw, batchsize):
+    """
+    Generates pyarrow record batches. A file can only have one schema, therefore
+    the converted rows are first buffered in a temporary file while the column
+    types are determined from all rows: integers and floats are exported as floats,
+    decimals with the largest scale, columns with values of other different types
+    as text.
+    """
+    # pyarrow is an optional dependency
+    import pyarrow
+
+    tovalue = excelvalue if raw else html_to_text
+    names = [str(c) for c in columns]
+    types = [None] * len(names)
+    rows = iter(rows)
+
+    def toarray(values, type_):
+        if type_ == pyarrow.string():
+            values = [None if v is None else str(v) for v in values]
+        return pyarrow.array(values, type=type_)
+
+    with tempfile.TemporaryFile() as buffer:
+        batchcount = 0
+        while True:
+            batch = [
+                [tovalue(formatter(row)) for formatter in columns.values()]
+                for row in itertools.islice(rows, batchsize)
+            ]
+            if not batch:
+                break
+            values = list(zip(*batch))
+            types = [
+                _commonarrowtype(type_, _arrowtype(column))
+                for type_, column in zip(types, values)
+            ]
+            pickle.dump(values, buffer)
+            batchcount += 1
+            if len(batch) < batchsize:
+                break
+
+        schema = pyarrow.schema(
+            [(name, type_ or pyarrow.string()) for name, type_ in zip(names, types)]
+        )
+        if not batchcount:
+            yield pyarrow.record_batch(
+                [toarray((), t) for t in schema.types], schema=schema
+            )
+        buffer.seek(0)
+        for _ in range(batchcount):
+            values = pickle.load(buffer)  # nosec because written by this function
+            yield pyarrow.record_batch(
+                [toarray(column, t) for column, t in zip(values, schema.types)],
+                schema=schema,
+            )
+
+
+def _columnarresponse(write, rows, columns, title, raw, extension, content_type):
+    file = tempfile.TemporaryFile()
+    batches = _arrowbatches(rows, columns, raw, batchsize=10000)
+    try:
+        first = next(batches)
+        write(file, first.schema, itertools.chain([first], batches))
+    except BaseException:
+        file.close()
+        raise
+    finally:
+        batches.close()
+    file.seek(0)
+    return FileResponse(
+        file,
+        as_attachment=True,
+        filename=f"{title}.{extension}",
+        content_type=content_type,
+    )
+
+
+def arrowstreamingresponse(rows, columns, title, raw=False):
+    """
+    Returns the rows as a downloadable Arrow IPC file, requires pyarrow.
+    Parameters are the same as for csvstreamingresponse.
+    """
+
+    def write(sink, schema, batches):
+        import pyarrow
+
+        with pyarrow.ipc.new_file(sink, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+
+    return _columnarresponse(
+        write,
+        rows,
+        columns,
+        title,
+        raw,
+        "arrow",
+        "application/vnd.apache.arrow.file",
+    )
+
+
+def parquetstreamingresponse(rows, columns, title, raw=False):
+    """
+    Returns the rows as a downloadable Parquet file, requires pyarrow.
+    Parameters are the same as for csvstreamingresponse.
+    """
+
+    def write(sink, schema, batches):
+        import pyarrow.parquet
+
+        with pyarrow.parquet.ParquetWriter(sink, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+
+    return _columnarresponse(
+        write,
+        rows,
+        columns,
+        title,
+        raw,
+        "parquet",
+        "application/vnd.apache.parquet",
+    )
+
+
+# Functions which take the parameters (rows, columns, title, raw=False) and return
+# a response with a file, e.g. EXPORT_BACKENDS["ods"] = my_ods_response could be
+# added by an app to support additional formats.
+EXPORT_BACKENDS = {
+    "xlsx": xlsxstreamingresponse,
+    "csv": csvstreamingresponse,
+}
+if importlib.util.find_spec("pyarrow") is not None:
+    EXPORT_BACKENDS["arrow"] = arrowstreamingresponse
+    EXPORT_BACKENDS["parquet"] = parquetstreamingresponse
+
+
+def exportresponse(format, rows, columns, title, raw=False):
+    """
+    Exports the rows with the backend for the given format, see EXPORT_BACKENDS.
+    Raises a ValueError for unknown formats.
+    """
+    if format not in EXPORT_BACKENDS:
+        raise ValueError(
+            f"Unknown export format '{format}', choices are {list(EXPORT_BACKENDS)}"
+        )
+    return EXPORT_BACKENDS[format](rows, columns, title, raw=raw)
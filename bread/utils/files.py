@@ -0,0 +1,102 @@
+import hashlib
+import os
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+
+import bread.settings as app_settings
+
+# directories with more entries are not listed by prefetch_file_exists
+LISTDIR_LIMIT = 1000
+
+
+def _exists_cache_key(storage, name):
+    storage_id = "{}.{}:{}".format(
+        type(storage).__module__,
+        type(storage).__qualname__,
+        getattr(storage, "location", ""),
+    )
+    return (
+        "bread.file_exists."
+        + hashlib.sha1(  # nosec because only used as cache key
+            f"{storage_id}:{name}".encode()
+        ).hexdigest()
+    )
+
+
+def _check_enabled():
+    return getattr(settings, "FILE_EXISTS_CHECK", app_settings.FILE_EXISTS_CHECK)
+
+
+def _cache_timeout():
+    return getattr(
+        settings, "FILE_EXISTS_CACHE_TIMEOUT", app_settings.FILE_EXISTS_CACHE_TIMEOUT
+    )
+
+
+def file_exists(fieldfile):
+    """
+    Cached version of fieldfile.storage.exists(fieldfile.name), results are kept
+    for FILE_EXISTS_CACHE_TIMEOUT seconds. Returns always True without accessing
+    the storage if the setting FILE_EXISTS_CHECK is False.
+    """
+    if not _check_enabled():
+        return True
+    key = _exists_cache_key(fieldfile.storage, fieldfile.name)
+    exists = cache.get(key)
+    if exists is None:
+        exists = fieldfile.storage.exists(fieldfile.name)
+        cache.set(key, exists, _cache_timeout())
+    return exists
+
+
+def _listdir(storage, directory):
+    """
+    Returns the names of the files in a directory of the storage or None if the
+    storage does not implement listdir, the directory can not be listed or has
+    more than LISTDIR_LIMIT files
+    """
+    try:
+        names = storage.listdir(directory)[1]
+    except NotImplementedError:
+        return None
+    except FileNotFoundError:
+        return set()
+    except OSError:
+        return None
+    if len(names) > LISTDIR_LIMIT:
+        return None
+    return set(names)
+
+
+def prefetch_file_exists(fieldfiles):
+    """
+    Checks the existence of many files at once and stores the results in the cache
+    of file_exists. Files which are not yet cached are grouped by directory and
+    each directory is listed once with storage.listdir instead of checking every
+    single file. Files of storages without listdir and of large directories are
+    checked file by file.
+    """
+    if not _check_enabled():
+        return
+    keys = {}
+    for fieldfile in fieldfiles:
+        if fieldfile:
+            keys[_exists_cache_key(fieldfile.storage, fieldfile.name)] = fieldfile
+    cached = cache.get_many(keys.keys())
+    directories = defaultdict(list)
+    for key, fieldfile in keys.items():
+        if key not in cached:
+            directory = os.path.dirname(fieldfile.name)
+            directories[(fieldfile.storage, directory)].append((key, fieldfile))
+
+    results = {}
+    for (storage, directory), files in directories.items():
+        existing = _listdir(storage, directory) if len(files) > 1 else None
+        for key, fieldfile in files:
+            if existing is None:
+                results[key] = storage.exists(fieldfile.name)
+            else:
+                results[key] = os.path.basename(fieldfile.name) in existing
+    cache.set_many(results, _cache_timeout())
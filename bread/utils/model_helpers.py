@@ -1,5 +1,7 @@
 from django.core.exceptions import FieldDoesNotExist
-from django.db import models
+from django.db import connections, models, transaction
+
+from .modelversions import _increase_version, increase_model_version
 
 
 def pretty_modelname(model, plural=False):
@@ -48,6 +50,11 @@ def resolve_modellookup(model, accessor):
             except FieldDoesNotExist:
                 attrib = getattr(attrib, attribstr)
         elif isinstance(attrib, models.fields.related.RelatedField):
+            # e.g. "authors.all", the manager method refers to the relationship itself
+            if (attrib.many_to_many or attrib.one_to_many) and hasattr(
+                models.Manager, attribstr
+            ):
+                continue
             attrib = attrib.related_model
             try:
                 attrib = attrib._meta.get_field(attribstr)
@@ -72,13 +79,60 @@ def has_permission(user, operation, instance):
         raise RuntimeError(
             f"argument 'operation' must be one of {operations} but was {operation}"
         )
-    return user.has_perm(
-        f"{instance._meta.app_label}.{operation}_{instance._meta.model_name}", instance
-    ) or user.has_perm(
-        f"{instance._meta.app_label}.{operation}_{instance._meta.model_name}"
+    return user_has_perm(
+        user,
+        f"{instance._meta.app_label}.{operation}_{instance._meta.model_name}",
+        instance,
     )
 
 
+def _objectpermission_key(obj):
+    return (obj._meta.label, str(obj.pk))
+
+
+def prefetch_permissions(user, objects):
+    """
+    Loads the object permissions of user for all objects at once, with two queries
+    per model (user and group permissions). user_has_perm answers checks for these
+    objects afterwards from memory. The permissions are kept on the user object,
+    which is created for every request.
+    """
+    from guardian.core import ObjectPermissionChecker
+
+    if not user.is_active or user.is_superuser:
+        return  # user.has_perm does not need the database in these cases
+    prefetched = getattr(user, "_bread_objectpermissions", None)
+    if prefetched is None:
+        prefetched = {}
+        user._bread_objectpermissions = prefetched
+    bymodel = {}
+    for obj in objects:
+        if obj.pk is not None and _objectpermission_key(obj) not in prefetched:
+            bymodel.setdefault(type(obj), []).append(obj)
+    for instances in bymodel.values():
+        checker = ObjectPermissionChecker(user)
+        checker.prefetch_perms(instances)
+        for obj in instances:
+            prefetched[_objectpermission_key(obj)] = {
+                f"{obj._meta.app_label}.{codename}"
+                for codename in checker.get_perms(obj)
+            }
+
+
+def user_has_perm(user, perm, obj=None):
+    """
+    Returns True if user has the permission perm for obj or for all objects.
+    Object permissions which have been loaded with prefetch_permissions are not
+    requested from the database again.
+    """
+    prefetched = getattr(user, "_bread_objectpermissions", None)
+    if obj is not None and prefetched is not None:
+        objectperms = prefetched.get(_objectpermission_key(obj))
+        if objectperms is not None:
+            return perm in objectperms or user.has_perm(perm)
+    return user.has_perm(perm, obj) or user.has_perm(perm)
+
+
 def filter_fieldlist(model, fieldlist, for_form=False):
     if fieldlist is None:
         fieldlist = ["__all__"]
@@ -199,3 +253,107 @@ def get_concrete_instance(instance):
             if child_object:
                 return get_concrete_instance(child_object)
     return instance
+
+
+def has_save_logic(model):
+    """
+    Returns True if model overrides save or has pre_save or post_save receivers,
+    the receiver which increases the cache version of all models is ignored.
+    Objects of such models should not be saved with bulk_create or bulk_update.
+    """
+    if model.save is not models.Model.save:
+        return True
+    for signal in (models.signals.pre_save, models.signals.post_save):
+        receivers = signal._live_receivers(model)
+        if isinstance(receivers, tuple):  # sync and async receivers, Django >= 5
+            receivers = [r for group in receivers for r in group]
+        if any(receiver != _increase_version for receiver in receivers):
+            return True
+    return False
+
+
+def bulk_create_copies(instances, copies, onerror=None):
+    """
+    Inserts the unsaved copies of model instances with bulk_create and copies the
+    many-to-many relations of each instance to its copy with one query per relation.
+    instances and copies must be lists of the same length and the same model.
+    Copies of models which override save or have pre_save or post_save receivers
+    are saved separately with save(), see has_save_logic. If the bulk insert fails, each copy is saved
+    separately as well. If onerror is given, it is called with the instance and
+    the exception of each copy which can not be saved, otherwise the exception is
+    raised. Returns the list of created copies.
+    """
+    if not copies:
+        return []
+    model = type(copies[0])
+    manager = model._default_manager
+    if (
+        model._meta.parents
+        or not connections[manager.db].features.can_return_rows_from_bulk_insert
+        or has_save_logic(model)
+    ):
+        # bulk_create can not be used, does not set the primary keys or skips
+        # the custom save logic
+        return _create_copies_separately(instances, copies, onerror)
+    try:
+        with transaction.atomic(using=manager.db):
+            manager.bulk_create(copies)
+            _copy_many_to_many(model, instances, copies)
+    except Exception:
+        if onerror is None:
+            raise
+        for copy in copies:
+            copy.pk = None
+            copy._state.adding = True
+        return _create_copies_separately(instances, copies, onerror)
+    increase_model_version(model)
+    return copies
+
+
+def _create_copies_separately(instances, copies, onerror):
+    model = type(copies[0])
+    created = []
+    # without onerror the first failing copy rolls back all copies
+    with transaction.atomic(using=model._default_manager.db):
+        for instance, copy in zip(instances, copies):
+            try:
+                with transaction.atomic(using=model._default_manager.db):
+                    copy.save()
+                    _copy_many_to_many(model, [instance], [copy])
+            except Exception as e:
+                if onerror is None:
+                    raise
+                onerror(instance, e)
+            else:
+                created.append(copy)
+    return created
+
+
+def _copy_many_to_many(model, instances, copies):
+    copied = {instance.pk: copy.pk for instance, copy in zip(instances, copies)}
+    for field in model._meta.many_to_many:
+        through = field.remote_field.through
+        source = through._meta.get_field(field.m2m_field_name()).attname
+        target = through._meta.get_field(field.m2m_reverse_field_name()).attname
+        symmetrical = field.remote_field.symmetrical and source != target
+        rows = []
+        for row in through._default_manager.filter(**{f"{source}__in": copied.keys()}):
+            values = {
+                f.attname: getattr(row, f.attname)
+                for f in through._meta.concrete_fields
+                if not f.primary_key
+            }
+            values[source] = copied[values[source]]
+            rows.append(through(**values))
+            if symmetrical:
+                rows.append(
+                    through(
+                        **{
+                            **values,
+                            source: values[target],
+                            target: values[source],
+                        }
+                    )
+                )
+        through._default_manager.bulk_create(rows)
+        increase_model_version(through)
@@ -0,0 +1,46 @@
+import time
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+
+DISPATCH_UID = "bread.modelversion"
+
+
+def _versionkey(model):
+    return f"bread.modelversion.{model._meta.label_lower}"
+
+
+def _increase_version(sender, **kwargs):
+    increase_model_version(sender)
+
+
+def increase_model_version(model):
+    """
+    Increases the cache version of model. Is called for every saved and deleted
+    object and needs to be called after changes which send no signals, e.g.
+    QuerySet.update, bulk_create or bulk_update.
+    """
+    try:
+        cache.incr(_versionkey(model))
+    except ValueError:
+        # the version has never been requested or has been evicted from the cache,
+        # model_cache_version starts with a new timestamp which is larger than
+        # all version numbers which have been used before
+        pass
+
+
+def model_cache_version(model):
+    """
+    Returns a number which should be part of the keys of cached data that depends
+    on the objects of model, e.g. counts or rendered tables. The number is
+    increased when an object of the model is saved or deleted. Versions start at
+    the current time in nanoseconds, so a version which has been evicted from the
+    cache does not start again with a number which has already been used.
+    """
+    return cache.get_or_set(_versionkey(model), time.time_ns, timeout=None)
+
+
+def connect_model_version_receivers():
+    """Connects the receivers which increase the cache versions of all models"""
+    post_save.connect(_increase_version, dispatch_uid=DISPATCH_UID)
+    post_delete.connect(_increase_version, dispatch_uid=DISPATCH_UID)
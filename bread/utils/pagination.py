@@ -0,0 +1,286 @@
+import base64
+import binascii
+import hashlib
+import json
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, models
+from django.utils.functional import cached_property
+
+import bread.settings as app_settings
+
+from .modelversions import model_cache_version
+
+
+def encode_cursor(data):
+    """Encodes a dict of JSON-serializable values into an opaque URL-safe string"""
+    return (
+        base64.urlsafe_b64encode(json.dumps(data, cls=DjangoJSONEncoder).encode())
+        .decode()
+        .rstrip("=")
+    )
+
+
+def decode_cursor(cursor):
+    """Reverse of encode_cursor, returns None for invalid cursors"""
+    if not cursor:
+        return None
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+class KeysetPaginator:
+    """
+    Paginates a queryset by seeking to the last seen row instead of using OFFSET.
+    The returned pages do not know their number or the total count, but every page
+    costs roughly the same as the first page, regardless of how deep it is.
+
+    orderexpression: expression which is used to sort the rows, e.g. Lower("name").
+                     If None the rows are only sorted by primary key.
+    descending: sort descending
+    ordering: identifier of the current ordering, cursors which have been
+              generated for another ordering will be ignored
+    """
+
+    def __init__(
+        self,
+        queryset,
+        per_page,
+        orderexpression=None,
+        descending=False,
+        ordering=None,
+    ):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.orderexpression = orderexpression
+        self.descending = descending
+        self.ordering = ordering
+        self._pages = {}
+        if orderexpression is not None:
+            self.queryset = self.queryset.annotate(
+                _keyset_value=orderexpression,
+                _keyset_isnull=models.Case(
+                    models.When(_keyset_value__isnull=True, then=models.Value(1)),
+                    default=models.Value(0),
+                    output_field=models.IntegerField(),
+                ),
+            )
+
+    def _keys(self):
+        # NULL values are always sorted last, independent of the sorting direction
+        if self.orderexpression is None:
+            return [("pk", self.descending)]
+        return [
+            ("_keyset_isnull", False),
+            ("_keyset_value", self.descending),
+            ("pk", self.descending),
+        ]
+
+    def _rowvalues(self, row):
+        if self.orderexpression is None:
+            return [row.pk]
+        return [int(row._keyset_value is None), row._keyset_value, row.pk]
+
+    def _seek(self, values, backwards):
+        """Lexicographic "row > values" condition (or "<" when seeking backwards)"""
+        condition = None
+        equal = models.Q()
+        for (field, descending), value in zip(self._keys(), values):
+            if field == "_keyset_value" and value is None:
+                continue
+            lookup = "lt" if descending != backwards else "gt"
+            term = equal & models.Q(**{f"{field}__{lookup}": value})
+            condition = term if condition is None else condition | term
+            equal &= models.Q(**{field: value})
+        return condition
+
+    def cursor(self, row, backwards=False):
+        return encode_cursor(
+            {"o": self.ordering, "v": self._rowvalues(row), "b": backwards}
+        )
+
+    def get_page(self, cursor=None):
+        # the pagination widget and the view may both ask for the same page
+        if cursor not in self._pages:
+            self._pages[cursor] = self._get_page(cursor)
+        return self._pages[cursor]
+
+    def _get_page(self, cursor):
+        data = decode_cursor(cursor)
+        if data is not None and (
+            data.get("o") != self.ordering
+            or len(data.get("v", ())) != len(self._keys())
+        ):
+            data = None
+        backwards = bool(data and data.get("b"))
+
+        qs = self.queryset
+        if data is not None:
+            qs = qs.filter(self._seek(data["v"], backwards))
+        qs = qs.order_by(
+            *[
+                f"-{field}" if descending != backwards else field
+                for field, descending in self._keys()
+            ]
+        )
+        rows = list(qs[: self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if backwards:
+            rows.reverse()
+        return KeysetPage(
+            rows,
+            self,
+            has_next=has_more if not backwards else True,
+            has_previous=has_more if backwards else data is not None,
+        )
+
+
+class KeysetPage(Sequence):
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f"<KeysetPage with {len(self)} items>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next and bool(self.object_list)
+
+    def has_previous(self):
+        return self._has_previous and bool(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if not self.has_next():
+            return None
+        return self.paginator.cursor(self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous():
+            return None
+        return self.paginator.cursor(self.object_list[0], backwards=True)
+
+
+class EstimatedCount(int):
+    """Marks a count which is only an approximation of the real number of rows"""
+
+
+def exact_count(queryset):
+    return queryset.count()
+
+
+def cached_count(queryset):
+    """
+    Caches counts per model and SQL query. Because the browse querysets are already
+    restricted to the objects which the user is allowed to see, the SQL query
+    includes the permission scope of the user. Saving or deleting an instance of the
+    model invalidates all cached counts of the model (see model_cache_version),
+    other changes (e.g. to related models or queryset.update) are only picked up
+    after COUNT_CACHE_TIMEOUT.
+    """
+    model = queryset.model
+    timeout = getattr(settings, "COUNT_CACHE_TIMEOUT", app_settings.COUNT_CACHE_TIMEOUT)
+    version = model_cache_version(model)
+    sql, params = queryset.query.sql_with_params()
+    key = "bread.count.{}.{}.{}".format(
+        model._meta.label_lower,
+        version,
+        hashlib.sha1(  # nosec because only used as cache key
+            f"{queryset.db}:{sql}:{params}".encode()
+        ).hexdigest(),
+    )
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, timeout)
+    return count
+
+
+def estimated_count(queryset):
+    """
+    Uses the estimate of the query planner if it is above ESTIMATED_COUNT_THRESHOLD.
+    Only supported for PostgreSQL, other databases will always count exactly.
+    """
+    threshold = getattr(
+        settings, "ESTIMATED_COUNT_THRESHOLD", app_settings.ESTIMATED_COUNT_THRESHOLD
+    )
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.count()
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+        else:
+            sql, params = queryset.query.sql_with_params()
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)  # nosec
+        row = cursor.fetchone()
+    if row is None:
+        return queryset.count()
+    if isinstance(row[0], (int, float)):
+        estimate = int(row[0])
+    else:
+        plan = row[0] if isinstance(row[0], list) else json.loads(row[0])
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+    if estimate < threshold:
+        return queryset.count()
+    return EstimatedCount(estimate)
+
+
+COUNT_STRATEGIES = {
+    "exact": exact_count,
+    "cached": cached_count,
+    "estimate": estimated_count,
+}
+
+
+class CountingPaginator(Paginator):
+    """
+    Paginator with a pluggable way to determine the total number of items.
+    count_strategy: name of an entry in COUNT_STRATEGIES or a function which takes
+                    a queryset and returns the number of rows
+    """
+
+    def __init__(self, *args, count_strategy="exact", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_strategy = COUNT_STRATEGIES.get(count_strategy, count_strategy)
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, models.QuerySet):
+            return super().count
+        return self.count_strategy(self.object_list)
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not isinstance(self.count, EstimatedCount):
+                raise
+        # the estimate may be lower than the real number of rows, count exactly
+        # instead of showing an error for pages beyond the estimate
+        self.count = self.object_list.count()
+        self.__dict__.pop("num_pages", None)
+        return super().validate_number(number)
@@ -0,0 +1,28 @@
+from functools import lru_cache
+
+from djangoql.parser import DjangoQLParser
+from djangoql.queryset import build_filter
+from djangoql.schema import DjangoQLSchema
+
+QUERY_CACHE_SIZE = 512  # number of compiled expressions which are kept
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def compile_queryexpression(model, expression, schema=DjangoQLSchema):
+    """
+    Parses and validates a djangoql expression and returns the according Q object.
+    The results are cached per model class, schema class and expression. Reloaded
+    model or schema classes are new objects and therefore use new cache entries.
+    Invalid expressions raise a DjangoQLError and are not cached.
+    """
+    ast = DjangoQLParser().parse(expression)
+    schema_instance = schema(model)
+    schema_instance.validate(ast)
+    return build_filter(ast, schema_instance)
+
+
+def apply_queryexpression(queryset, expression, schema=None):
+    """Cached replacement for djangoql.queryset.apply_search"""
+    return queryset.filter(
+        compile_queryexpression(queryset.model, expression, schema or DjangoQLSchema)
+    )
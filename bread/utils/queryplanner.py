@@ -0,0 +1,120 @@
+from django.core.exceptions import FieldDoesNotExist
+
+from .model_helpers import filter_fieldlist
+
+
+class QueryPlan:
+    """Describes which related tables and columns should be loaded for a queryset"""
+
+    def __init__(self, select_related=(), prefetch_related=(), only=None):
+        self.select_related = set(select_related)
+        self.prefetch_related = set(prefetch_related)
+        self.only = None if only is None else set(only)
+
+    def apply(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*sorted(self.select_related))
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*sorted(self.prefetch_related))
+        if self.only is not None:
+            queryset = queryset.only(*sorted(self.only))
+        return queryset
+
+    def __str__(self):
+        return (
+            f"select_related={sorted(self.select_related)}, "
+            f"prefetch_related={sorted(self.prefetch_related)}, "
+            f"only={sorted(self.only) if self.only is not None else None}"
+        )
+
+
+def _get_field(model, name):
+    """Like model._meta.get_field but also accepts the accessor names of reverse relations"""
+    try:
+        return model._meta.get_field(name)
+    except FieldDoesNotExist:
+        pass
+    for field in model._meta.get_fields():
+        if hasattr(field, "get_accessor_name") and field.get_accessor_name() == name:
+            return field
+    return None
+
+
+def plan_queryset(model, columns):
+    """
+    Generates a QueryPlan for displaying the given columns of a model.
+    columns: column definitions as used by DataTable.from_model, only string
+             accessors like "publisher.name" or "authors.all" can be analyzed
+    Related objects are joined with select_related as long as the accessor
+    follows foreign keys and one-to-one fields, to-many relationships are fetched
+    with prefetch_related. The loaded columns are only restricted with only() if
+    all columns are plain field lookups, because properties and methods of the
+    model might access any field.
+    """
+    from django.contrib.contenttypes.fields import GenericForeignKey
+
+    if "__all__" in columns:
+        columns = filter_fieldlist(model, columns)
+    plan = QueryPlan()
+    onlyfields = {model._meta.pk.name}
+    wholerelations = set()
+    restrict = True
+
+    for column in columns:
+        if not isinstance(column, str):
+            restrict = False
+            continue
+        current = model
+        path = []
+        joinable = True  # can be loaded with select_related
+        tomany = False
+        complete = False
+        parts = column.split(".")
+        for i, part in enumerate(parts):
+            field = _get_field(current, part) if current is not None else None
+            if field is None:
+                # properties, methods or e.g. "all" on a to-many relationship
+                complete = tomany and parts[i:] == ["all"]
+                break
+            last = i == len(parts) - 1
+            if isinstance(field, GenericForeignKey):
+                if joinable:
+                    prefix = "".join(p + "__" for p in path)
+                    onlyfields |= {prefix + field.ct_field, prefix + field.fk_field}
+                plan.prefetch_related.add("__".join(path + [part]))
+                complete = last
+                break
+            if not field.is_relation:
+                if joinable:
+                    onlyfields.add("__".join(path + [field.name]))
+                complete = last
+                break
+
+            path.append(part if field.many_to_many or field.one_to_many else field.name)
+            tomany = field.many_to_many or field.one_to_many
+            if tomany or not joinable:
+                joinable = False
+                plan.prefetch_related.add("__".join(path))
+            else:
+                plan.select_related.add("__".join(path))
+                if field.concrete:
+                    onlyfields.add("__".join(path))
+                else:  # reverse one-to-one, cannot be listed in only()
+                    restrict = False
+            current = field.related_model
+        else:
+            # the accessor ends with a relationship, the related object is displayed
+            complete = True
+            if joinable:
+                wholerelations.add("__".join(path))
+        restrict = restrict and complete
+
+    if restrict:
+        # restricting the fields of a related model which is displayed as a whole
+        # would lead to additional queries, e.g. when calling __str__
+        plan.only = {
+            f
+            for f in onlyfields
+            if not any(f.startswith(relation + "__") for relation in wholerelations)
+        }
+    return plan
@@ -0,0 +1,185 @@
+import atexit
+import functools
+import logging
+import threading
+from concurrent import futures
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections, models, transaction
+from django.urls import reverse
+
+import bread.settings as app_settings
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_OPTIONS = {"size": (100, 100), "quality": 75}
+THUMBNAIL_SALT = "bread.thumbnail"
+THUMBNAIL_WAIT_TIMEOUT = 10  # seconds the thumbnail view waits for background jobs
+
+
+def _workers():
+    return getattr(settings, "THUMBNAIL_WORKERS", app_settings.THUMBNAIL_WORKERS)
+
+
+def existing_thumbnail(fieldfile):
+    """Returns the thumbnail of an image if it has already been generated or None"""
+    from easy_thumbnails.files import get_thumbnailer
+
+    return get_thumbnailer(fieldfile).get_existing_thumbnail(THUMBNAIL_OPTIONS)
+
+
+def generate_thumbnail(fieldfile):
+    """Returns the thumbnail of an image, generates it if necessary"""
+    from easy_thumbnails.files import get_thumbnailer
+
+    return get_thumbnailer(fieldfile).get_thumbnail(THUMBNAIL_OPTIONS)
+
+
+def thumbnail_placeholder_url(fieldfile):
+    """
+    URL which generates the thumbnail of an image field on request and redirects
+    to it, used as image source while the thumbnail is not ready
+    """
+    token = signing.dumps(
+        [fieldfile.instance._meta.label, fieldfile.instance.pk, fieldfile.field.name],
+        salt=THUMBNAIL_SALT,
+    )
+    return reverse("thumbnail", args=[token])
+
+
+def thumbnail_fieldfile(token):
+    """Returns the field file of a token from thumbnail_placeholder_url or None"""
+    from django.apps import apps
+
+    try:
+        label, pk, fieldname = signing.loads(token, salt=THUMBNAIL_SALT)
+        model = apps.get_model(label)
+    except (signing.BadSignature, LookupError, ValueError):
+        return None
+    instance = model._default_manager.filter(pk=pk).first()
+    return getattr(instance, fieldname, None) if instance is not None else None
+
+
+_executor = None
+_pending = {}  # futures of the thumbnails which are generated in the background
+_pending_lock = threading.Lock()
+
+
+def _pendingkey(fieldfile):
+    return (id(fieldfile.storage), fieldfile.name)
+
+
+def _generate_in_thread(key, fieldfile):
+    try:
+        generate_thumbnail(fieldfile)
+    except Exception:
+        logger.exception(f"Thumbnail generation for {fieldfile.name} failed")
+    finally:
+        with _pending_lock:
+            _pending.pop(key, None)
+        # threads of the pool are not managed by django
+        connections.close_all()
+
+
+def enqueue_thumbnail(fieldfile):
+    """
+    Generates the thumbnail of an image in a pool of THUMBNAIL_WORKERS threads.
+    Images which are already queued are ignored. Returns False if THUMBNAIL_WORKERS
+    is 0, thumbnails are then generated during rendering.
+    """
+    global _executor
+
+    if not _workers():
+        return False
+    key = _pendingkey(fieldfile)
+    with _pending_lock:
+        if key in _pending:
+            return True
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_workers(), thread_name_prefix="thumbnail"
+            )
+            atexit.register(shutdown_thumbnail_workers)
+        _pending[key] = _executor.submit(_generate_in_thread, key, fieldfile)
+    return True
+
+
+def pending_thumbnail(fieldfile, timeout):
+    """
+    Returns the thumbnail of an image. If the thumbnail is being generated in the
+    background the job is awaited for at most timeout seconds instead of
+    generating the thumbnail a second time, None is returned if it takes longer.
+    """
+    with _pending_lock:
+        future = _pending.get(_pendingkey(fieldfile))
+    if future is not None:
+        try:
+            future.result(timeout)
+        except futures.TimeoutError:
+            return None
+        except futures.CancelledError:
+            pass
+    return existing_thumbnail(fieldfile) or generate_thumbnail(fieldfile)
+
+
+def shutdown_thumbnail_workers():
+    """Cancels queued thumbnails and waits for the running ones, called at exit"""
+    global _executor
+
+    with _pending_lock:
+        executor, _executor = _executor, None
+        for future in _pending.values():
+            future.cancel()
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+@functools.lru_cache(maxsize=None)
+def _imagefields(model):
+    return [f for f in model._meta.concrete_fields if isinstance(f, models.ImageField)]
+
+
+def mark_uploaded_images(sender, instance, raw=False, **kwargs):
+    """Receiver for pre_save, remembers images which are uploaded with this save"""
+    if raw:
+        return
+    uploaded = [
+        field.attname
+        for field in _imagefields(sender)
+        if getattr(instance, field.attname)
+        and not getattr(instance, field.attname)._committed
+    ]
+    if uploaded:
+        instance._bread_uploaded_images = uploaded
+
+
+def pregenerate_thumbnails(sender, instance, **kwargs):
+    """Receiver for post_save, generates the thumbnails of uploaded images"""
+    uploaded = instance.__dict__.pop("_bread_uploaded_images", None)
+    for attname in uploaded or ():
+        fieldfile = getattr(instance, attname)
+        transaction.on_commit(lambda fieldfile=fieldfile: enqueue_thumbnail(fieldfile))
+
+
+def connect_thumbnail_receivers():
+    """
+    Connects the thumbnail receivers only to models with image fields, other models
+    keep having no save receivers and can still be saved in bulk
+    """
+    from django.apps import apps
+    from django.db.models.signals import post_save, pre_save
+
+    for model in apps.get_models():
+        if _imagefields(model):
+            pre_save.connect(
+                mark_uploaded_images,
+                sender=model,
+                dispatch_uid=f"bread.thumbnail.mark.{model._meta.label}",
+            )
+            post_save.connect(
+                pregenerate_thumbnails,
+                sender=model,
+                dispatch_uid=f"bread.thumbnail.save.{model._meta.label}",
+            )
@@ -1,30 +1,51 @@
+import logging
+import uuid
+
 import htmlgenerator as hg
 from django.conf import settings
+from django.contrib.auth import get_permission_codename
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import FieldDoesNotExist, SuspiciousOperation
 from django.db import models
+from django.http import HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import redirect
+from django.template.loader import render_to_string
 from django.utils.translation import gettext_lazy as _
 from django.views.generic import ListView
-from djangoql.queryset import apply_search
 from guardian.mixins import PermissionListMixin
+from guardian.shortcuts import get_objects_for_user
 
 from .. import layout as _layout  # prevent name clashing
 from ..formatters import format_value
 from ..menu import Action
 from ..utils import (
-    generate_excel,
+    EXPORT_BACKENDS,
+    exportresponse,
     link_with_urlparameters,
+    prefetch_file_exists,
+    prefetch_permissions,
     pretty_modelname,
-    xlsxresponse,
+    rawvalue,
 )
-from ..utils.model_helpers import _expand_ALL_constant
+from ..utils.model_helpers import _expand_ALL_constant, filter_fieldlist
+from ..utils.pagination import CountingPaginator, KeysetPaginator
+from ..utils.queryexpression import apply_queryexpression
+from ..utils.queryplanner import plan_queryset
 from .util import BreadView
 
+logger = logging.getLogger(__name__)
+
 
 class BrowseView(BreadView, LoginRequiredMixin, PermissionListMixin, ListView):
     template_name = "bread/layout.html"
     orderingurlparameter = "ordering"
     itemsperpage_urlparameter = "itemsperpage"
+    cursor_urlparameter = "cursor"
+    keyset_pagination = False  # seek to the last seen row instead of using OFFSET
+    count_strategy = "exact"  # see bread.utils.pagination.COUNT_STRATEGIES
+    optimize_queryset = True  # select/prefetch related tables needed for the columns
+    streaming = False  # send the page while the rows are rendered
+    streaming_chunk_size = 64 * 1024
     pagination_choices = ()
     columns = ["__all__"]
     searchurl = None
@@ -43,6 +64,14 @@ class BrowseView(BreadView, LoginRequiredMixin, PermissionListMixin, ListView):
         self.itemsperpage_urlparameter = (
             kwargs.get("itemsperpage_urlparameter") or self.itemsperpage_urlparameter
         )
+        self.cursor_urlparameter = (
+            kwargs.get("cursor_urlparameter") or self.cursor_urlparameter
+        )
+        self.keyset_pagination = (
+            kwargs.get("keyset_pagination") or self.keyset_pagination
+        )
+        self.count_strategy = kwargs.get("count_strategy") or self.count_strategy
+        self.optimize_queryset = kwargs.get("optimize_queryset", self.optimize_queryset)
         self.pagination_choices = (
             kwargs.get("pagination_choices")
             or self.pagination_choices
@@ -60,6 +89,9 @@ class BrowseView(BreadView, LoginRequiredMixin, PermissionListMixin, ListView):
 
     def layout(self, request):
         qs = self.get_queryset()
+        page_urlparameter = (
+            self.cursor_urlparameter if self.keyset_pagination else self.page_kwarg
+        )
         return _layout.datatable.DataTable.from_model(
             self.model,
             hg.C("object_list"),
@@ -70,7 +102,7 @@ class BrowseView(BreadView, LoginRequiredMixin, PermissionListMixin, ListView):
             query_urlparameter=self.query_urlparameter,
             rowclickaction=self.rowclickaction,
             pagination_options=self.pagination_choices,
-            page_urlparameter=self.page_kwarg,
+            page_urlparameter=page_urlparameter,
             paginator=self.get_paginator(qs, self.get_paginate_by(qs)),
             itemsperpage_urlparameter=self.itemsperpage_urlparameter,
             toolbar_action_menus=[
@@ -85,7 +117,7 @@ class BrowseView(BreadView, LoginRequiredMixin, PermissionListMixin, ListView):
                                         c["request"],
                                         **{
                                             self.query_urlparameter: filter,
-                                            self.page_kwarg: None,
+                                            page_urlparameter: None,
                                         },
                                     )
                                 ),
@@ -104,7 +136,7 @@ class BrowseView(BreadView, LoginRequiredMixin, PermissionListMixin, ListView):
                                         c["request"],
                                         **{
                                             self.query_urlparameter: None,
-                                            self.page_kwarg: None,
+                                            page_urlparameter: None,
                                         },
                                     )
                                 ),
@@ -134,38 +166,222 @@ class BrowseView(BreadView, LoginRequiredMixin, PermissionListMixin, ListView):
             self.itemsperpage_urlparameter, self.pagination_choices[0]
         )
 
+    def get_paginator(self, queryset, per_page, *args, **kwargs):
+        # the view and the pagination widget share the paginator, that way
+        # counting and fetching a page happens only once per request
+        if getattr(self, "_paginator", None) is not None:
+            return self._paginator
+        if self.keyset_pagination:
+            order = self.request.GET.get(self.orderingurlparameter)
+            self._paginator = KeysetPaginator(
+                queryset,
+                per_page,
+                orderexpression=ordering_expression(order.lstrip("-"))
+                if order
+                else None,
+                descending=bool(order) and order.startswith("-"),
+                ordering=order,
+            )
+        else:
+            self._paginator = CountingPaginator(
+                queryset,
+                per_page,
+                *args,
+                count_strategy=self.count_strategy,
+                **kwargs,
+            )
+        return self._paginator
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.keyset_pagination:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = self.get_paginator(queryset, page_size)
+        page = paginator.get_page(self.request.GET.get(self.cursor_urlparameter))
+        return (paginator, page, page.object_list, page.has_other_pages())
+
     def get_queryset(self):
         """Prefetch related tables to speed up queries. Also order result by get-parameters."""
-        qs = super().get_queryset()
-        if self.query_urlparameter in self.request.GET:
-            qs = apply_search(
-                qs,
-                "("
-                + ") and (".join(self.request.GET.getlist(self.query_urlparameter))
-                + ")",
-            )
-        order = self.request.GET.get(self.orderingurlparameter)
-        if order:
-            if order.endswith("__int"):
-                order = order[:-5]
-                qs = qs.order_by(
-                    models.functions.Cast(order[1:], models.IntegerField()).desc()
-                    if order.startswith("-")
-                    else models.functions.Cast(order, models.IntegerField())
-                )
-            else:
-                qs = qs.order_by(
-                    models.functions.Lower(order[1:]).desc()
-                    if order.startswith("-")
-                    else models.functions.Lower(order)
-                )
+        qs = apply_browseparameters(
+            super().get_queryset(),
+            self.request.GET,
+            query_urlparameter=self.query_urlparameter,
+            orderingurlparameter=self.orderingurlparameter,
+        )
+        if self.optimize_queryset:
+            plan = plan_queryset(self.model, self.columns)
+            if settings.DEBUG:
+                logger.debug(f"Query plan for {self.model._meta.label}: {plan}")
+            qs = plan.apply(qs)
         return qs
 
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
         context["pagetitle"] = pretty_modelname(self.model, plural=True)
+        filefields = self.get_filefields()
+        if filefields and context.get("object_list") is not None:
+            prefetch_file_exists(
+                getattr(obj, field)
+                for obj in context["object_list"]
+                for field in filefields
+            )
+        if context.get("object_list") is not None and any(
+            action._permissions for action in self.rowactions
+        ):
+            # the permissions of the row actions are checked for every row
+            prefetch_permissions(self.request.user, context["object_list"])
         return context
 
+    def render_to_response(self, context, **response_kwargs):
+        """
+        Streams the page if self.streaming is set: the template is rendered with a
+        placeholder for the layout, the layout is then rendered while the response
+        is sent, in chunks of self.streaming_chunk_size characters.
+        Errors which happen during rendering of the first chunk lead to an error
+        response, later errors cannot change the status code anymore and end the
+        page early. Templates without {% render_layout %} are sent as usual.
+        """
+        if not self.streaming:
+            return super().render_to_response(context, **response_kwargs)
+
+        response_kwargs.setdefault("content_type", self.content_type)
+        placeholder = _LayoutPlaceholder()
+        page = render_to_string(
+            self.get_template_names(),
+            {**context, "layout_placeholder": placeholder},
+            request=self.request,
+        )
+        if placeholder.marker not in page:
+            return HttpResponse(page, **response_kwargs)
+        head, tail = page.split(placeholder.marker, 1)
+
+        object_list = placeholder.context.get("object_list")
+        if (
+            isinstance(object_list, models.QuerySet)
+            and object_list._result_cache is None
+            and not object_list._prefetch_related_lookups  # ignored by iterator()
+        ):
+            placeholder.context["object_list"] = object_list.iterator()
+        chunks = self._render_chunks(
+            placeholder.layout(self.request).render(placeholder.context), tail
+        )
+        first = next(chunks)  # errors in the first rows still cause an error page
+
+        def stream():
+            yield head
+            yield first
+            try:
+                yield from chunks
+            except Exception:
+                logger.exception(f"Streaming of {self.request.path} failed")
+                raise
+
+        return StreamingHttpResponse(stream(), **response_kwargs)
+
+    def _render_chunks(self, rendered, tail):
+        chunks, size = [], 0
+        for chunk in rendered:
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= self.streaming_chunk_size:
+                yield "".join(chunks)
+                chunks, size = [], 0
+        chunks.append(tail)
+        yield "".join(chunks)
+
+    def get_filefields(self):
+        """
+        Names of the file fields in the columns, their existence in the storage is
+        checked for the whole page at once. Columns are detected if they are a
+        field name or have a cell value like hg.C("row.<fieldname>").
+        """
+        columns = self.columns
+        if "__all__" in columns:
+            columns = filter_fieldlist(self.model, columns)
+        filefields = []
+        for column in columns:
+            if isinstance(column, tuple) and isinstance(column[1], hg.ContextValue):
+                column = column[1].value
+                if not column.startswith("row."):
+                    continue
+                column = column[len("row.") :]
+            if not isinstance(column, str):
+                continue
+            try:
+                field = self.model._meta.get_field(column)
+            except FieldDoesNotExist:
+                continue
+            if isinstance(field, models.FileField):
+                filefields.append(column)
+        return filefields
+
+
+class _LayoutPlaceholder:
+    """Marks the position of the layout in the template, see render_layout"""
+
+    def __init__(self):
+        self.marker = f"<!--bread-layout-{uuid.uuid4().hex}-->"
+        self.layout = None
+        self.context = None
+
+
+def apply_browseparameters(
+    queryset, querydict, query_urlparameter="q", orderingurlparameter="ordering"
+):
+    """Filters and orders the queryset according to the URL parameters of a BrowseView"""
+    if query_urlparameter in querydict:
+        queryset = apply_queryexpression(
+            queryset,
+            "(" + ") and (".join(querydict.getlist(query_urlparameter)) + ")",
+        )
+    order = querydict.get(orderingurlparameter)
+    if order:
+        expression = ordering_expression(order.lstrip("-"))
+        queryset = queryset.order_by(
+            expression.desc() if order.startswith("-") else expression
+        )
+    return queryset
+
+
+def selected_objects(queryset, request, objectids_argname="selected", browseview=None):
+    """
+    Returns the objects of the queryset which have been selected for a bulk action.
+    Like the rows of a BrowseView only objects which request.user may view can be
+    selected. If objectids_argname has the value "all" (see
+    bread/static/js/main.js:submitbulkaction) all objects which the BrowseView class
+    browseview lists for the request are selected, otherwise the objects with the
+    given ids. Selecting all objects is rejected if browseview is not given, the
+    listed objects may be restricted by the browse view beyond the search query.
+    """
+    opts = queryset.model._meta
+    queryset = get_objects_for_user(
+        request.user,
+        f"{opts.app_label}.{get_permission_codename('view', opts)}",
+        queryset,
+    )
+    objectids = request.GET.getlist(objectids_argname)
+    if "all" in objectids:
+        if browseview is None:
+            raise SuspiciousOperation(
+                f"Selecting all {opts.verbose_name_plural} requires a browse view"
+            )
+        view = browseview(model=queryset.model)
+        view.setup(request)
+        listed = view.get_queryset().order_by().values("pk")
+        return apply_browseparameters(
+            queryset.filter(pk__in=listed),
+            request.GET,
+            query_urlparameter=None,  # the search is part of the listed objects
+            orderingurlparameter=view.orderingurlparameter,
+        )
+    return queryset.filter(pk__in=objectids)
+
+
+def ordering_expression(order):
+    """Returns the expression to sort by the (unsigned) value of the ordering URL parameter"""
+    if order.endswith("__int"):
+        return models.functions.Cast(order[:-5], models.IntegerField())
+    return models.functions.Lower(order)
+
 
 class TreeView(BrowseView):
     template_name = "bread/tree.html"
@@ -206,11 +422,18 @@ class TreeView(BrowseView):
         return build_tree(children[None])
 
 
-def generate_excel_view(queryset, fields, filterstr=None):
+def generate_excel_view(
+    queryset, fields, filterstr=None, chunk_size=2000, raw=False, browseview=None
+):
     """
     Generates an excel file from the given queryset with the specified fields.
+    Other formats can be requested with the URL parameter "format", see bread.utils.export.EXPORT_BACKENDS
     fields: list [<fieldname1>, <fieldname2>, ...] or dict with {<fieldname>: formatting_function(object, fieldname)}
     filterstr: a djangoql filter string which will lazy evaluated, see bread.fields.queryfield.parsequeryexpression
+    chunk_size: number of rows which are fetched from the database at once
+    raw: export the python values of the fields as typed cells instead of the rendered HTML,
+         formatting functions need to return python values as well, see bread.utils.export.excelvalue
+    browseview: BrowseView class which lists the objects, required to export all selected objects
     """
 
     model = queryset.model
@@ -219,24 +442,34 @@ def generate_excel_view(queryset, fields, filterstr=None):
         fields = _expand_ALL_constant(model, fields)
 
     if not isinstance(fields, dict):
-        fields = {
-            field: lambda inst: format_value(getattr(inst, field)) for field in fields
-        }
+        if raw:
+            fields = {
+                field: lambda inst, field=field: rawvalue(inst, field)
+                for field in fields
+            }
+        else:
+            fields = {
+                field: lambda inst, field=field: format_value(getattr(inst, field))
+                for field in fields
+            }
 
     def excelview(request):
         from bread.contrib.reports.fields.queryfield import parsequeryexpression
 
+        exportformat = request.GET.get("format", "xlsx")
+        if exportformat not in EXPORT_BACKENDS:
+            return HttpResponseBadRequest("Unknown export format")
         items = queryset
         if isinstance(filterstr, str):
-            items = parsequeryexpression(model.objects.all(), filterstr)
+            items = parsequeryexpression(model.objects.all(), filterstr).queryset
         if "selected" in request.GET:
-            items = items.filter(
-                pk__in=[int(i) for i in request.GET.getlist("selected")]
-            )
-        items = list(items.all())
-        workbook = generate_excel(items, fields)
-        workbook.title = pretty_modelname(model)
-
-        return xlsxresponse(workbook, workbook.title)
+            items = selected_objects(items, request, browseview=browseview)
+        return exportresponse(
+            exportformat,
+            items.all().iterator(chunk_size=chunk_size),
+            fields,
+            pretty_modelname(model),
+            raw=raw,
+        )
 
     return excelview
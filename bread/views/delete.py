@@ -9,6 +9,7 @@ import urllib
 import htmlgenerator as hg
 from django.contrib import messages
 from django.contrib.messages.views import SuccessMessageMixin
+from django.db import IntegrityError, models, transaction
 from django.forms import Form
 from django.utils.translation import gettext_lazy as _
 from django.views.generic import DeleteView as DjangoDeleteView
@@ -17,6 +18,7 @@ from guardian.mixins import PermissionRequiredMixin
 
 from .. import layout as _layout
 from ..utils import pretty_modelname, reverse_model
+from .browse import selected_objects
 from .util import BreadView
 
 
@@ -72,33 +74,75 @@ class BulkDeleteView(
     RedirectView,
 ):
     objectids_argname = "selected"  # see bread/static/js/main.js:submitbulkaction
+    browseview = (
+        None  # BrowseView class which lists the objects, required for selected=all
+    )
     accept_global_perms = True
     model = None
+    # number of objects which are deleted with one query and transaction, models
+    # which override Model.delete or a batch_size of 0 delete each object separately
+    batch_size = 1000
 
     def __init__(self, model, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.model = model
 
     def get(self, *args, **kwargs):
-        objectids = self.request.GET.getlist(self.objectids_argname, ())
+        queryset = self.get_queryset()
+        if self.batch_size and self.model.delete is models.Model.delete:
+            objectids = list(queryset.values_list("pk", flat=True))
+            deleted = 0
+            for i in range(0, len(objectids), self.batch_size):
+                deleted += self.delete_batch(objectids[i : i + self.batch_size])
+        else:
+            deleted = self.delete_separately(queryset)
+
+        messages.success(
+            self.request,
+            _("Deleted %s %s")
+            % (deleted, pretty_modelname(self.model, plural=deleted > 1)),
+        )
+        return super().get(*args, **kwargs)
+
+    def get_queryset(self):
+        return selected_objects(
+            self.model.objects.all(),
+            self.request,
+            self.objectids_argname,
+            browseview=self.browseview,
+        )
+
+    def delete_batch(self, objectids):
+        """
+        Deletes the objects with a single collector pass and returns the number of
+        deleted objects. If the batch can not be deleted, e.g. because of protected
+        objects, it is split up until the failing objects are found and reported.
+        """
+        queryset = self.model.objects.filter(pk__in=objectids)
+        if len(objectids) == 1:
+            return self.delete_separately(queryset)
+        try:
+            with transaction.atomic():
+                return queryset.delete()[1].get(self.model._meta.label, 0)
+        except (models.ProtectedError, models.RestrictedError, IntegrityError):
+            middle = len(objectids) // 2
+            return self.delete_batch(objectids[:middle]) + self.delete_batch(
+                objectids[middle:]
+            )
+
+    def delete_separately(self, queryset):
         deleted = 0
-        for i in objectids:
-            object = self.model.objects.get(pk=i)
+        for object in queryset:
             try:
-                object.delete()
+                with transaction.atomic():
+                    object.delete()
                 deleted += 1
             except Exception as e:
                 messages.error(
                     self.request,
                     _("%s could not be deleted: %s") % (object, e),
                 )
-
-        messages.success(
-            self.request,
-            _("Deleted %s %s")
-            % (deleted, pretty_modelname(self.model, plural=deleted > 1)),
-        )
-        return super().get(*args, **kwargs)
+        return deleted
 
     def get_redirect_url(self, *args, **kwargs):
         if self.url:
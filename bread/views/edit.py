@@ -4,21 +4,34 @@ on the standard class-based views of django and are should easily be
 extendable and composable by subclassing them. Most of the views require
 an argument "admin" which is an instance of the according BreadAdmin class
 """
+import functools
 import re
 import urllib
 
 import htmlgenerator as hg
 from django.contrib import messages
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
 from django.utils.translation import gettext as _
 from django.views.decorators.cache import never_cache
-from django.views.generic import UpdateView
+from django.views.generic import FormView, UpdateView
 from guardian.mixins import PermissionRequiredMixin
+from guardian.shortcuts import get_objects_for_user
 from model_clone.utils import create_copy_of_instance
 
 from .. import layout as _layout  # prevent name clashing
-from ..utils import filter_fieldlist, model_urlname
+from ..utils import (
+    bulk_create_copies,
+    filter_fieldlist,
+    has_save_logic,
+    increase_model_version,
+    model_urlname,
+    pretty_modelname,
+    reverse_model,
+)
+from .browse import selected_objects
 from .util import BreadView, CustomFormMixin
 
 
@@ -75,68 +88,234 @@ class EditView(
         return super().dispatch(*args, **kwargs)
 
 
+class BulkEditView(
+    BreadView,
+    CustomFormMixin,
+    PermissionRequiredMixin,
+    FormView,
+):
+    """
+    Sets the given fields of all selected objects to the values of a form.
+    The objects are updated in batches of batch_size with a single update query
+    per batch. Like QuerySet.update this calls neither save methods nor the
+    pre_save and post_save signals. If clean_objects is True the objects are
+    loaded, validated with full_clean and saved with bulk_update instead. Models
+    which override save or have pre_save or post_save receivers are then saved
+    separately with save(update_fields=...), which sends the signals. Objects for
+    which the user has no change permission are skipped.
+    """
+
+    template_name = "bread/layout.html"
+    objectids_argname = "selected"  # see bread/static/js/main.js:submitbulkaction
+    browseview = (
+        None  # BrowseView class which lists the objects, required for selected=all
+    )
+    accept_global_perms = True
+    model = None
+    fields = None
+    batch_size = 1000
+    clean_objects = False
+
+    def __init__(self, model, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.model = model
+        self.object = None
+        self._objectids = None
+        self.fields = [
+            field
+            for field in filter_fieldlist(model, self.fields or [], for_form=True)
+            if model._meta.get_field(field).concrete
+            and not model._meta.get_field(field).many_to_many
+            and not isinstance(model._meta.get_field(field), models.FileField)
+        ]
+
+    def layout(self, request):
+        return hg.BaseElement(
+            hg.H3(hg.C("pagetitle")),
+            _layout.form.Form.wrap_with_form(
+                hg.C("form"),
+                hg.BaseElement(*[_layout.form.FormField(f) for f in self.fields]),
+            ),
+        )
+
+    def get_required_permissions(self, request):
+        return [f"{self.model._meta.app_label}.change_{self.model.__name__.lower()}"]
+
+    def get_permission_object(self):
+        return None
+
+    def check_permissions(self, request):
+        # permissions are checked per object in get_queryset, the global permission
+        # is only required if none of the selected objects may be changed
+        if self.get_objectids():
+            return None
+        return super().check_permissions(request)
+
+    def get_queryset(self):
+        """The selected objects for which the user has the change permission"""
+        return get_objects_for_user(
+            self.request.user,
+            self.get_required_permissions(self.request),
+            selected_objects(
+                self.model.objects.all(),
+                self.request,
+                self.objectids_argname,
+                browseview=self.browseview,
+            ),
+            accept_global_perms=self.accept_global_perms,
+            with_superuser=True,
+        )
+
+    def get_objectids(self):
+        """Primary keys of get_queryset, only queried once per request"""
+        if self._objectids is None:
+            self._objectids = list(self.get_queryset().values_list("pk", flat=True))
+        return self._objectids
+
+    def get_context_data(self, *args, **kwargs):
+        context = super().get_context_data(*args, **kwargs)
+        context["pagetitle"] = _("Edit %s %s") % (
+            len(self.get_objectids()),
+            pretty_modelname(self.model, plural=True),
+        )
+        return context
+
+    def form_valid(self, form):
+        values = {field: form.cleaned_data[field] for field in self.fields}
+        selected = selected_objects(
+            self.model.objects.all(),
+            self.request,
+            self.objectids_argname,
+            browseview=self.browseview,
+        ).count()
+        pks = self.get_objectids()
+        if len(pks) < selected:
+            messages.error(
+                self.request,
+                _("No permission to change %s of the selected objects")
+                % (selected - len(pks)),
+            )
+        updated = 0
+        for i in range(0, len(pks), self.batch_size):
+            with transaction.atomic():
+                updated += self.update_batch(pks[i : i + self.batch_size], values)
+        messages.success(
+            self.request,
+            _("Updated %s %s")
+            % (updated, pretty_modelname(self.model, plural=updated != 1)),
+        )
+        return redirect(self.get_success_url())
+
+    def update_batch(self, pks, values):
+        """Updates the objects with the given primary keys and returns their number"""
+        queryset = self.model.objects.filter(pk__in=pks)
+        if not self.clean_objects:
+            updated = queryset.update(**values)
+            increase_model_version(self.model)
+            return updated
+        objects = []
+        exclude = [f.name for f in self.model._meta.fields if f.name not in values]
+        for object in queryset:
+            for field, value in values.items():
+                setattr(object, field, value)
+            try:
+                object.full_clean(exclude=exclude)
+                objects.append(object)
+            except ValidationError as e:
+                messages.error(
+                    self.request,
+                    _("%s could not be changed: %s") % (object, e),
+                )
+        if has_save_logic(self.model):
+            for object in objects:
+                object.save(update_fields=list(values))
+        else:
+            self.model.objects.bulk_update(objects, list(values))
+            increase_model_version(self.model)
+        return len(objects)
+
+    def get_success_url(self):
+        if self.request.GET.get("next"):
+            return urllib.parse.unquote(self.request.GET["next"])
+        return reverse_model(self.model, "browse")
+
+
+@functools.lru_cache(maxsize=None)
+def _copylabel_re(copylabel):
+    return re.compile(f"\\({re.escape(copylabel)}( [0-9]*)?\\)")
+
+
+def _copylabel(label):
+    """Creates labels with the sequence (Copy), (Copy 2), (Copy 3), etc."""
+    copylabel = _("Copy")
+    copy_re = _copylabel_re(copylabel)
+    match = copy_re.search(label)
+    if match is None:
+        return f"{label} ({copylabel})"
+    if match.groups()[0] is None:
+        return copy_re.sub(f"({copylabel} 2)", label)
+    n = int(match.groups()[0].strip()) + 1
+    return copy_re.sub(f"({copylabel} {n})", label)
+
+
 def generate_copyview(model, attrs=None, labelfield=None):
     """creates a copy of a model instance and redirects to the edit view of the newly created instance
     attrs: custom field values for the new instance
     labelfield: name of a model field which will be used to create copy-labels (Example, Example (Copy 2), Example (Copy 3), etc)
+    The many-to-many relations are copied as well, see bulk_create_copies
     """
     attrs = attrs or {}
 
     def copy(request, pk: int):
         instance = get_object_or_404(model, pk=pk)
-        # create labels with the sequence (Copy), (Copy 2), (Copy 3), etc.
+        copyattrs = dict(attrs)
         if labelfield:
-            copylabel = _("Copy")
-            copy_re = f"\\({copylabel}( [0-9]*)?\\)"
-            match = re.search(copy_re, instance.name)
-            if match is None:
-                label = f"{instance.name} ({copylabel})"
-            elif match.groups()[0] is None:
-                label = re.sub(copy_re, f"({copylabel} 2)", instance.name)
-            else:
-                n = int(match.groups()[0].strip()) + 1
-                label = re.sub(copy_re, f"({copylabel} {n})", instance.name)
-            attrs[labelfield] = label
-
-        clone = create_copy_of_instance(instance, attrs=attrs)
+            copyattrs[labelfield] = _copylabel(getattr(instance, labelfield))
+
+        clone = create_copy_of_instance(instance, attrs=copyattrs, save_new=False)
+        bulk_create_copies([instance], [clone])
         return redirect(reverse(model_urlname(model, "edit"), args=[clone.pk]))
 
     return copy
 
 
-def generate_bulkcopyview(model, pk_queryname="selected", attrs=None, labelfield=None):
-    """creates a copy of a list of instances and redirects to the edit view of the newly created instance
+def generate_bulkcopyview(
+    model, pk_queryname="selected", attrs=None, labelfield=None, browseview=None
+):
+    """creates a copy of a list of instances and redirects to the browse view of the model
     pk_queryname: name of the HTTP query parameter which carries the pk's of the object to duplicate
+    browseview: BrowseView class which lists the objects, required to copy all selected objects
     attrs: custom field values for the new instance
     labelfield: name of a model field which will be used to create copy-labels (Example, Example (Copy 2), Example (Copy 3), etc)
+    The copies are validated separately and inserted together with their many-to-many relations, see bulk_create_copies
     """
     attrs = attrs or {}
 
     def copy(request):
-        created = 0
-        errors = 0
-        for pk in request.GET.getlist(pk_queryname):
-            instance = get_object_or_404(model, pk=pk)
-            # create labels with the sequence (Copy), (Copy 2), (Copy 3), etc.
+        instances, copies = [], []
+        for instance in selected_objects(
+            model.objects.all(),
+            request,
+            pk_queryname,
+            browseview=browseview,
+        ):
+            copyattrs = dict(attrs)
             if labelfield:
-                copylabel = _("Copy")
-                copy_re = f"\\({copylabel}( [0-9]*)?\\)"
-                match = re.search(copy_re, instance.name)
-                if match is None:
-                    label = f"{instance.name} ({copylabel})"
-                elif match.groups()[0] is None:
-                    label = re.sub(copy_re, f"({copylabel} 2)", instance.name)
-                else:
-                    n = int(match.groups()[0].strip()) + 1
-                    label = re.sub(copy_re, f"({copylabel} {n})", instance.name)
-                attrs[labelfield] = label
+                copyattrs[labelfield] = _copylabel(getattr(instance, labelfield))
             try:
-                create_copy_of_instance(instance, attrs=attrs)
-                created += 1
+                copies.append(
+                    create_copy_of_instance(instance, attrs=copyattrs, save_new=False)
+                )
+                instances.append(instance)
             except Exception as e:
                 messages.error(request, e)
-                errors += 1
-            messages.success(request, _("Created %s copies" % created))
+
+        def copyerror(instance, error):
+            messages.error(request, _("%s could not be copied: %s") % (instance, error))
+
+        created = bulk_create_copies(instances, copies, onerror=copyerror)
+        if created:
+            messages.success(request, _("Created %s copies") % len(created))
         return redirect(reverse(model_urlname(model, "browse")))
 
     return copy
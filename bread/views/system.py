@@ -1,7 +1,15 @@
+from django.contrib.auth.decorators import login_required
 from django.contrib.auth.views import LoginView, LogoutView
+from django.http import Http404
+from django.shortcuts import redirect
 from django.utils.translation import gettext_lazy as _
 
 from .. import layout
+from ..utils.thumbnails import (
+    THUMBNAIL_WAIT_TIMEOUT,
+    pending_thumbnail,
+    thumbnail_fieldfile,
+)
 
 
 class BreadLoginView(LoginView):
@@ -16,3 +24,14 @@ class BreadLoginView(LoginView):
 
 class BreadLogoutView(LogoutView):
     pass
+
+
+@login_required
+def thumbnail(request, token):
+    """Redirects to the thumbnail of an image, see bread.utils.thumbnail_placeholder_url"""
+    fieldfile = thumbnail_fieldfile(token)
+    if not fieldfile:
+        raise Http404()
+    thumbnail = pending_thumbnail(fieldfile, THUMBNAIL_WAIT_TIMEOUT)
+    # the original image is shown if the background job takes too long
+    return redirect((thumbnail or fieldfile).url)
@@ -1,7 +1,12 @@
+import collections
+import functools
+import threading
+
 import htmlgenerator as hg
 from django import forms
 from django.contrib import messages
 from django.utils.html import mark_safe
+from django.utils.translation import get_language
 
 from .. import layout as _layout  # prevent name clashing
 from ..forms.forms import breadmodelform_factory
@@ -72,12 +77,77 @@ class CustomFormMixin:
         return form
 
 
+_LAYOUT_CACHE = collections.OrderedDict()
+_LAYOUT_CACHE_LOCK = threading.Lock()
+LAYOUT_CACHE_SIZE = 256
+
+
+def _cache_layout_enabled(view, viewclass):
+    """
+    Process wide caching must be enabled on the view instance or on a class which
+    inherits the layout method of viewclass. Library base classes leave it disabled,
+    a subclass which changes the layout therefore never reuses a cached layout of
+    one of its base classes.
+    """
+    if "cache_layout" in view.__dict__:
+        return view.cache_layout
+    for cls in type(view).__mro__:
+        if "cache_layout" in cls.__dict__:
+            return issubclass(cls, viewclass) and cls.__dict__["cache_layout"]
+    return False
+
+
+def _cachedlayout(layoutfunc, viewclass):
+    """
+    Wraps the layout method of a view class. The layout is only built once per request
+    and if the view sets cache_layout = True only once per process for each
+    combination of view class, language and get_layout_cache_key.
+    """
+
+    @functools.wraps(layoutfunc)
+    def layout(self, request):
+        # calls from the layout method of a subclass via super() are not cached
+        # because the subclass will usually modify the returned layout
+        if type(self).layout is not layout:
+            return layoutfunc(self, request)
+        memo = self.__dict__.get("_layout_memo")
+        if memo is not None and memo[0] is request:
+            return memo[1]
+        cachekey = None
+        if _cache_layout_enabled(self, viewclass):
+            cachekey = self.get_layout_cache_key()
+        if cachekey is None:
+            ret = layoutfunc(self, request)
+        else:
+            key = (type(self), get_language(), cachekey)
+            with _LAYOUT_CACHE_LOCK:
+                ret = _LAYOUT_CACHE.get(key)
+                if ret is not None:
+                    _LAYOUT_CACHE.move_to_end(key)
+            if ret is None:
+                ret = layoutfunc(self, request)
+                with _LAYOUT_CACHE_LOCK:
+                    _LAYOUT_CACHE[key] = ret
+                    while len(_LAYOUT_CACHE) > LAYOUT_CACHE_SIZE:
+                        _LAYOUT_CACHE.popitem(last=False)
+        self._layout_memo = (request, ret)
+        return ret
+
+    return layout
+
+
 class BreadView:
     """
     Enforces the definition of a layout method which is used to render the view
     Shortcut to create a subclass with the given attributes
+    The layout is built at most once per request. Concrete views whose layout does not
+    depend on the request or the current object can set cache_layout = True in order
+    to build it only once per process. Request specific values are then passed to the
+    layout through the context.
     """
 
+    cache_layout = False
+
     @classmethod
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
@@ -85,6 +155,20 @@ class BreadView:
             raise NotImplementedError(
                 f"{cls} needs to implement a method 'layout(request)'"
             )
+        if callable(cls.__dict__.get("layout")):
+            cls.layout = _cachedlayout(cls.__dict__["layout"], cls)
+
+    def get_layout_cache_key(self):
+        """
+        Values besides the view class and the language on which the layout depends.
+        Returning None disables the process wide caching of the layout.
+        """
+        fields = getattr(self, "fields", None) or ()
+        if isinstance(fields, str):
+            fields = (fields,)
+        if not all(isinstance(f, str) for f in fields):
+            return None  # layout elements in fields can not be compared, no caching
+        return (getattr(self, "model", None), tuple(fields))
 
     @classmethod
     def _with(cls, **kwargs):
@@ -9,7 +9,7 @@ INSTALLED_APPS = [
     "django.contrib.auth",
     "django.contrib.contenttypes",
     "django.contrib.sites",
-    "bread",
+    "bread.apps.BreadConfig",
     "bread.contrib.reports",
     "easy_thumbnails",
 ]